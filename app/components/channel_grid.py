@@ -0,0 +1,115 @@
+# app/components/channel_grid.py
+import html
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+import pandas as pd
+import streamlit as st
+
+from backend.thumbnails import PLACEHOLDER, fetch_thumbnails, thumbnail_sources, thumbnail_sprite
+
+PAGE_SIZES = [12, 24, 48, 96]
+DEFAULT_PAGE_SIZE = int(st.secrets.get("CHANNEL_GRID_PAGE_SIZE", 24))
+# inline: one data URI per card · sprite: one image per page · remote: hotlink YouTube's CDN
+THUMBNAIL_MODE = st.secrets.get("THUMBNAIL_MODE", "inline")
+THUMBNAIL_STYLE = "width: 60px; height: 60px; border-radius: 50%; margin-right: 15px; flex-shrink: 0;"
+
+def _text(values: pd.Series, default: str = "") -> pd.Series:
+    return values.fillna(default).astype(str).map(html.escape)
+
+def _count(values: pd.Series) -> pd.Series:
+    return values.map("{:,}".format)
+
+def _thumbnails(urls: pd.Series, mode: str) -> tuple[str, pd.Series]:
+    """
+    A style block shared by the page (sprite mode only) and the thumbnail element of every card.
+    """
+    values = [url if isinstance(url, str) and url else None for url in urls]
+    stored = None if mode == "remote" else fetch_thumbnails([url for url in values if url], timeout=0)
+    if stored is None:
+        sources = [url or PLACEHOLDER for url in values]
+    else:
+        sources = thumbnail_sources(values, stored)
+    images = pd.Series(
+        [f'<img src="{html.escape(src)}" alt="Channel Thumbnail" loading="lazy" style="{THUMBNAIL_STYLE}">' for src in sources],
+        index=urls.index,
+    )
+    if mode != "sprite":
+        return "", images
+
+    sheet, slots = thumbnail_sprite(values, stored)
+    if sheet is None:
+        return "", images
+    used = max(slot for slot in slots if slot is not None) + 1
+    style = f"<style>.yt-thumbs {{background-image: url({sheet}); background-size: {used * 60}px 60px;}}</style>"
+    sprites = pd.Series(
+        [
+            f'<div class="yt-thumbs" role="img" aria-label="Channel Thumbnail" '
+            f'style="{THUMBNAIL_STYLE} background-position: -{slot * 60}px 0;"></div>' if slot is not None else ""
+            for slot in slots
+        ],
+        index=urls.index,
+    )
+    return style, sprites.where(sprites != "", images)
+
+def render_cards(page: pd.DataFrame, thumbnail_mode: str | None = None) -> str:
+    """
+    Build the HTML for every card on the page in one column-wise pass over the normalized frame.
+    Thumbnails come from the local store (backend.thumbnails) unless THUMBNAIL_MODE is "remote".
+    """
+    channel_url = _text(page["channelUrl"])
+    style, thumbnail = _thumbnails(page["thumbnailUrl"], thumbnail_mode or THUMBNAIL_MODE)
+    description = _text(page["description"].fillna("No description available.").str.slice(0, 120))
+    if "latestVideoTitle" in page:
+        latest_title = _text(page["latestVideoTitle"])
+        latest_date = _text(page["latestVideoDate"].dt.strftime("%Y-%m-%d"))
+    else:
+        latest_title = latest_date = pd.Series("", index=page.index)
+    latest_line = ("<p style='margin: 0; font-size: 0.8rem;'>🆕 " + latest_title + " · " + latest_date + "</p>").where(
+        latest_title != "", ""
+    )
+
+    cards = (
+        "<div style='display: flex; align-items: center; border-bottom: 1px solid #ddd; padding-bottom: 1rem;'>"
+        + thumbnail +
+        "<div><h4 style=\"margin: 0;\"><a href=\"" + channel_url + "\" target=\"_blank\" "
+        "style=\"color: rgb(112, 10, 160); text-decoration: none;\">" + _text(page["title"], "Unknown Channel") + "</a></h4>"
+        "<p style=\"margin: 0; font-size: 0.9rem;\">📺 " + _count(page["videoCount"]) + " videos | 👥 "
+        + _count(page["subscriberCount"]) + " subscribers</p>"
+        + latest_line +
+        "<p style=\"margin-top: 4px; font-size: 0.8rem; color: #444;\">" + description + "...</p>"
+        "</div></div>"
+    )
+    return (
+        style +
+        "<div style='display: grid; grid-template-columns: repeat(auto-fill, minmax(320px, 1fr)); gap: 1rem;'>"
+        + "".join(cards.tolist())
+        + "</div>"
+    )
+
+def channel_grid(df: pd.DataFrame, key: str = "channels", page_size: int | None = None):
+    """
+    Render channels as a paginated grid. Only the current page is turned into HTML and sent to
+    the browser, in a single element, so a rerun costs the same for 50 or 5,000 subscriptions.
+    """
+    if df.empty:
+        st.info("No channels to show.")
+        return
+
+    size_key, page_key = f"{key}_page_size", f"{key}_page"
+    default_size = page_size or DEFAULT_PAGE_SIZE
+    sizes = sorted(set(PAGE_SIZES + [default_size]))
+
+    col_page, col_size, col_info = st.columns([1, 1, 2])
+    with col_size:
+        size = st.selectbox("Per page", sizes, index=sizes.index(default_size), key=size_key)
+    pages = max(1, -(-len(df) // size))
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    with col_page:
+        page = st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    start = (int(page) - 1) * size
+    with col_info:
+        st.caption(f"Showing {start + 1}–{min(start + size, len(df))} of {len(df):,} channels")
+
+    st.markdown(render_cards(df.iloc[start:start + size]), unsafe_allow_html=True)
@@ -0,0 +1,33 @@
+# app/components/growth_panel.py
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+import pandas as pd
+import streamlit as st
+
+from backend.history import growth
+
+def growth_panel(df: pd.DataFrame, days: int = 30, top: int = 10):
+    """Show the fastest-growing subscribed channels over the last `days` from the stats history."""
+    with st.expander(f"📈 Fastest-growing channels (last {days} days)"):
+        rates = growth(df["channelId"].tolist(), days=days, limit=top)
+        if rates.empty:
+            st.caption("Not enough history yet. Growth appears after a few syncs.")
+            return
+
+        titles = df.set_index("channelId")["title"]
+        rates["Channel"] = rates["channelId"].map(titles)
+        rates["pctChange"] = rates["pctChange"] * 100
+        st.dataframe(
+            rates[["Channel", "end", "change", "pctChange", "perDay"]].rename(columns={
+                "end": "Subscribers",
+                "change": "Gained",
+                "pctChange": "Growth",
+                "perDay": "Per day",
+            }),
+            hide_index=True,
+            column_config={
+                "Growth": st.column_config.NumberColumn(format="%.2f%%"),
+                "Per day": st.column_config.NumberColumn(format="%.1f"),
+            },
+        )
@@ -0,0 +1,31 @@
+# app/components/inactive_panel.py
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+import pandas as pd
+import streamlit as st
+
+from backend.activity import recommend_unsubscribes
+
+def inactive_panel(df: pd.DataFrame, top: int = 50):
+    """List the most inactive subscriptions as unsubscribe candidates."""
+    with st.expander("🧹 Inactive channels you could unsubscribe from"):
+        candidates = recommend_unsubscribes(df, limit=top)
+        if candidates.empty:
+            st.caption("All your subscriptions look active.")
+            return
+
+        st.caption(f"{len(candidates)} channel(s) scored as inactive. Open a channel to unsubscribe on YouTube.")
+        st.dataframe(
+            candidates[["title", "channelUrl", "inactivityScore", "reason"]].rename(columns={
+                "title": "Channel",
+                "channelUrl": "Link",
+                "inactivityScore": "Inactivity",
+                "reason": "Why",
+            }),
+            hide_index=True,
+            column_config={
+                "Link": st.column_config.LinkColumn(display_text="Open"),
+                "Inactivity": st.column_config.ProgressColumn(min_value=0, max_value=1, format="%.2f"),
+            },
+        )
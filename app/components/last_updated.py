@@ -0,0 +1,31 @@
+# app/components/last_updated.py
+import os
+import sys
+import time
+from datetime import datetime
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+import pandas as pd
+import streamlit as st
+
+from backend.youtube import is_refreshing
+
+def _age(seconds: float) -> str:
+    if seconds < 60:
+        return "just now"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} h ago"
+    return f"{int(seconds // 86400)} d ago"
+
+def last_updated(df: pd.DataFrame, user_email: str):
+    """Caption with the time the shown snapshot was synced, flagged while a background refresh runs."""
+    fetched_at = df.attrs.get("fetched_at")
+    if fetched_at is None:
+        text = "📅 Last updated: not synced yet"
+    else:
+        stamp = datetime.fromtimestamp(fetched_at).strftime("%Y-%m-%d %H:%M:%S")
+        text = f"📅 Last updated: {stamp} ({_age(time.time() - fetched_at)})"
+    if is_refreshing(user_email):
+        text += " · 🔄 Refreshing in the background, reload in a moment for newer data"
+    st.caption(text)
@@ -0,0 +1,32 @@
+# app/components/search_box.py
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+import pandas as pd
+import streamlit as st
+
+from backend.search import search_channels
+
+def search_box(df: pd.DataFrame, user_email: str, key: str = "search", top: int = 10) -> pd.DataFrame:
+    """Search titles and descriptions; returns the matching channels in rank order (or df unchanged)."""
+    text = st.text_input("🔎 Search your subscriptions", placeholder="Type a few letters…", key=key)
+    if not text.strip():
+        return df
+
+    results = search_channels(user_email, text)
+    if not results:
+        st.caption("No matching channels.")
+        return df.iloc[0:0]
+
+    st.markdown(
+        "<div style='margin-bottom: 1rem;'>" + "".join(
+            f"<p style='margin: 0 0 6px 0;'><b>{r['title']}</b><br>"
+            f"<span style='font-size: 0.8rem; color: #444;'>{r['snippet']}</span></p>"
+            for r in results[:top]
+        ) + "</div>",
+        unsafe_allow_html=True,
+    )
+
+    ranked = pd.Series(range(len(results)), index=[r["channelId"] for r in results])
+    matches = df[df["channelId"].isin(ranked.index)]
+    return matches.iloc[ranked.reindex(matches["channelId"]).argsort()]
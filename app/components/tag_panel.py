@@ -0,0 +1,65 @@
+# app/components/tag_panel.py
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+import pandas as pd
+import streamlit as st
+
+from backend.tags import list_tags, tag_channels, untag_channels, delete_tag, channels_with_tags
+
+def tag_filter(df: pd.DataFrame, user_email: str, key: str = "tags") -> pd.DataFrame:
+    """Filter the channel frame by tags and minimum subscribers; the tag lookup runs in SQLite."""
+    tags = list_tags(user_email)
+
+    col_tags, col_subs, col_all = st.columns([3, 1, 1])
+    with col_tags:
+        selected = st.multiselect(
+            "🏷️ Filter by tag",
+            tags["tag"].tolist(),
+            format_func=lambda name: f"{name} ({tags.loc[tags['tag'] == name, 'channels'].iat[0]})",
+            key=f"{key}_filter",
+        )
+    with col_subs:
+        min_subscribers = st.number_input("Min subscribers", min_value=0, step=1000, key=f"{key}_min_subs")
+    with col_all:
+        match_all = st.checkbox("Match all tags", key=f"{key}_match_all")
+
+    if selected:
+        ids = channels_with_tags(user_email, selected, int(min_subscribers), match_all)
+        return df[df["channelId"].isin(ids)]
+    if min_subscribers:
+        return df[df["subscriberCount"] >= min_subscribers]
+    return df
+
+def tag_manager(df: pd.DataFrame, user_email: str, key: str = "tags"):
+    """Create tags and assign them to many channels at once."""
+    with st.expander("🏷️ Manage tags"):
+        tags = list_tags(user_email)
+        if not tags.empty:
+            st.dataframe(
+                tags.rename(columns={"tag": "Tag", "channels": "Channels", "subscribers": "Subscribers", "views": "Views"}),
+                hide_index=True,
+            )
+
+        titles = dict(zip(df["channelId"], df["title"].fillna("Unknown Channel")))
+        with st.form(f"{key}_assign", clear_on_submit=True):
+            name = st.text_input("Tag", placeholder="e.g. Music")
+            channel_ids = st.multiselect("Channels", list(titles), format_func=titles.get)
+            col_add, col_remove = st.columns(2)
+            add = col_add.form_submit_button("➕ Tag channels")
+            remove = col_remove.form_submit_button("➖ Untag channels")
+
+        if (add or remove) and not name.strip():
+            st.warning("⚠️ Enter a tag name.")
+        elif add and channel_ids:
+            added = tag_channels(user_email, name, channel_ids, df)
+            st.success(f"✅ Tagged {added} channel(s) with '{name.strip()}'.")
+        elif remove and channel_ids:
+            removed = untag_channels(user_email, name, channel_ids)
+            st.success(f"✅ Removed '{name.strip()}' from {removed} channel(s).")
+
+        if not tags.empty:
+            doomed = st.selectbox("Delete a tag", [""] + tags["tag"].tolist(), key=f"{key}_delete")
+            if doomed and st.button(f"🗑️ Delete '{doomed}'", key=f"{key}_delete_button"):
+                delete_tag(user_email, doomed)
+                st.rerun()
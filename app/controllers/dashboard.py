@@ -2,8 +2,6 @@
 
 import os
 import sys
-import pandas as pd
-from datetime import datetime
 import streamlit as st
 
 # Ensure import paths are correct for backend modules
@@ -11,6 +9,16 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"
 
 from backend.oauth import get_user_credentials
 from backend.youtube import fetch_subscriptions
+from backend.videos import add_latest_videos
+from backend.cache import invalidate_snapshot
+from backend.models import channel_totals
+from app.components.channel_grid import channel_grid
+from app.components.last_updated import last_updated
+from app.components.growth_panel import growth_panel
+from app.components.inactive_panel import inactive_panel
+from app.components.tag_panel import tag_filter, tag_manager
+from app.components.search_box import search_box
+from utils import metrics
 
 def load_dashboard(user_email, username):
     """Render the YouTufy dashboard for the authenticated user."""
@@ -21,59 +29,37 @@ def load_dashboard(user_email, username):
     st.caption("🔒 Your data is protected · Access granted via Google OAuth (`youtube.readonly`)")
     st.success(f"🎉 Welcome back, {username.capitalize()}!")
 
+    # 🔄 Manual refresh drops the cached snapshot
+    if st.button("🔄 Refresh subscriptions"):
+        invalidate_snapshot(user_email)
+
     # 🔄 Fetch YouTube data
-    with st.spinner("📡 Loading your YouTube subscriptions..."):
+    with st.spinner("📡 Loading your YouTube subscriptions..."), metrics.span("dashboard_fetch", page="controller"), metrics.profile("dashboard_fetch"):
         try:
             creds = get_user_credentials(user_email)
             df = fetch_subscriptions(creds, user_email)
+            df = add_latest_videos(creds, df, user_email, cached_only=True)
         except Exception as e:
             st.error(f"⚠️ Failed to retrieve subscriptions: {e}")
             st.stop()
 
     # 🧪 Validate fetched data
-    if df.empty or not {"statistics", "snippet"}.issubset(df.columns):
+    if df.empty:
         st.warning("⚠️ No valid YouTube subscription data found.")
         st.stop()
 
-    # 🔢 Normalize statistics
-    numeric_cols = ["statistics.subscriberCount", "statistics.videoCount", "statistics.viewCount"]
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df.get(col, pd.Series(0)), errors="coerce").fillna(0)
-
-    df = df[df["snippet"].notna() & df["statistics"].notna()]
-
-    # 📊 Display key metrics
-    st.metric("Total Channels", len(df))
-    st.metric("Total Subscribers", f"{int(df['statistics.subscriberCount'].sum()):,}")
-    st.metric("Total Videos", f"{int(df['statistics.videoCount'].sum()):,}")
-    st.caption(f"📅 Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-    st.markdown("---")
+    # 📊 Display key metrics and channel cards
+    with metrics.span("dashboard_render", page="controller"), metrics.profile("dashboard_render"):
+        totals = channel_totals(df)
+        st.metric("Total Channels", totals["channels"])
+        st.metric("Total Subscribers", f"{totals['subscribers']:,}")
+        st.metric("Total Videos", f"{totals['videos']:,}")
+        last_updated(df, user_email)
+        growth_panel(df)
+        inactive_panel(df)
 
-    # 🔽 Display individual channel cards
-    for _, row in df.iterrows():
-        snippet = row.get("snippet", {})
-        stats = row.get("statistics", {})
-        title = snippet.get("title", "Unknown Channel")
-        channel_url = row.get("channelUrl", "")
-        subs = int(stats.get("subscriberCount", 0))
-        videos = int(stats.get("videoCount", 0))
-        latest = row.get("latestVideoDate", "N/A")
-
-        # 🔗 Clickable channel badge
-        if channel_url:
-            st.markdown(
-                f"""<a href="{channel_url}" target="_blank" style="text-decoration:none;">
-                    <div style="background-color:#8F00FF;padding:10px 15px;border-radius:6px;display:inline-block;margin-bottom:5px;">
-                        <span style="color:white;font-weight:bold;">📺 {title}</span>
-                    </div>
-                </a>""",
-                unsafe_allow_html=True
-            )
-        else:
-            st.subheader(title)
-
-        st.write(f"👥 Subscribers: {subs:,}")
-        st.write(f"🎞️ Videos: {videos:,}")
-        st.write(f"📅 Latest Video: {latest}")
         st.markdown("---")
+
+        # 🔽 Display the current page of channel cards
+        tag_manager(df, user_email)
+        channel_grid(tag_filter(search_box(df, user_email), user_email))
@@ -7,12 +7,6 @@ ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(ROOT_DIR)
 
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-
-from backend.oauth import get_user_credentials, refresh_credentials
-from backend.youtube import fetch_subscriptions
-from app.components.channel_card import channel_card
 
 # Configure Streamlit page
 st.set_page_config(page_title="YouTufy", layout="wide")
@@ -25,33 +19,50 @@ authenticated = st.session_state.get("authenticated", False)
 
 # If user is authenticated, display dashboard
 if user_email and google_creds_json and authenticated:
+    # 📦 Dashboard modules (pandas, the API client, OAuth) load only for signed-in users
+    from backend.oauth import get_user_credentials, refresh_credentials
+    from backend.youtube import fetch_subscriptions
+    from backend.videos import add_latest_videos
+    from backend.cache import invalidate_snapshot
+    from backend.models import channel_totals
+    from app.components.channel_grid import channel_grid
+    from app.components.last_updated import last_updated
+    from app.components.growth_panel import growth_panel
+    from app.components.inactive_panel import inactive_panel
+    from app.components.tag_panel import tag_filter, tag_manager
+    from app.components.search_box import search_box
+    from utils import metrics
+
     st.markdown("<h1 style='font-size:1.8rem; font-weight:bold; color:magenta;'>📺 YouTufy – Your Dashboard</h1>", unsafe_allow_html=True)
     st.caption(f"🔒 Google OAuth Verified · Welcome, {username.capitalize()}!")
 
     creds = refresh_credentials(google_creds_json)
 
-    with st.spinner("📡 Fetching YouTube subscriptions..."):
+    if st.button("🔄 Refresh subscriptions"):
+        invalidate_snapshot(user_email)
+
+    with st.spinner("📡 Fetching YouTube subscriptions..."), metrics.span("dashboard_fetch", page="main"), metrics.profile("dashboard_fetch"):
         df = fetch_subscriptions(creds, user_email)
+        df = add_latest_videos(creds, df, user_email, cached_only=True)
 
-    if df.empty or "snippet" not in df.columns or "statistics" not in df.columns:
+    if df.empty:
         st.warning("⚠️ No subscriptions found or data unavailable.")
         st.stop()
 
-    # Normalize numerical fields
-    for col in ["statistics.subscriberCount", "statistics.videoCount", "statistics.viewCount"]:
-        df[col] = pd.to_numeric(df.get(col, pd.Series(0)), errors="coerce").fillna(0)
-
-    # Metrics summary
-    st.metric("Total Channels", len(df))
-    st.metric("Total Subscribers", f"{int(df['statistics.subscriberCount'].sum()):,}")
-    st.metric("Total Videos", f"{int(df['statistics.videoCount'].sum()):,}")
-    st.caption(f"📅 Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    st.markdown("---")
-
-    # Render channel cards
-    for _, row in df.iterrows():
-        if isinstance(row.get("snippet"), dict):
-            channel_card(row)
+    # Metrics summary and channel cards
+    with metrics.span("dashboard_render", page="main"), metrics.profile("dashboard_render"):
+        totals = channel_totals(df)
+        st.metric("Total Channels", totals["channels"])
+        st.metric("Total Subscribers", f"{totals['subscribers']:,}")
+        st.metric("Total Videos", f"{totals['videos']:,}")
+        last_updated(df, user_email)
+        growth_panel(df)
+        inactive_panel(df)
+        st.markdown("---")
+
+        # Render the current page of channel cards
+        tag_manager(df, user_email)
+        channel_grid(tag_filter(search_box(df, user_email), user_email))
 
 else:
     # Landing page (unauthenticated view)
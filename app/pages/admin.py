@@ -1,22 +1,36 @@
 # app/pages/admin.py
 import os
 import sys
-import sqlite3
 from datetime import datetime, timedelta
 
+import pandas as pd
 import streamlit as st
 
 # Setup import paths for utils
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-from utils.tokens import generate_token
-from utils.emailer import send_registration_email
+from utils.tokens import generate_signed_token
+from utils.emailer import send_registration_email, send_bulk_registration_emails
+from utils.mail_queue import queue_stats
+from backend.quota import DAILY_QUOTA, units_used_today, usage_report
+from backend import db
+from backend.cache import CHANNEL_CACHE_SIZE, channel_cache_size
+from backend.thumbnails import THUMBNAIL_CACHE_SIZE, thumbnail_store_size
+from utils import metrics
 
 # 🔧 Page config
 st.set_page_config(page_title="Admin – Invite Users", layout="centered")
 st.title("🛠️ Admin Panel – Invite Users")
 
-# 📁 Database path from secrets or default
-DB_PATH = st.secrets["USER_DB"]
+# 💾 Invited users are (re)set to unverified with a fresh token
+UPSERT_INVITE_SQL = """
+    INSERT INTO users (email, username, verified, token, token_expiry)
+    VALUES (?, ?, 0, ?, ?)
+    ON CONFLICT(email) DO UPDATE SET
+        username = excluded.username,
+        token = excluded.token,
+        token_expiry = excluded.token_expiry,
+        verified = 0
+"""
 
 # 💌 Invitation Form
 st.markdown("Invite users by email. They will receive a verification link to activate their account.")
@@ -32,28 +46,16 @@ if submit:
     else:
         try:
             # 🔐 Generate token and expiration
-            token = generate_token(email)
+            token = generate_signed_token(email, "verify", ttl=3600)
             expiry = datetime.now() + timedelta(hours=1)
 
             # 💾 Upsert user into database
-            conn = sqlite3.connect(DB_PATH)
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO users (email, username, verified, token, token_expiry)
-                VALUES (?, ?, 0, ?, ?)
-                ON CONFLICT(email) DO UPDATE SET
-                    username = excluded.username,
-                    token = excluded.token,
-                    token_expiry = excluded.token_expiry,
-                    verified = 0
-            """, (
+            db.execute(UPSERT_INVITE_SQL, (
                 email,
                 username or email.split("@")[0],
                 token,
                 expiry.strftime('%Y-%m-%d %H:%M:%S')
             ))
-            conn.commit()
-            conn.close()
 
             # 📬 Send email
             send_registration_email(email, username, token)
@@ -62,3 +64,110 @@ if submit:
         except Exception as e:
             st.error("❌ Failed to invite user.")
             st.exception(e)
+
+# 📨 Bulk Invitations
+st.markdown("---")
+st.subheader("📨 Bulk Invite")
+st.markdown("Paste addresses or upload a CSV with an `email` column. Invitations are queued and sent in the background.")
+
+def parse_invite_emails(raw: str, csv_file) -> tuple[list[str], list[str]]:
+    from email_validator import validate_email, EmailNotValidError  # only needed when a bulk invite is submitted
+
+    candidates = raw.replace(",", "\n").splitlines()
+    if csv_file is not None:
+        candidates += pd.read_csv(csv_file, usecols=["email"], dtype=str)["email"].dropna().tolist()
+
+    valid, invalid, seen = [], [], set()
+    for candidate in (c.strip() for c in candidates):
+        if not candidate:
+            continue
+        try:
+            address = validate_email(candidate, check_deliverability=False).normalized
+        except EmailNotValidError:
+            invalid.append(candidate)
+            continue
+        if address not in seen:
+            seen.add(address)
+            valid.append(address)
+    return valid, invalid
+
+with st.form("bulk_invite_form"):
+    raw_emails = st.text_area("📧 Emails (one per line or comma-separated)")
+    csv_file = st.file_uploader("📄 CSV file", type="csv")
+    bulk_submit = st.form_submit_button("Queue Invitations")
+
+if bulk_submit:
+    emails, invalid = parse_invite_emails(raw_emails, csv_file)
+    if invalid:
+        st.warning(f"⚠️ Skipped {len(invalid)} invalid address(es): {', '.join(invalid[:10])}")
+    if not emails:
+        st.warning("⚠️ No valid emails to invite.")
+    else:
+        try:
+            expiry = (datetime.now() + timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+            invites = [(e, e.split("@")[0], generate_signed_token(e, "verify", ttl=3600)) for e in emails]
+
+            # 💾 One transaction for all users, one for all queued emails
+            db.execute_many(UPSERT_INVITE_SQL, [(e, name, token, expiry) for e, name, token in invites])
+            queued = send_bulk_registration_emails(invites)
+            st.success(f"✅ Queued {queued:,} invitation(s)")
+        except Exception as e:
+            st.error("❌ Failed to queue invitations.")
+            st.exception(e)
+
+stats = queue_stats()
+st.caption(
+    f"📬 Mail queue · pending: {stats.get('pending', 0) + stats.get('sending', 0):,} · "
+    f"sent: {stats.get('sent', 0):,} · failed: {stats.get('failed', 0):,}"
+)
+
+# 📊 YouTube API Quota Ledger
+st.markdown("---")
+st.subheader("📊 YouTube API Quota")
+
+used = units_used_today()
+st.metric("Units used today (Pacific time)", f"{used:,} / {DAILY_QUOTA:,}")
+st.progress(min(used / DAILY_QUOTA, 1.0) if DAILY_QUOTA else 1.0)
+
+ledger = pd.DataFrame(usage_report(days=7), columns=["Day", "User", "Method", "Calls", "Units"])
+if ledger.empty:
+    st.info("No API calls recorded in the last 7 days.")
+else:
+    st.markdown("**Units per day and method**")
+    st.dataframe(ledger.pivot_table(index="Day", columns="Method", values="Units", aggfunc="sum", fill_value=0))
+    st.markdown("**Top users today**")
+    today = ledger[ledger["Day"] == ledger["Day"].max()]
+    st.dataframe(today.groupby("User")[["Calls", "Units"]].sum().sort_values("Units", ascending=False))
+
+# ⏱️ Latency and call metrics (this server process, since start)
+st.markdown("---")
+st.subheader("⏱️ Performance")
+
+spans = pd.DataFrame(metrics.summary())
+if spans.empty:
+    st.info("No timings recorded since the server started.")
+else:
+    # Latency histograms are in seconds, count histograms (API calls per sync) are plain numbers
+    latency = spans[spans["name"].str.endswith("_seconds")].copy()
+    latency["name"] = latency["name"].str.removesuffix("_seconds")
+    latency[["mean", "p50", "p95", "p99"]] = (latency[["mean", "p50", "p95", "p99"]] * 1000).round(1)
+    st.markdown("**Latency (ms, recent window)**")
+    st.dataframe(latency.rename(columns={"name": "Span", "labels": "Labels", "count": "Count"}), hide_index=True)
+
+    counts = spans[~spans["name"].str.endswith("_seconds")]
+    if not counts.empty:
+        st.markdown("**Distributions**")
+        st.dataframe(counts.rename(columns={"name": "Metric", "labels": "Labels", "count": "Count"}), hide_index=True)
+
+totals = pd.DataFrame(metrics.counters())
+if not totals.empty:
+    st.markdown("**Counters**")
+    st.dataframe(totals.rename(columns={"name": "Counter", "labels": "Labels", "value": "Value"}), hide_index=True)
+
+thumbnail_urls, thumbnail_bytes = thumbnail_store_size()
+st.caption(
+    f"🖼️ Thumbnail store: {thumbnail_urls:,} / {THUMBNAIL_CACHE_SIZE:,} URLs, {thumbnail_bytes / 2 ** 20:.1f} MB · "
+    f"📺 Shared channel cache: {channel_cache_size():,} / {CHANNEL_CACHE_SIZE:,} channels · "
+    f"📤 Prometheus metrics file: `{metrics.metrics_file_path()}` · "
+    f"🔬 Profiling: {'on, saving to `' + str(metrics.PROFILE_DIR) + '`' if metrics.PROFILE_REQUESTS else 'off (set PROFILE_REQUESTS)'}"
+)
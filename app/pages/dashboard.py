@@ -4,12 +4,9 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 import json
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-from backend.oauth import get_flow, get_credentials_from_code, refresh_credentials, get_auth_flow
+from backend.oauth import get_flow, get_credentials_from_code, refresh_credentials, get_auth_flow, save_user_credentials
 from backend.auth import store_oauth_credentials
-from backend.youtube import fetch_subscriptions
-from app.components.channel_card import channel_card
+from utils import metrics
 
 # ✅ Redirect URI (not used directly, just for clarity)
 REDIRECT_URI = "https://youtufy-one.streamlit.app/pages/dashboard.py"
@@ -50,6 +47,7 @@ elif st.query_params.get("code") and not authenticated:
 
         # Persist credentials
         store_oauth_credentials(creds, user_email)
+        save_user_credentials(user_email, creds)  # lets the background worker refresh this user
 
         st.success(f"✅ Logged in as {user_email}. Reloading...")
         st.rerun()
@@ -80,32 +78,49 @@ if not st.session_state.get("authenticated", False):
     """, unsafe_allow_html=True)
     st.stop()
 
+# 📦 Data and UI modules (pandas, the API client) are only loaded once the user is signed in
+from backend.youtube import fetch_subscriptions
+from backend.videos import add_latest_videos
+from backend.cache import invalidate_snapshot
+from backend.models import channel_totals
+from app.components.channel_grid import channel_grid
+from app.components.last_updated import last_updated
+from app.components.growth_panel import growth_panel
+from app.components.inactive_panel import inactive_panel
+from app.components.tag_panel import tag_filter, tag_manager
+from app.components.search_box import search_box
+
 # ✅ Authenticated UI
 st.markdown("<h1 style='font-size:1.8rem; font-weight:bold; color:magenta;'>YouTufy – Your YouTube Subscriptions Dashboard</h1>", unsafe_allow_html=True)
 st.caption("🔒 Google OAuth Verified · Your data is protected")
 st.success(f"🎉 Welcome back, {st.session_state.username.capitalize()}!")
 
+# 🔄 Manual refresh drops the cached snapshot
+if st.button("🔄 Refresh subscriptions"):
+    invalidate_snapshot(user_email)
+
 # 📡 Fetch YouTube subscriptions
-with st.spinner("📡 Loading your YouTube subscriptions..."):
+with st.spinner("📡 Loading your YouTube subscriptions..."), metrics.span("dashboard_fetch", page="dashboard"), metrics.profile("dashboard_fetch"):
     df = fetch_subscriptions(creds, user_email)
+    df = add_latest_videos(creds, df, user_email, cached_only=True)
 
-# ✅ Validate and clean data
-if df.empty or "snippet" not in df.columns or "statistics" not in df.columns:
+# ✅ Validate data
+if df.empty:
     st.warning("⚠️ No subscriptions found or API returned invalid data.")
     st.stop()
 
-for col in ["statistics.subscriberCount", "statistics.videoCount", "statistics.viewCount"]:
-    df[col] = pd.to_numeric(df.get(col, pd.Series(0)), errors="coerce").fillna(0)
-
-# 📊 Metrics
-st.metric("Total Channels", len(df))
-st.metric("Total Subscribers", f"{int(df['statistics.subscriberCount'].sum()):,}")
-st.metric("Total Videos", f"{int(df['statistics.videoCount'].sum()):,}")
-st.caption(f"📅 Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-
-st.markdown("---")
-
-# 🖥️ Render each channel using channel_card
-for _, row in df.iterrows():
-    if isinstance(row.get("snippet"), dict):
-        channel_card(row)
+# 📊 Metrics and channel cards
+with metrics.span("dashboard_render", page="dashboard"), metrics.profile("dashboard_render"):
+    totals = channel_totals(df)
+    st.metric("Total Channels", totals["channels"])
+    st.metric("Total Subscribers", f"{totals['subscribers']:,}")
+    st.metric("Total Videos", f"{totals['videos']:,}")
+    last_updated(df, user_email)
+    growth_panel(df)
+    inactive_panel(df)
+
+    st.markdown("---")
+
+    # 🖥️ Render the current page of channel cards
+    tag_manager(df, user_email)
+    channel_grid(tag_filter(search_box(df, user_email), user_email))
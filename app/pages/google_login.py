@@ -3,17 +3,15 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 import streamlit as st
-from dotenv import load_dotenv
 from backend.oauth import (
     get_flow,
     get_auth_flow,
     get_credentials_from_code,
-    refresh_credentials
+    refresh_credentials,
+    save_user_credentials
 )
 from backend.auth import store_oauth_credentials
 
-load_dotenv()
-
 REDIRECT_URI = st.secrets.get("OAUTH_REDIRECT_URI", "https://youtufy-one.streamlit.app/main")
 
 st.set_page_config(page_title="Google Login – YouTufy", layout="centered")
@@ -37,6 +35,7 @@ if code and not st.session_state.get("authenticated"):
         st.session_state["authenticated"] = True
 
         store_oauth_credentials(creds, user_email)
+        save_user_credentials(user_email, creds)  # lets the background worker refresh this user
 
         st.success(f"✅ Logged in as {user_email}. Redirecting...")
         st.switch_page("main")
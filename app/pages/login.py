@@ -3,10 +3,7 @@ import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 import streamlit as st
-from dotenv import load_dotenv
-from backend.auth import validate_user, get_user_by_email
-
-load_dotenv()
+from backend.auth import authenticate
 
 st.set_page_config(page_title="Login – YouTufy", layout="centered")
 st.title("🔐 Login to YouTufy")
@@ -20,17 +17,19 @@ with st.form("login_form"):
 if submitted:
     if not email or not password:
         st.error("❗ Please fill in all fields.")
-    elif not get_user_by_email(email):
+        st.stop()
+
+    # One database round trip; the password hash is checked off the script thread
+    status, user_data = authenticate(email, password)
+    if status == "unknown":
         st.warning("⚠️ No user found with this email.")
-    elif not validate_user(email, password):
+    elif status == "invalid":
         st.error("❌ Invalid email or password.")
+    elif status == "unverified":
+        st.warning("⚠️ Email not verified. Please check your inbox.")
     else:
-        user_data = get_user_by_email(email)
-        if user_data[4] == 0:
-            st.warning("⚠️ Email not verified. Please check your inbox.")
-            st.stop()
-
+        username = user_data["username"] or email.split("@")[0]
         st.session_state["user"] = email
-        st.session_state["username"] = user_data[1]
-        st.success(f"🎉 Welcome back, {user_data[1].capitalize()}!")
+        st.session_state["username"] = username
+        st.success(f"🎉 Welcome back, {username.capitalize()}!")
         st.switch_page("main")
@@ -2,37 +2,23 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-import sqlite3
 import streamlit as st
-from dotenv import load_dotenv
-from utils.tokens import generate_token
+from utils.tokens import generate_signed_token
 from utils.emailer import send_registration_email
 from backend.auth import hash_password  # reuse existing hashing logic
-
-# 🔧 Load environment
-load_dotenv()
-DB_PATH = st.secrets["USER_DB"]
+from backend import db
 
 # 🔍 Check if user already exists
 def user_exists(email: str) -> bool:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT 1 FROM users WHERE email = ?", (email,))
-    exists = cur.fetchone() is not None
-    conn.close()
-    return exists
+    return db.query_one("SELECT 1 FROM users WHERE email = ?", (email,)) is not None
 
 # 🧾 Insert user into DB (unverified by default)
 def register_user(email: str, username: str, password: str):
     hashed_pw = hash_password(password)
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("""
+    db.execute("""
         INSERT INTO users (email, username, password, verified)
         VALUES (?, ?, ?, 0)
     """, (email, username, hashed_pw))
-    conn.commit()
-    conn.close()
 
 # 🖥️ Page UI
 st.set_page_config(page_title="Register – YouTufy", layout="centered")
@@ -57,8 +43,8 @@ if submitted:
         st.warning("⚠️ Email already registered. Try logging in.")
     else:
         try:
+            token = generate_signed_token(email, "verify")
             register_user(email, username, password)
-            token = generate_token(email)
             send_registration_email(email, username, token)
             st.success("✅ Registration successful! Check your email to verify your account.")
         except Exception as e:
@@ -1,18 +1,13 @@
 # app/pages/reset_password.py
 import sys
 import os
-import sqlite3
 import streamlit as st
-from dotenv import load_dotenv
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
-from utils.tokens import generate_token
+from utils.tokens import generate_signed_token
 from utils.emailer import send_password_reset_email
-
-# 🔧 Environment Setup
-load_dotenv()
-DB_PATH = st.secrets["USER_DB"]
+from backend import db
 
 # 🎨 Page Setup
 st.set_page_config(page_title="Reset Password – YouTufy", layout="centered")
@@ -21,12 +16,7 @@ st.markdown("Enter your registered email to receive a password reset link.")
 
 # 🔁 Check if user exists
 def user_exists(email: str) -> bool:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT 1 FROM users WHERE email = ?", (email,))
-    found = cur.fetchone() is not None
-    conn.close()
-    return found
+    return db.query_one("SELECT 1 FROM users WHERE email = ?", (email,)) is not None
 
 # 📩 Password Reset Form
 with st.form("reset_form"):
@@ -40,7 +30,7 @@ if submitted:
         st.warning("⚠️ No account found with that email.")
     else:
         try:
-            token = generate_token(email)
+            token = generate_signed_token(email, "reset")
             send_password_reset_email(email, token)
             st.success("✅ Reset link sent! Please check your email.")
         except Exception as e:
@@ -1,19 +1,18 @@
 # app/pages/verify_token.py
 import os
 import sys
-import sqlite3
 from datetime import datetime
 import streamlit as st
 
 # Setup system path for utility imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from utils.tokens import verify_token
+from utils.tokens import decode_signed_token
+from backend import db
 
 # 🔧 Page & Environment Setup
 st.set_page_config(page_title="Verify Email – YouTufy", layout="centered")
 st.title("🔐 Email Verification")
 
-DB_PATH = st.secrets["USER_DB"]
 token = st.query_params.get("token")
 
 if not token:
@@ -22,11 +21,12 @@ if not token:
 
 # 📌 Handle Verification Logic
 try:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    cur.execute("SELECT email, token_expiry, verified FROM users WHERE token = ?", (token,))
-    row = cur.fetchone()
+    # Signed tokens carry the email and expiry themselves; legacy tokens need the token lookup
+    signed_email = decode_signed_token(token, "verify")
+    if signed_email:
+        row = db.query_one("SELECT email, NULL, verified FROM users WHERE email = ?", (signed_email,))
+    else:
+        row = db.query_one("SELECT email, token_expiry, verified FROM users WHERE token = ?", (token,))
 
     if not row:
         st.error("❌ Invalid or unknown verification token.")
@@ -45,8 +45,7 @@ try:
             st.error("⏰ This token has expired. Please request a new invitation.")
             st.stop()
 
-    cur.execute("UPDATE users SET verified = 1 WHERE email = ?", (email,))
-    conn.commit()
+    db.execute("UPDATE users SET verified = 1 WHERE email = ?", (email,))
 
     st.success(f"✅ Email verified successfully: **{email}**")
     st.info("You can now log in to access your dashboard.")
@@ -57,6 +56,3 @@ try:
 except Exception as e:
     st.error("❌ An error occurred during verification.")
     st.exception(e)
-
-finally:
-    conn.close()
@@ -0,0 +1,173 @@
+# backend/activity.py
+"""
+Inactive-channel scoring for unsubscribe recommendations.
+
+Each channel gets an inactivity score in [0, 1] built from three signals:
+- recency: days since its latest upload
+- cadence: uploads per month (from the statistics history, else its lifetime average)
+- growth: subscriber change over the last 30 days
+
+Cadence and growth need history queries, so they are kept per channel in the cache DB with a
+signature of the inputs they came from. Only channels whose signature changed (or whose features
+are older than ACTIVITY_FEATURE_TTL) are recomputed, at most ACTIVITY_MAX_RESCORE per call;
+the final score is a vectorized pass over the stored features.
+"""
+import json
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from backend import db
+from backend.cache import CACHE_DB
+from backend import history
+
+ACTIVITY_FEATURE_TTL = int(st.secrets.get("ACTIVITY_FEATURE_TTL", 86400))  # Default: 24 hours
+ACTIVITY_MAX_RESCORE = int(st.secrets.get("ACTIVITY_MAX_RESCORE", 2000))   # per call, bounds the work per user
+ACTIVITY_THRESHOLD = float(st.secrets.get("ACTIVITY_THRESHOLD", 0.7))
+
+# Weights of the three signals in the final score
+WEIGHTS = {"recency": 0.6, "cadence": 0.25, "growth": 0.15}
+RECENCY_HORIZON_DAYS = 365   # no upload for a year counts as fully inactive
+CADENCE_WINDOW_DAYS = 90
+MIN_HISTORY_DAYS = 14        # shorter histories say little about upload cadence
+
+db.register_migrations(CACHE_DB, [
+    ("cache_003_channel_activity", """
+        CREATE TABLE IF NOT EXISTS channel_activity (
+            channel_id        TEXT PRIMARY KEY,
+            signature         TEXT NOT NULL,
+            uploads_per_month REAL,
+            subscriber_growth REAL,
+            computed_at       REAL NOT NULL
+        );
+    """),
+])
+
+def _signature(df: pd.DataFrame) -> pd.Series:
+    latest = df["latestVideoDate"].astype("string").fillna("") if "latestVideoDate" in df else ""
+    return df["videoCount"].astype("string") + ":" + df["subscriberCount"].astype("string") + ":" + latest
+
+def _load_features(channel_ids: list[str]) -> pd.DataFrame:
+    try:
+        with db.connection(CACHE_DB) as conn:
+            return pd.read_sql_query("""
+                SELECT a.channel_id AS channelId, a.signature, a.uploads_per_month, a.subscriber_growth, a.computed_at
+                FROM json_each(?) j JOIN channel_activity a ON a.channel_id = j.value
+            """, conn, params=(json.dumps(channel_ids),))
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read channel activity: {e}")
+        return pd.DataFrame(columns=["channelId", "signature", "uploads_per_month", "subscriber_growth", "computed_at"])
+
+def _compute_features(channels: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cadence and growth for the given channels, two history queries for the whole set.
+    """
+    ids = channels["channelId"].tolist()
+    videos = history.growth(ids, days=CADENCE_WINDOW_DAYS, metric="videos")
+    videos = videos[videos["elapsedDays"] >= MIN_HISTORY_DAYS]
+    uploads = videos.set_index("channelId")["perDay"] * 30
+    growth = history.growth(ids, days=30, metric="subscribers").set_index("channelId")["pctChange"]
+
+    # Channels without enough history fall back to their lifetime average upload rate
+    age_months = ((pd.Timestamp.now(tz="UTC") - channels["publishedAt"]).dt.days / 30).clip(lower=1)
+    lifetime = (channels["videoCount"] / age_months).set_axis(channels["channelId"])
+
+    features = pd.DataFrame({"channelId": ids})
+    features["uploads_per_month"] = features["channelId"].map(uploads).fillna(features["channelId"].map(lifetime))
+    features["subscriber_growth"] = features["channelId"].map(growth)
+    return features
+
+def _save_features(features: pd.DataFrame):
+    now = time.time()
+    try:
+        db.execute_many("""
+            INSERT OR REPLACE INTO channel_activity
+                (channel_id, signature, uploads_per_month, subscriber_growth, computed_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, [
+            (cid, sig, None if pd.isna(upm) else float(upm), None if pd.isna(g) else float(g), now)
+            for cid, sig, upm, g in features[["channelId", "signature", "uploads_per_month", "subscriber_growth"]].itertuples(index=False)
+        ], path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to write channel activity: {e}")
+
+def refresh_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return stored features for every channel in df, recomputing only the ones whose inputs changed.
+    """
+    signatures = _signature(df).set_axis(df["channelId"])
+    stored = _load_features(df["channelId"].tolist()).set_index("channelId")
+
+    stale = (
+        signatures.index.to_series().map(stored["signature"]).ne(signatures)
+        | signatures.index.to_series().map(stored["computed_at"]).fillna(0).lt(time.time() - ACTIVITY_FEATURE_TTL)
+    )
+    stale_ids = stale[stale].index[:ACTIVITY_MAX_RESCORE]
+
+    if len(stale_ids):
+        fresh = _compute_features(df[df["channelId"].isin(stale_ids)])
+        fresh["signature"] = fresh["channelId"].map(signatures)
+        _save_features(fresh)
+        stored = pd.concat([stored.drop(index=stale_ids, errors="ignore"), fresh.set_index("channelId")])
+
+    return stored.reindex(df["channelId"])
+
+def score_channels(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score every channel of a normalized frame (with latest-video columns); most inactive first.
+    Columns: channelId, title, channelUrl, inactivityScore, daysSinceUpload, uploadsPerMonth,
+    subscriberGrowth, reason.
+    """
+    columns = ["channelId", "title", "channelUrl", "inactivityScore", "daysSinceUpload",
+               "uploadsPerMonth", "subscriberGrowth", "reason"]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    features = refresh_features(df)
+    now = pd.Timestamp.now(tz="UTC")
+
+    latest = df["latestVideoDate"] if "latestVideoDate" in df else pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns, UTC]")
+    days = (now - latest).dt.days.to_numpy(dtype="float64", na_value=np.nan)
+    no_videos = df["videoCount"].to_numpy() == 0
+    uploads = features["uploads_per_month"].to_numpy(dtype="float64", na_value=np.nan)
+    growth = features["subscriber_growth"].to_numpy(dtype="float64", na_value=np.nan)
+
+    # Channels that never uploaded are fully inactive; an unknown latest upload is neutral
+    recency = np.where(no_videos, 1.0, np.where(np.isnan(days), 0.5, np.clip(days / RECENCY_HORIZON_DAYS, 0, 1)))
+    cadence = 1 / (1 + np.nan_to_num(uploads, nan=0.0))
+    # Shrinking or flat channels score 1, channels growing 5%+ a month score 0; unknown is neutral
+    growth_signal = np.where(np.isnan(growth), 0.5, np.clip(1 - np.nan_to_num(growth) / 0.05, 0, 1))
+
+    score = WEIGHTS["recency"] * recency + WEIGHTS["cadence"] * cadence + WEIGHTS["growth"] * growth_signal
+
+    months = pd.Series(np.nan_to_num(days) // 30).astype("int64").astype(str).to_numpy()
+    reason = np.select(
+        [no_videos, np.isnan(days), days >= 60],
+        ["No uploads", "Latest upload unknown", "No uploads in " + months + " months"],
+        default="Uploaded recently",
+    )
+    reason = np.where(growth < 0, reason + " · losing subscribers", reason)
+
+    scored = pd.DataFrame({
+        "channelId": df["channelId"].to_numpy(),
+        "title": df["title"].to_numpy(),
+        "channelUrl": df["channelUrl"].to_numpy(),
+        "inactivityScore": score.round(3),
+        "daysSinceUpload": pd.array(days, dtype="Int64"),
+        "uploadsPerMonth": uploads.round(2),
+        "subscriberGrowth": growth,
+        "reason": reason,
+    })
+    return scored.sort_values("inactivityScore", ascending=False, ignore_index=True)
+
+def recommend_unsubscribes(df: pd.DataFrame, threshold: float | None = None, limit: int | None = None) -> pd.DataFrame:
+    """
+    Channels whose inactivity score is at or above the threshold, most inactive first.
+    """
+    threshold = ACTIVITY_THRESHOLD if threshold is None else threshold
+    scored = score_channels(df)
+    recommended = scored[scored["inactivityScore"] >= threshold]
+    return recommended.head(limit) if limit else recommended
@@ -1,29 +1,128 @@
 # backend/auth.py
 
 import os
+import time
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING
 import streamlit as st
-import sqlite3
-from dotenv import load_dotenv
-from werkzeug.security import generate_password_hash, check_password_hash
 
-load_dotenv()
+from backend import db
+from backend.db import DB_PATH
+from utils import metrics
+from utils.tokens import consume_signed_token, decode_signed_token
 
-DB_PATH = st.secrets.get("USER_DB", "data/YouTufy_users.db")
+# werkzeug and the process pool machinery are imported on the first hash, not when a page loads
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+# 🔐 Work factor for new hashes; stored hashes using anything else are upgraded on next login
+PASSWORD_HASH_METHOD = st.secrets.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+
+# Hashing runs in worker processes so a login burst doesn't hold the GIL of the Streamlit server
+PASSWORD_HASH_WORKERS = int(st.secrets.get("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+
+_hash_pool = None
+_hash_pool_lock = threading.Lock()
+
+def _get_hash_pool() -> "ProcessPoolExecutor | None":
+    global _hash_pool
+    if PASSWORD_HASH_WORKERS <= 0:
+        return None
+    with _hash_pool_lock:
+        if _hash_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            # forkserver avoids forking the multi-threaded Streamlit process
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _hash_pool = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context(method),
+            )
+        return _hash_pool
+
+def configure_hash_pool(workers: int):
+    """
+    Resize the hashing pool (0 = hash inline on the calling thread).
+    """
+    global _hash_pool, PASSWORD_HASH_WORKERS
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=True)
+            _hash_pool = None
+        PASSWORD_HASH_WORKERS = workers
+
+def _run_hash(op: str, fn, *args):
+    with metrics.span("auth_password_hash", op=op):
+        return _run_hash_in_pool(fn, *args)
+
+def _run_hash_in_pool(fn, *args):
+    global _hash_pool
+    pool = _get_hash_pool()
+    if pool is None:
+        return fn(*args)
+
+    from concurrent.futures.process import BrokenProcessPool
+    try:
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); start a fresh pool next time and hash inline now
+        with _hash_pool_lock:
+            _hash_pool = None
+        return fn(*args)
 
 def hash_password(password: str) -> str:
-    return generate_password_hash(password)
+    from werkzeug.security import generate_password_hash
+    return _run_hash("hash", generate_password_hash, password, PASSWORD_HASH_METHOD)
 
 def check_password(hashed_password: str, password: str) -> bool:
-    return check_password_hash(hashed_password, password)
+    from werkzeug.security import check_password_hash
+    return _run_hash("check", check_password_hash, hashed_password, password)
+
+@lru_cache(maxsize=1)
+def _hash_prefix() -> str:
+    """
+    The method prefix werkzeug writes for PASSWORD_HASH_METHOD, with defaults filled in
+    ("scrypt" becomes "scrypt:32768:8:1"), computed once from a throwaway hash.
+    """
+    from werkzeug.security import generate_password_hash
+    return generate_password_hash("x", PASSWORD_HASH_METHOD).split("$", 1)[0]
+
+def needs_rehash(hashed_password: str) -> bool:
+    return hashed_password.split("$", 1)[0] != _hash_prefix()
+
+@metrics.timed("auth_login")
+def authenticate(email: str, password: str) -> tuple[str, object]:
+    """
+    Look up and verify a user in a single query.
+    Returns (status, user) where status is "ok", "unknown", "invalid" or "unverified";
+    user is the row (email, username, password, verified) when the email exists.
+    Hashes made with an outdated work factor are transparently upgraded.
+    """
+    status, user = _authenticate(email, password)
+    metrics.increment("auth_logins_total", status=status)
+    return status, user
+
+def _authenticate(email: str, password: str) -> tuple[str, object]:
+    user = db.query_one("SELECT email, username, password, verified FROM users WHERE email = ?", (email,))
+    if user is None:
+        return "unknown", None
+    if not user["password"] or not check_password(user["password"], password):
+        return "invalid", user
+    if needs_rehash(user["password"]):
+        try:
+            db.execute("UPDATE users SET password = ? WHERE email = ?", (hash_password(password), email))
+        except Exception as e:
+            print(f"❌ Failed to upgrade password hash for {email}: {e}")
+    if not user["verified"]:
+        return "unverified", user
+    return "ok", user
 
 def validate_user(email: str, password: str) -> bool:
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT password FROM users WHERE email = ?", (email,))
-        row = cursor.fetchone()
-        conn.close()
-
+        row = db.query_one("SELECT password FROM users WHERE email = ?", (email,))
         if row and check_password(row[0], password):
             return True
     except Exception as e:
@@ -33,34 +132,66 @@ def validate_user(email: str, password: str) -> bool:
 
 def get_user_by_email(email: str):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("SELECT email, password, verified, token, token_expiry FROM users WHERE email = ?", (email,))
-        user = cursor.fetchone()
-        conn.close()
-        return user
+        return db.query_one(
+            "SELECT email, password, verified, token, token_expiry FROM users WHERE email = ?", (email,)
+        )
     except Exception as e:
         print(f"❌ Error fetching user: {e}")
         return None
 
 def store_oauth_credentials(creds, user_email: str):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT OR REPLACE INTO users (email, google_creds)
-            VALUES (?, ?)
-        """, (user_email, creds.to_json()))
-        conn.commit()
-        conn.close()
+        with db.transaction() as conn:
+            # Google has verified the address; keep any existing username/password untouched
+            conn.execute("""
+                INSERT INTO users (email, username, verified) VALUES (?, ?, 1)
+                ON CONFLICT(email) DO UPDATE SET verified = 1
+            """, (user_email, user_email.split("@")[0]))
+            conn.execute("""
+                INSERT INTO user_credentials (email, creds_json, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(email) DO UPDATE SET
+                    creds_json = excluded.creds_json,
+                    updated_at = excluded.updated_at
+            """, (user_email, creds.to_json(), time.time()))
     except Exception as e:
         print(f"❌ Failed to store OAuth credentials: {e}")
 
+def update_user_password(email: str, new_password: str) -> bool:
+    return db.execute(
+        "UPDATE users SET password = ? WHERE email = ?", (hash_password(new_password), email)
+    ) > 0
+
+def reset_password_with_token(token: str, new_password: str) -> str | None:
+    """
+    Set a new password from a single-use reset link and return the account's email, or None if
+    the link is invalid, expired or already used. The link's nonce is recorded in the same
+    transaction as the update, so a failed update leaves the link usable.
+    """
+    email = decode_signed_token(token, "reset")
+    if email is None:
+        return None
+    hashed = hash_password(new_password)  # slow; done before taking the write lock
+
+    try:
+        with db.transaction() as conn:
+            if consume_signed_token(token, "reset", conn=conn) is None:
+                return None
+            if conn.execute("UPDATE users SET password = ? WHERE email = ?", (hashed, email)).rowcount == 0:
+                raise LookupError(email)
+    except LookupError:
+        print(f"❌ Password reset for unknown account {email}")
+        return None
+    return email
+
 def get_email_from_token(token: str) -> str | None:
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT email FROM users WHERE token = ?", (token,))
-    row = cur.fetchone()
-    conn.close()
-    return row[0] if row else None
+    return db.query_value("SELECT email FROM users WHERE token = ?", (token,))
 
+def purge_expired_tokens() -> int:
+    """
+    Clear verification/reset tokens past their expiry (uses the token_expiry index).
+    """
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    db.execute("DELETE FROM used_tokens WHERE expires_at < ?", (int(time.time()),))
+    return db.execute(
+        "UPDATE users SET token = NULL, token_expiry = NULL WHERE token_expiry < ?", (now,)
+    )
@@ -0,0 +1,78 @@
+# backend/batch.py
+
+import time
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+# The YouTube Data API accepts up to 50 sub-requests per batch call
+MAX_BATCH_SIZE = 50
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, HttpError):
+        return error.resp.status in RETRYABLE_STATUSES
+    return isinstance(error, (OSError, httplib2.HttpLib2Error))
+
+def execute_batch(
+    service,
+    requests: dict[str, object],
+    http=None,
+    max_retries: int = 2,
+    batch_size: int = MAX_BATCH_SIZE,
+    on_send=None,
+) -> tuple[dict[str, dict], dict[str, Exception]]:
+    """
+    Execute many API requests as multipart batch calls of up to batch_size sub-requests.
+    Requests are keyed (e.g. by channel ID) and each response is routed back to its key.
+    Failed sub-requests are retried on their own with backoff; the rest of the batch is kept.
+    on_send(n) is called before each round trip with its number of sub-requests (quota accounting);
+    if it raises, the exception propagates and nothing more is sent.
+    Returns (responses by key, errors by key).
+    """
+    responses = {}
+    errors = {}
+    pending = dict(requests)
+
+    for attempt in range(max_retries + 1):
+        retry = {}
+        keys = list(pending)
+
+        for i in range(0, len(keys), batch_size):
+            chunk = keys[i:i + batch_size]
+
+            def callback(request_id, response, exception):
+                if exception is None:
+                    responses[request_id] = response
+                    errors.pop(request_id, None)
+                elif _is_retryable(exception) and attempt < max_retries:
+                    retry[request_id] = pending[request_id]
+                else:
+                    errors[request_id] = exception
+
+            if on_send is not None:
+                on_send(len(chunk))
+
+            batch = service.new_batch_http_request(callback=callback)
+            for key in chunk:
+                if http is not None:
+                    # Sub-requests take their Authorization header from their own transport
+                    pending[key].http = http
+                batch.add(pending[key], request_id=key)
+
+            try:
+                batch.execute(http=http)
+            except Exception as e:
+                # The whole round trip failed, so every sub-request in it needs another go
+                for key in chunk:
+                    if _is_retryable(e) and attempt < max_retries:
+                        retry[key] = pending[key]
+                    else:
+                        errors[key] = e
+
+        if not retry:
+            break
+        pending = retry
+        time.sleep(0.5 * 2 ** attempt)
+
+    return responses, errors
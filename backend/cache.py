@@ -0,0 +1,344 @@
+# backend/cache.py
+
+import json
+import sqlite3
+import time
+
+import streamlit as st
+
+from backend import db
+
+# 📁 Cache database (separate from the users DB so it can be wiped safely)
+CACHE_DB = st.secrets.get("CACHE_DB", "data/YouTufy_cache.db")
+SNAPSHOT_TTL = int(st.secrets.get("SUBSCRIPTIONS_TTL", 900))  # Default: 15 minutes
+
+# 🌐 Shared channel cache: one entry per channel, reused by every user who follows it
+CHANNEL_SNIPPET_TTL = int(st.secrets.get("CHANNEL_SNIPPET_TTL", 7 * 86400))      # title, thumbnails, uploads playlist
+CHANNEL_STATISTICS_TTL = int(st.secrets.get("CHANNEL_STATISTICS_TTL", 3600))     # subscriber/video/view counts
+CHANNEL_CACHE_SIZE = int(st.secrets.get("CHANNEL_CACHE_SIZE", 200000))           # least recently used beyond this are evicted
+
+db.register_migrations(CACHE_DB, [
+    ("cache_001_subscriptions", """
+        CREATE TABLE IF NOT EXISTS subscription_snapshots (
+            user_email TEXT PRIMARY KEY,
+            channels   TEXT NOT NULL,
+            fetched_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS subscription_pages (
+            user_email      TEXT NOT NULL,
+            page_index      INTEGER NOT NULL,
+            page_token      TEXT,
+            etag            TEXT,
+            next_page_token TEXT,
+            items           TEXT NOT NULL,
+            PRIMARY KEY (user_email, page_index)
+        );
+        CREATE TABLE IF NOT EXISTS sync_state (
+            user_email     TEXT PRIMARY KEY,
+            full_synced_at REAL NOT NULL
+        );
+    """),
+    ("cache_002_latest_videos", """
+        CREATE TABLE IF NOT EXISTS upload_playlists (
+            channel_id  TEXT PRIMARY KEY,
+            playlist_id TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS latest_videos (
+            channel_id   TEXT PRIMARY KEY,
+            video_id     TEXT,
+            title        TEXT,
+            published_at TEXT,
+            fetched_at   REAL NOT NULL
+        );
+    """),
+    ("cache_005_channel_cache", """
+        CREATE TABLE IF NOT EXISTS channel_cache (
+            channel_id    TEXT PRIMARY KEY,
+            item          TEXT NOT NULL,
+            snippet_at    REAL NOT NULL,
+            statistics_at REAL NOT NULL,
+            last_used     REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_channel_cache_last_used ON channel_cache (last_used);
+    """),
+])
+
+# Stay well below SQLite's host-parameter limit when looking up many channels at once
+_LOOKUP_CHUNK = 500
+
+def get_snapshot(user_email: str) -> tuple[list[dict], float] | None:
+    """
+    Return the cached channel items and their fetch timestamp, or None if no snapshot exists.
+    """
+    try:
+        row = db.query_one(
+            "SELECT channels, fetched_at FROM subscription_snapshots WHERE user_email = ?",
+            (user_email,),
+            path=CACHE_DB,
+        )
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read subscription cache for {user_email}: {e}")
+        return None
+
+    if not row:
+        return None
+    return json.loads(row["channels"]), row["fetched_at"]
+
+def save_snapshot(user_email: str, channels: list[dict]):
+    """
+    Store the full list of channel items for a user, replacing any previous snapshot.
+    """
+    try:
+        db.execute("""
+            INSERT INTO subscription_snapshots (user_email, channels, fetched_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(user_email) DO UPDATE SET
+                channels = excluded.channels,
+                fetched_at = excluded.fetched_at
+        """, (user_email, json.dumps(channels), time.time()), path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to write subscription cache for {user_email}: {e}")
+
+def is_stale(fetched_at: float, max_age: int | None = None) -> bool:
+    max_age = SNAPSHOT_TTL if max_age is None else max_age
+    return time.time() - fetched_at > max_age
+
+def get_pages(user_email: str) -> dict[int, dict]:
+    """
+    Return the stored subscription pages for a user, keyed by page index.
+    Each page keeps its ETag and the (channelId, item ETag) pairs it contained.
+    """
+    try:
+        rows = db.query_all("""
+            SELECT page_index, page_token, etag, next_page_token, items
+            FROM subscription_pages WHERE user_email = ?
+        """, (user_email,), path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read subscription pages for {user_email}: {e}")
+        return {}
+
+    return {
+        index: {
+            "page_token": page_token,
+            "etag": etag,
+            "next_page_token": next_page_token,
+            "items": json.loads(items),
+        }
+        for index, page_token, etag, next_page_token, items in rows
+    }
+
+def save_pages(user_email: str, pages: list[dict]):
+    """
+    Replace the stored subscription pages for a user.
+    """
+    try:
+        with db.transaction(CACHE_DB) as conn:
+            conn.execute("DELETE FROM subscription_pages WHERE user_email = ?", (user_email,))
+            conn.executemany("""
+                INSERT INTO subscription_pages (user_email, page_index, page_token, etag, next_page_token, items)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (user_email, index, page["page_token"], page["etag"], page["next_page_token"], json.dumps(page["items"]))
+                for index, page in enumerate(pages)
+            ])
+    except sqlite3.Error as e:
+        print(f"❌ Failed to write subscription pages for {user_email}: {e}")
+
+def get_full_sync_time(user_email: str) -> float | None:
+    try:
+        return db.query_value(
+            "SELECT full_synced_at FROM sync_state WHERE user_email = ?", (user_email,), path=CACHE_DB
+        )
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read sync state for {user_email}: {e}")
+        return None
+
+def mark_full_sync(user_email: str):
+    try:
+        db.execute("""
+            INSERT INTO sync_state (user_email, full_synced_at) VALUES (?, ?)
+            ON CONFLICT(user_email) DO UPDATE SET full_synced_at = excluded.full_synced_at
+        """, (user_email, time.time()), path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to write sync state for {user_email}: {e}")
+
+def invalidate_snapshot(user_email: str | None = None):
+    """
+    Drop the cached snapshot (and page ETags) for one user, or for everyone when no email is given.
+    """
+    try:
+        with db.transaction(CACHE_DB) as conn:
+            for table in ("subscription_snapshots", "subscription_pages", "sync_state"):
+                if user_email is None:
+                    conn.execute(f"DELETE FROM {table}")
+                else:
+                    conn.execute(f"DELETE FROM {table} WHERE user_email = ?", (user_email,))
+    except sqlite3.Error as e:
+        print(f"❌ Failed to invalidate subscription cache: {e}")
+
+def get_upload_playlists(channel_ids: list[str]) -> dict[str, str]:
+    """
+    Return the cached uploads playlist ID for each known channel. These never change, so they never expire.
+    """
+    playlists = {}
+    try:
+        with db.connection(CACHE_DB) as conn:
+            for i in range(0, len(channel_ids), _LOOKUP_CHUNK):
+                chunk = channel_ids[i:i + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                playlists.update(conn.execute(
+                    f"SELECT channel_id, playlist_id FROM upload_playlists WHERE channel_id IN ({placeholders})",
+                    chunk
+                ).fetchall())
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read upload playlists: {e}")
+    return playlists
+
+def save_upload_playlists(playlists: dict[str, str]):
+    try:
+        db.execute_many(
+            "INSERT OR REPLACE INTO upload_playlists (channel_id, playlist_id) VALUES (?, ?)",
+            playlists.items(),
+            path=CACHE_DB,
+        )
+    except sqlite3.Error as e:
+        print(f"❌ Failed to write upload playlists: {e}")
+
+def get_latest_videos(channel_ids: list[str], max_age: int) -> dict[str, dict]:
+    """
+    Return cached latest-video info fetched within max_age seconds, keyed by channel ID.
+    Channels with no uploads are cached too, with empty fields.
+    """
+    cutoff = time.time() - max_age
+    videos = {}
+    try:
+        with db.connection(CACHE_DB) as conn:
+            for i in range(0, len(channel_ids), _LOOKUP_CHUNK):
+                chunk = channel_ids[i:i + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(f"""
+                    SELECT channel_id, video_id, title, published_at FROM latest_videos
+                    WHERE channel_id IN ({placeholders}) AND fetched_at >= ?
+                """, (*chunk, cutoff)).fetchall()
+                for channel_id, video_id, title, published_at in rows:
+                    videos[channel_id] = {"videoId": video_id, "title": title, "publishedAt": published_at}
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read latest videos: {e}")
+    return videos
+
+def save_latest_videos(videos: dict[str, dict]):
+    now = time.time()
+    try:
+        db.execute_many("""
+            INSERT OR REPLACE INTO latest_videos (channel_id, video_id, title, published_at, fetched_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, [
+            (channel_id, video.get("videoId"), video.get("title"), video.get("publishedAt"), now)
+            for channel_id, video in videos.items()
+        ], path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to write latest videos: {e}")
+
+def invalidate_latest_videos(channel_ids: list[str]):
+    """
+    Forget the cached latest video for channels that have likely uploaded since.
+    """
+    try:
+        db.execute_many(
+            "DELETE FROM latest_videos WHERE channel_id = ?",
+            [(cid,) for cid in channel_ids],
+            path=CACHE_DB,
+        )
+    except sqlite3.Error as e:
+        print(f"❌ Failed to invalidate latest videos: {e}")
+
+def get_cached_channels(channel_ids: list[str]) -> tuple[dict[str, dict], set[str]]:
+    """
+    Return the shared cache's channel items whose snippet is still fresh, keyed by channel ID,
+    and the subset of those whose statistics have expired. Missing or snippet-expired channels
+    are left out. Every returned entry is marked as recently used.
+    """
+    now = time.time()
+    ids = json.dumps(channel_ids)
+    try:
+        with db.transaction(CACHE_DB) as conn:
+            rows = conn.execute("""
+                SELECT c.channel_id, c.item, c.statistics_at
+                FROM json_each(?) j JOIN channel_cache c ON c.channel_id = j.value
+                WHERE c.snippet_at >= ?
+            """, (ids, now - CHANNEL_SNIPPET_TTL)).fetchall()
+            conn.execute(
+                "UPDATE channel_cache SET last_used = ? WHERE channel_id IN (SELECT value FROM json_each(?))",
+                (now, json.dumps([row[0] for row in rows])),
+            )
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read channel cache: {e}")
+        return {}, set()
+
+    items = {channel_id: json.loads(item) for channel_id, item, _ in rows}
+    stale_statistics = {
+        channel_id for channel_id, _, statistics_at in rows if statistics_at < now - CHANNEL_STATISTICS_TTL
+    }
+    return items, stale_statistics
+
+def save_cached_channels(items: list[dict]):
+    """
+    Store complete channel items (snippet, statistics, contentDetails) in the shared cache.
+    """
+    now = time.time()
+    try:
+        db.execute_many("""
+            INSERT INTO channel_cache (channel_id, item, snippet_at, statistics_at, last_used)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(channel_id) DO UPDATE SET
+                item = excluded.item,
+                snippet_at = excluded.snippet_at,
+                statistics_at = excluded.statistics_at,
+                last_used = excluded.last_used
+        """, [(item["id"], json.dumps(item), now, now, now) for item in items if item.get("id")], path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to write channel cache: {e}")
+    evict_cached_channels()
+
+def save_cached_statistics(items: list[dict]):
+    """
+    Replace only the statistics of cached channels (items from a part=statistics request).
+    """
+    now = time.time()
+    try:
+        db.execute_many("""
+            UPDATE channel_cache SET
+                item = json_set(item, '$.statistics', json(?)),
+                statistics_at = ?,
+                last_used = ?
+            WHERE channel_id = ?
+        """, [
+            (json.dumps(item["statistics"]), now, now, item["id"])
+            for item in items if item.get("id") and "statistics" in item
+        ], path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to write channel statistics: {e}")
+
+def evict_cached_channels(max_entries: int | None = None) -> int:
+    """
+    Drop the least recently used channels beyond max_entries (default CHANNEL_CACHE_SIZE).
+    Returns the number of evicted entries.
+    """
+    max_entries = CHANNEL_CACHE_SIZE if max_entries is None else max_entries
+    try:
+        return db.execute("""
+            DELETE FROM channel_cache WHERE channel_id IN (
+                SELECT channel_id FROM channel_cache ORDER BY last_used
+                LIMIT max(0, (SELECT COUNT(*) FROM channel_cache) - ?)
+            )
+        """, (max_entries,), path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to evict channel cache entries: {e}")
+        return 0
+
+def channel_cache_size() -> int:
+    try:
+        return db.query_value("SELECT COUNT(*) FROM channel_cache", default=0, path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read channel cache size: {e}")
+        return 0
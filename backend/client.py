@@ -0,0 +1,110 @@
+# backend/client.py
+"""
+Shared YouTube Data API client.
+
+The service object (parsed discovery document plus resource tree) is built once per process
+from the discovery document bundled with google-api-python-client, so no network fetch and no
+re-parsing happens per dashboard load. The service itself carries no credentials: requests are
+executed over authorized_http(credentials), a per-thread transport that keeps its connections
+to googleapis.com alive between calls and users. Work fanned out to other threads runs on
+shared_executor() pools, whose long-lived threads keep their transports too.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+import streamlit as st
+
+HTTP_TIMEOUT = int(st.secrets.get("YOUTUBE_HTTP_TIMEOUT", 30))
+
+# Threads for background refreshes (snapshots, latest videos); queued work waits its turn
+BACKGROUND_WORKERS = int(st.secrets.get("YOUTUBE_BACKGROUND_WORKERS", 2))
+
+_service = None
+_service_lock = threading.Lock()
+
+# httplib2.Http is not thread-safe, so every thread gets its own transport
+_transport = threading.local()
+
+_executors: dict[tuple[str, int], ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+class _UnboundHttp:
+    """
+    Placeholder transport for the shared service: executing a request without http= is a bug.
+    """
+
+    def request(self, *args, **kwargs):
+        raise RuntimeError("Execute YouTube requests with http=authorized_http(credentials)")
+
+    def close(self):
+        pass
+
+def get_service():
+    """
+    Return the process-wide YouTube v3 service, building it on first use.
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                # Deferred: parsing the discovery machinery is the priciest import of the API client,
+                # and dashboards served from the snapshot cache never build a request
+                from googleapiclient.discovery import build
+
+                _service = build(
+                    "youtube",
+                    "v3",
+                    http=_UnboundHttp(),
+                    static_discovery=True,   # bundled discovery document, no HTTP round trip
+                    cache_discovery=False,
+                )
+    return _service
+
+def authorized_http(credentials) -> AuthorizedHttp:
+    """
+    Return this thread's transport bound to `credentials`. The underlying httplib2.Http (and its
+    keep-alive connections) is reused across calls; only the cheap auth wrapper changes per user.
+    """
+    http = getattr(_transport, "http", None)
+    if http is None:
+        http = httplib2.Http(timeout=HTTP_TIMEOUT)
+        _transport.http = http
+        _transport.authorized = None
+
+    authorized = _transport.authorized
+    if authorized is None or authorized.credentials is not credentials:
+        authorized = AuthorizedHttp(credentials, http=http)
+        _transport.authorized = authorized
+    return authorized
+
+def reset_transport():
+    """
+    Drop this thread's transport after a connection error so the next call opens a fresh one.
+    """
+    http = getattr(_transport, "http", None)
+    if http is not None:
+        http.close()
+    _transport.http = None
+    _transport.authorized = None
+
+def shared_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """
+    Return the process-wide thread pool `name`, created on first use. Its threads live as long as
+    the process, so their transports (and keep-alive connections) are reused from task to task;
+    a pool per call would open new connections every time and leave them for the GC to close.
+    """
+    key = (name, max_workers)
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"youtube-{name}")
+            _executors[key] = executor
+    return executor
+
+def submit_background(fn, *args):
+    """
+    Run fn(*args) on the shared "background" pool.
+    """
+    return shared_executor("background", BACKGROUND_WORKERS).submit(fn, *args)
@@ -0,0 +1,218 @@
+# backend/db.py
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import streamlit as st
+
+from utils import metrics
+
+# 📁 Main users database
+DB_PATH = st.secrets.get("USER_DB", "data/YouTufy_users.db")
+
+# Connections kept open per database file; extra connections are closed on release
+POOL_SIZE = int(st.secrets.get("DB_POOL_SIZE", 8))
+
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",       # readers no longer block the writer (persists in the file)
+    "PRAGMA synchronous = NORMAL",     # safe with WAL, avoids an fsync per commit
+    "PRAGMA busy_timeout = 5000",      # wait for the write lock instead of failing immediately
+    "PRAGMA cache_size = -16000",      # 16 MB page cache per connection
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+]
+
+_pools: dict[str, queue.LifoQueue] = {}
+_pools_lock = threading.Lock()
+
+# Named migrations per database file, applied once per process on first use
+_migrations: dict[str, list[tuple[str, str]]] = {}
+_migrated: set[str] = set()
+_migrate_lock = threading.Lock()
+
+def _open(path: str) -> sqlite3.Connection:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(
+        path,
+        timeout=10,
+        isolation_level=None,      # autocommit; use transaction() for multi-statement writes
+        check_same_thread=False,   # pooled connections move between Streamlit script threads
+        cached_statements=256,     # prepared statements are reused across checkouts
+    )
+    conn.row_factory = sqlite3.Row
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def _pool(path: str) -> queue.LifoQueue:
+    with _pools_lock:
+        if path not in _pools:
+            _pools[path] = queue.LifoQueue(maxsize=POOL_SIZE)
+        return _pools[path]
+
+@contextmanager
+def connection(path: str = DB_PATH):
+    """
+    Check a tuned connection out of the pool for `path` and return it afterwards.
+    """
+    if path not in _migrated:
+        migrate(path)
+
+    pool = _pool(path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _open(path)
+
+    try:
+        yield conn
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    finally:
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+@contextmanager
+def transaction(path: str = DB_PATH, immediate: bool = True):
+    """
+    Run a block of statements atomically. BEGIN IMMEDIATE takes the write lock up front,
+    so read-then-write sequences cannot interleave with another writer.
+    """
+    with connection(path) as conn, metrics.span("db_transaction", db=Path(path).stem):
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+
+# 🔎 Typed query helpers
+def query_one(sql: str, params: tuple = (), path: str = DB_PATH) -> sqlite3.Row | None:
+    with connection(path) as conn:
+        return conn.execute(sql, params).fetchone()
+
+def query_all(sql: str, params: tuple = (), path: str = DB_PATH) -> list[sqlite3.Row]:
+    with connection(path) as conn:
+        return conn.execute(sql, params).fetchall()
+
+def query_value(sql: str, params: tuple = (), default=None, path: str = DB_PATH):
+    row = query_one(sql, params, path)
+    return default if row is None or row[0] is None else row[0]
+
+def execute(sql: str, params: tuple = (), path: str = DB_PATH) -> int:
+    """
+    Run a single write statement and return the number of affected rows.
+    """
+    with connection(path) as conn:
+        return conn.execute(sql, params).rowcount
+
+def execute_many(sql: str, seq_of_params, path: str = DB_PATH) -> int:
+    with transaction(path) as conn:
+        return conn.executemany(sql, seq_of_params).rowcount
+
+# 🧱 Schema migrations
+def register_migrations(path: str, migrations: list[tuple[str, str]]):
+    """
+    Register named migrations for a database file. Names must be unique and stable;
+    each one is applied exactly once, in registration order.
+    """
+    with _migrate_lock:
+        known = {name for name, _ in _migrations.get(path, [])}
+        _migrations.setdefault(path, []).extend(m for m in migrations if m[0] not in known)
+        _migrated.discard(path)
+
+def _statements(script: str) -> list[str]:
+    """
+    Split a SQL script into complete statements (trigger bodies contain semicolons too).
+    """
+    statements, current = [], ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ""
+    if current.strip():
+        statements.append(current.strip())
+    return statements
+
+def migrate(path: str = DB_PATH):
+    """
+    Apply any registered migrations that this database has not seen yet.
+    """
+    with _migrate_lock:
+        if path in _migrated:
+            return
+        conn = _open(path)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    name       TEXT PRIMARY KEY,
+                    applied_at REAL NOT NULL
+                )
+            """)
+            for name, script in _migrations.get(path, []):
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    # Re-check under the write lock: another process may have just applied it
+                    if conn.execute("SELECT 1 FROM schema_migrations WHERE name = ?", (name,)).fetchone():
+                        conn.rollback()
+                        continue
+                    for statement in _statements(script):
+                        conn.execute(statement)
+                    conn.execute(
+                        "INSERT INTO schema_migrations (name, applied_at) VALUES (?, ?)",
+                        (name, time.time())
+                    )
+                    conn.commit()
+                    print(f"✅ Applied migration {name} to {path}")
+                except Exception:
+                    conn.rollback()
+                    raise
+        finally:
+            conn.close()
+        _migrated.add(path)
+
+# 👤 Users database schema
+register_migrations(DB_PATH, [
+    ("users_001_base", """
+        CREATE TABLE IF NOT EXISTS users (
+            email        TEXT NOT NULL,
+            username     TEXT,
+            password     TEXT,
+            verified     INTEGER NOT NULL DEFAULT 0,
+            token        TEXT,
+            token_expiry TEXT,
+            google_creds TEXT  -- legacy, superseded by user_credentials
+        );
+    """),
+    ("users_002_lookup_indexes", """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_users_token ON users (token);
+        CREATE INDEX IF NOT EXISTS idx_users_token_expiry ON users (token_expiry);
+    """),
+    ("users_003_credentials", """
+        CREATE TABLE IF NOT EXISTS user_credentials (
+            email      TEXT PRIMARY KEY,
+            creds_json TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        INSERT OR IGNORE INTO user_credentials (email, creds_json, updated_at)
+            SELECT email, google_creds, strftime('%s', 'now') FROM users WHERE google_creds IS NOT NULL;
+    """),
+    ("users_004_used_tokens", """
+        CREATE TABLE IF NOT EXISTS used_tokens (
+            nonce      TEXT PRIMARY KEY,
+            expires_at INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_used_tokens_expires_at ON used_tokens (expires_at);
+    """),
+])
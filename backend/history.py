@@ -0,0 +1,160 @@
+# backend/history.py
+"""
+Append-only history of channel statistics for trend analytics.
+
+Each sync records the subscriber, video and view counts of the channels it fetched. Rows live
+in their own database (the cache DB can be wiped, this history cannot be re-fetched) in a
+compact WITHOUT ROWID table clustered by (channel, time bucket): range scans for one channel
+read contiguous pages, the bucket index serves time-window scans, and growth queries are
+answered inside SQLite with two primary-key seeks per channel instead of loading the history.
+"""
+import json
+import sqlite3
+import time
+
+import pandas as pd
+import streamlit as st
+
+from backend import db
+
+HISTORY_DB = st.secrets.get("HISTORY_DB", "data/YouTufy_history.db")
+
+# One sample per channel per bucket; a later sync in the same bucket replaces the earlier one
+HISTORY_RESOLUTION = int(st.secrets.get("HISTORY_RESOLUTION", 3600))  # Default: 1 hour
+
+METRICS = {"subscribers", "videos", "views"}
+
+db.register_migrations(HISTORY_DB, [
+    ("history_001_channel_stats", """
+        CREATE TABLE IF NOT EXISTS channel_keys (
+            id         INTEGER PRIMARY KEY,
+            channel_id TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS channel_stats (
+            channel_key INTEGER NOT NULL,
+            bucket      INTEGER NOT NULL,
+            sampled_at  INTEGER NOT NULL,
+            subscribers INTEGER NOT NULL,
+            videos      INTEGER NOT NULL,
+            views       INTEGER NOT NULL,
+            PRIMARY KEY (channel_key, bucket)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_channel_stats_bucket ON channel_stats (bucket);
+    """),
+])
+
+def _count(statistics: dict, key: str) -> int:
+    try:
+        return int(statistics.get(key) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+def record_channel_stats(channels: list[dict], sampled_at: float | None = None):
+    """
+    Append the statistics of freshly fetched channel items to the history.
+    """
+    rows = [
+        (item["id"], _count(stats, "subscriberCount"), _count(stats, "videoCount"), _count(stats, "viewCount"))
+        for item in channels
+        if item.get("id") and (stats := item.get("statistics"))
+    ]
+    if not rows:
+        return
+
+    sampled_at = int(sampled_at or time.time())
+    bucket = sampled_at // HISTORY_RESOLUTION
+    try:
+        with db.transaction(HISTORY_DB) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO channel_keys (channel_id) VALUES (?)", [(row[0],) for row in rows]
+            )
+            conn.executemany("""
+                INSERT INTO channel_stats (channel_key, bucket, sampled_at, subscribers, videos, views)
+                VALUES ((SELECT id FROM channel_keys WHERE channel_id = ?), ?, ?, ?, ?, ?)
+                ON CONFLICT(channel_key, bucket) DO UPDATE SET
+                    sampled_at = excluded.sampled_at,
+                    subscribers = excluded.subscribers,
+                    videos = excluded.videos,
+                    views = excluded.views
+            """, [(channel_id, bucket, sampled_at, subs, videos, views) for channel_id, subs, videos, views in rows])
+    except sqlite3.Error as e:
+        print(f"❌ Failed to record channel statistics: {e}")
+
+def channel_history(channel_id: str, since: float | None = None, until: float | None = None) -> pd.DataFrame:
+    """
+    Return one channel's samples between since and until (epoch seconds) as a typed frame.
+    """
+    first = 0 if since is None else int(since) // HISTORY_RESOLUTION
+    last = 2 ** 62 if until is None else int(until) // HISTORY_RESOLUTION
+    try:
+        with db.connection(HISTORY_DB) as conn:
+            df = pd.read_sql_query("""
+                SELECT s.sampled_at, s.subscribers, s.videos, s.views
+                FROM channel_keys k JOIN channel_stats s ON s.channel_key = k.id
+                WHERE k.channel_id = ? AND s.bucket BETWEEN ? AND ?
+                ORDER BY s.bucket
+            """, conn, params=(channel_id, first, last))
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read history for {channel_id}: {e}")
+        df = pd.DataFrame(columns=["sampled_at", "subscribers", "videos", "views"])
+
+    df = df.astype({"subscribers": "int64", "videos": "int64", "views": "int64"})
+    df["sampled_at"] = pd.to_datetime(df["sampled_at"].astype("int64"), unit="s", utc=True)
+    return df
+
+def daily_rates(history: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-sample growth of a channel_history() frame, normalised to units per day.
+    """
+    elapsed_days = history["sampled_at"].diff().dt.total_seconds() / 86400
+    rates = history[["sampled_at"]].copy()
+    for metric in ("subscribers", "videos", "views"):
+        rates[f"{metric}PerDay"] = history[metric].diff() / elapsed_days
+    return rates.iloc[1:]
+
+def growth(channel_ids: list[str], days: int = 30, metric: str = "subscribers", limit: int | None = None) -> pd.DataFrame:
+    """
+    Growth of `metric` for the given channels over the last `days`, fastest first.
+    Compares each channel's first and last sample inside the window; channels with fewer than
+    two samples in it are left out.
+    Columns: channelId, start, end, change, pctChange, perDay, elapsedDays.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+
+    since = (int(time.time()) - days * 86400) // HISTORY_RESOLUTION
+    sql = f"""
+        WITH wanted AS (
+            SELECT k.id AS channel_key, k.channel_id
+            FROM json_each(?) j JOIN channel_keys k ON k.channel_id = j.value
+        ),
+        bounds AS (
+            SELECT w.channel_id, w.channel_key,
+                (SELECT MIN(bucket) FROM channel_stats s WHERE s.channel_key = w.channel_key AND s.bucket >= ?) AS first_bucket,
+                (SELECT MAX(bucket) FROM channel_stats s WHERE s.channel_key = w.channel_key) AS last_bucket
+            FROM wanted w
+        )
+        SELECT w.channel_id AS channelId,
+               f.{metric} AS start,
+               l.{metric} AS "end",
+               l.{metric} - f.{metric} AS change,
+               (l.{metric} - f.{metric}) * 1.0 / NULLIF(f.{metric}, 0) AS pctChange,
+               (l.{metric} - f.{metric}) * 86400.0 / (l.sampled_at - f.sampled_at) AS perDay,
+               (l.sampled_at - f.sampled_at) / 86400.0 AS elapsedDays
+        FROM bounds w
+        JOIN channel_stats f ON f.channel_key = w.channel_key AND f.bucket = w.first_bucket
+        JOIN channel_stats l ON l.channel_key = w.channel_key AND l.bucket = w.last_bucket
+        WHERE w.last_bucket > w.first_bucket
+        ORDER BY perDay DESC
+    """
+    params = [json.dumps(list(channel_ids)), since]
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    try:
+        with db.connection(HISTORY_DB) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to compute channel growth: {e}")
+        return pd.DataFrame(columns=["channelId", "start", "end", "change", "pctChange", "perDay", "elapsedDays"])
@@ -0,0 +1,85 @@
+# backend/models.py
+"""
+Columnar channel model shared by every dashboard page.
+
+Raw channels().list items are flattened once into typed columns, so pages aggregate with
+vectorized operations instead of digging through nested dicts per row.
+"""
+import pandas as pd
+
+CHANNEL_URL = "https://www.youtube.com/channel/"
+
+# Column → dtype of the normalized channel frame
+CHANNEL_SCHEMA = {
+    "channelId": "string",
+    "title": "string",
+    "description": "string",
+    "country": "category",
+    "publishedAt": "datetime64[ns, UTC]",
+    "thumbnailUrl": "string",
+    "uploadsPlaylistId": "string",
+    "subscriberCount": "int64",
+    "videoCount": "int64",
+    "viewCount": "int64",
+    "hiddenSubscriberCount": "bool",
+    "channelUrl": "string",
+}
+COUNT_COLUMNS = ["subscriberCount", "videoCount", "viewCount"]
+
+def uploads_playlist_id(item: dict) -> str | None:
+    """
+    Read the uploads playlist ID from a channel item's contentDetails.
+    """
+    playlist_id = (item.get("contentDetails") or {}).get("relatedPlaylists", {}).get("uploads")
+    if playlist_id:
+        return playlist_id
+    # Snapshots taken before contentDetails was requested: uploads playlists mirror the channel ID
+    channel_id = item.get("id") or ""
+    return "UU" + channel_id[2:] if channel_id.startswith("UC") else None
+
+def empty_channels() -> pd.DataFrame:
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in CHANNEL_SCHEMA.items()})
+
+def normalize_channels(items: list[dict]) -> pd.DataFrame:
+    """
+    Flatten channel items into the CHANNEL_SCHEMA frame in a single pass over the items.
+    Items without an ID are dropped; missing counts become 0.
+    """
+    items = [item for item in items if item.get("id")]
+    if not items:
+        return empty_channels()
+
+    columns = {col: [] for col in CHANNEL_SCHEMA if col != "channelUrl"}
+    for item in items:
+        snippet = item.get("snippet") or {}
+        statistics = item.get("statistics") or {}
+        thumbnails = snippet.get("thumbnails") or {}
+        columns["channelId"].append(item["id"])
+        columns["title"].append(snippet.get("title"))
+        columns["description"].append(snippet.get("description"))
+        columns["country"].append(snippet.get("country"))
+        columns["publishedAt"].append(snippet.get("publishedAt"))
+        columns["thumbnailUrl"].append((thumbnails.get("default") or {}).get("url"))
+        columns["uploadsPlaylistId"].append(uploads_playlist_id(item))
+        for col in COUNT_COLUMNS:
+            columns[col].append(statistics.get(col))
+        columns["hiddenSubscriberCount"].append(bool(statistics.get("hiddenSubscriberCount", False)))
+
+    df = pd.DataFrame(columns)
+    for col in COUNT_COLUMNS:
+        # The API sends counts as strings and omits subscriberCount for hidden channels
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype("int64")
+    df["publishedAt"] = pd.to_datetime(df["publishedAt"], utc=True, errors="coerce", format="ISO8601")
+    df["channelUrl"] = CHANNEL_URL + df["channelId"]
+    return df.astype({col: dtype for col, dtype in CHANNEL_SCHEMA.items() if col not in COUNT_COLUMNS + ["publishedAt"]})
+
+def channel_totals(df: pd.DataFrame) -> dict[str, int]:
+    """
+    Dashboard headline numbers, summed column-wise.
+    """
+    return {
+        "channels": len(df),
+        "subscribers": int(df["subscriberCount"].sum()),
+        "videos": int(df["videoCount"].sum()),
+        "views": int(df["viewCount"].sum()),
+    }
@@ -1,37 +1,88 @@
 # backend/oauth.py
+"""
+Google OAuth flows and per-user credentials.
+
+The Google auth libraries are imported where they are first needed, not at module import:
+pages that only show a login button or read the session never pay for them.
+"""
 import streamlit as st
+import hashlib
 import json
+import os
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from google_auth_oauthlib.flow import Flow
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
+from typing import TYPE_CHECKING
+from utils import metrics
+
+if TYPE_CHECKING:
+    from google_auth_oauthlib.flow import Flow
+    from google.oauth2.credentials import Credentials
 
 # ✅ Constants
 SCOPES = ["https://www.googleapis.com/auth/youtube.readonly"]
 CREDENTIALS_DIR = Path("users")
-CREDENTIALS_DIR.mkdir(parents=True, exist_ok=True)
 
-# ✅ Load client configuration from Streamlit secrets
-CLIENT_CONFIG = json.loads(st.secrets["GOOGLE_CLIENT_SECRET"])
+# ✅ Client configuration from Streamlit secrets, parsed on first use
+_client_config = None
+_env_loaded = False
+
+# 🔑 In-process credentials cache
+CREDENTIALS_CACHE_SIZE = int(st.secrets.get("CREDENTIALS_CACHE_SIZE", 256))
+# Refresh this long before the access token expires, so no request goes out with a dying token
+REFRESH_MARGIN = timedelta(seconds=int(st.secrets.get("CREDENTIALS_REFRESH_MARGIN", 300)))
+
+_credentials: OrderedDict[str, "Credentials"] = OrderedDict()
+_credentials_lock = threading.Lock()
+
+# One lock per cache key: the first caller refreshes, everyone else waits and reuses the result.
+# Weakly held, so a lock lives exactly as long as some caller holds or waits on it, independently
+# of LRU eviction from the credentials cache
+_refresh_locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
 
-def get_flow(redirect_uri: str) -> Flow:
+def client_config() -> dict:
+    """
+    Return the OAuth client configuration (GOOGLE_CLIENT_SECRET), parsed once per process.
+    """
+    global _client_config
+    if _client_config is None:
+        _client_config = json.loads(st.secrets["GOOGLE_CLIENT_SECRET"])
+    return _client_config
+
+def _load_env():
+    """
+    Load .env once per process; oauthlib reads its OAUTHLIB_* switches from the environment.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+def get_flow(redirect_uri: str) -> "Flow":
     """
     Return an OAuth Flow using client config from Streamlit secrets.
     """
+    from google_auth_oauthlib.flow import Flow
+
+    _load_env()
     return Flow.from_client_config(
-        CLIENT_CONFIG,
+        client_config(),
         scopes=SCOPES,
         redirect_uri=redirect_uri
     )
 
-def get_auth_flow(user_email: str) -> Flow:
+def get_auth_flow(user_email: str) -> "Flow":
     """
     Create OAuth Flow for a specific user with redirect URI for callback.
     """
     redirect_uri = f"https://youtufy-one.streamlit.app/main?email={user_email}"
     return get_flow(redirect_uri)
 
-def get_credentials_from_code(code: str, redirect_uri: str) -> Credentials:
+def get_credentials_from_code(code: str, redirect_uri: str) -> "Credentials":
     """
     Exchange authorization code for user credentials.
     """
@@ -39,40 +90,129 @@ def get_credentials_from_code(code: str, redirect_uri: str) -> Credentials:
     flow.fetch_token(code=code)
     return flow.credentials
 
-def save_user_credentials(user_email: str, credentials: Credentials):
+def _cache_get(key: str) -> "Credentials | None":
+    with _credentials_lock:
+        creds = _credentials.get(key)
+        if creds is not None:
+            _credentials.move_to_end(key)
+    metrics.increment("oauth_credentials_cache_total", result="miss" if creds is None else "hit")
+    return creds
+
+def _cache_put(key: str, creds: "Credentials"):
+    with _credentials_lock:
+        _credentials[key] = creds
+        _credentials.move_to_end(key)
+        while len(_credentials) > CREDENTIALS_CACHE_SIZE:
+            _credentials.popitem(last=False)
+
+def _cache_drop(key: str):
+    with _credentials_lock:
+        _credentials.pop(key, None)
+
+def _needs_refresh(creds: "Credentials") -> bool:
     """
-    Save credentials securely to disk using email as identifier.
+    True when the access token is missing or expires within REFRESH_MARGIN and can be refreshed.
     """
-    path = CREDENTIALS_DIR / f"{user_email}_creds.json"
-    with open(path, "w") as f:
-        f.write(credentials.to_json())
+    if not creds.refresh_token:
+        return False
+    if not creds.token:
+        return True
+    if creds.expiry is None:
+        return False
+    # google-auth keeps expiry as a naive UTC datetime
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    return creds.expiry - REFRESH_MARGIN <= now
 
-def get_user_credentials(user_email: str) -> Credentials | None:
+def _refresh(key: str, creds: "Credentials", on_refresh=None) -> "Credentials":
     """
-    Load saved credentials for a user; refresh if expired.
+    Refresh creds at most once across concurrent callers sharing the same cache key.
     """
+    from google.auth.transport.requests import Request
+
+    with _credentials_lock:
+        lock = _refresh_locks.setdefault(key, threading.Lock())
+
+    with lock:
+        # Another thread may have refreshed while we were waiting for the lock
+        current = _cache_get(key) or creds
+        if _needs_refresh(current):
+            with metrics.span("oauth_refresh"):
+                current.refresh(Request())
+            if on_refresh:
+                on_refresh(current)
+        _cache_put(key, current)
+        return current
+
+def _user_key(user_email: str) -> str:
+    return f"user:{user_email}"
+
+def _write_atomic(path: Path, data: str):
+    """
+    Write to a temp file in the same directory and rename it over the target, so readers never see
+    a half-written file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def save_user_credentials(user_email: str, credentials: "Credentials"):
+    """
+    Save credentials securely to disk using email as identifier.
+    """
+    CREDENTIALS_DIR.mkdir(parents=True, exist_ok=True)
     path = CREDENTIALS_DIR / f"{user_email}_creds.json"
-    if not path.exists():
-        return None
+    _write_atomic(path, credentials.to_json())
+    _cache_put(_user_key(user_email), credentials)
 
+def get_user_credentials(user_email: str) -> "Credentials | None":
+    """
+    Return a user's saved credentials, refreshing them shortly before they expire.
+    Parsed credentials are kept in memory, so the file is only read on a cache miss.
+    """
+    key = _user_key(user_email)
     try:
-        creds = Credentials.from_authorized_user_file(str(path), SCOPES)
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-            save_user_credentials(user_email, creds)
+        creds = _cache_get(key)
+        if creds is None:
+            path = CREDENTIALS_DIR / f"{user_email}_creds.json"
+            if not path.exists():
+                return None
+            from google.oauth2.credentials import Credentials
+            creds = Credentials.from_authorized_user_file(str(path), SCOPES)
+            _cache_put(key, creds)
+
+        if _needs_refresh(creds):
+            creds = _refresh(key, creds, on_refresh=lambda c: save_user_credentials(user_email, c))
         return creds
     except Exception as e:
         print(f"❌ Failed to load credentials for {user_email}: {e}")
         return None
 
-def refresh_credentials(cred_json: str) -> Credentials:
+def refresh_credentials(cred_json: str) -> "Credentials":
     """
     Refresh credentials from session JSON (already authorized).
+    The parsed object is cached by the JSON's digest, so reruns with the same session skip parsing.
     """
+    key = "session:" + hashlib.sha256(cred_json.encode()).hexdigest()
     try:
-        creds = Credentials.from_authorized_user_info(json.loads(cred_json), SCOPES)
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
+        creds = _cache_get(key)
+        if creds is None:
+            from google.oauth2.credentials import Credentials
+            creds = Credentials.from_authorized_user_info(json.loads(cred_json), SCOPES)
+            _cache_put(key, creds)
+
+        if _needs_refresh(creds):
+            creds = _refresh(key, creds)
         return creds
     except Exception as e:
         print("❌ Error refreshing credentials:", e)
@@ -82,6 +222,7 @@ def revoke_user_credentials(user_email: str):
     """
     Delete a user's saved credentials (logout or revoke).
     """
+    _cache_drop(_user_key(user_email))
     path = CREDENTIALS_DIR / f"{user_email}_creds.json"
     if path.exists():
         path.unlink()
@@ -0,0 +1,142 @@
+# backend/quota.py
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import streamlit as st
+
+from backend import db
+from backend.cache import CACHE_DB
+from utils import metrics
+
+# 📊 YouTube Data API quota (resets at midnight Pacific time)
+DAILY_QUOTA = int(st.secrets.get("YOUTUBE_DAILY_QUOTA", 10000))
+QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+
+# Unit cost per API method (https://developers.google.com/youtube/v3/determine_quota_cost)
+METHOD_COSTS = {
+    "subscriptions.list": 1,
+    "channels.list": 1,
+    "playlistItems.list": 1,
+    "videos.list": 1,
+    "search.list": 100,
+}
+
+# Share of the daily quota each priority may spend; background work backs off first
+PRIORITY_LIMITS = {
+    "interactive": float(st.secrets.get("QUOTA_INTERACTIVE_SHARE", 0.98)),
+    "background": float(st.secrets.get("QUOTA_BACKGROUND_SHARE", 0.80)),
+}
+
+db.register_migrations(CACHE_DB, [
+    ("quota_001_ledger", """
+        CREATE TABLE IF NOT EXISTS quota_ledger (
+            day        TEXT NOT NULL,
+            user_email TEXT NOT NULL,
+            method     TEXT NOT NULL,
+            calls      INTEGER NOT NULL DEFAULT 0,
+            units      INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, user_email, method)
+        );
+    """),
+])
+
+class QuotaExceeded(Exception):
+    """Raised when a call would push today's usage past the budget for its priority."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def quota_day() -> str:
+    return datetime.now(QUOTA_TIMEZONE).strftime("%Y-%m-%d")
+
+def seconds_until_reset() -> float:
+    now = datetime.now(QUOTA_TIMEZONE)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (midnight - now).total_seconds()
+
+def units_used_today() -> int:
+    return db.query_value(
+        "SELECT SUM(units) FROM quota_ledger WHERE day = ?", (quota_day(),), default=0, path=CACHE_DB
+    )
+
+def has_budget(priority: str = "background", units: int = 1) -> bool:
+    """
+    True if `units` more would still fit into today's budget for the priority.
+    """
+    limit = DAILY_QUOTA * PRIORITY_LIMITS.get(priority, PRIORITY_LIMITS["background"])
+    return units_used_today() + units <= limit
+
+def charge(method: str, user_email: str, calls: int = 1, priority: str = "interactive"):
+    """
+    Record the quota cost of `calls` requests to `method` before they are sent.
+    Raises QuotaExceeded (without recording anything) if the priority's budget would be exceeded.
+    """
+    units = METHOD_COSTS.get(method, 1) * calls
+    limit = DAILY_QUOTA * PRIORITY_LIMITS.get(priority, PRIORITY_LIMITS["background"])
+    day = quota_day()
+
+    # BEGIN IMMEDIATE makes the budget check and the write atomic across processes
+    with db.transaction(CACHE_DB) as conn:
+        used = conn.execute("SELECT COALESCE(SUM(units), 0) FROM quota_ledger WHERE day = ?", (day,)).fetchone()[0]
+        if used + units > limit:
+            metrics.increment("youtube_quota_rejections_total", priority=priority)
+            raise QuotaExceeded(
+                f"{priority} budget exhausted ({used}/{DAILY_QUOTA} units used today)",
+                retry_after=seconds_until_reset(),
+            )
+        conn.execute("""
+            INSERT INTO quota_ledger (day, user_email, method, calls, units) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(day, user_email, method) DO UPDATE SET
+                calls = calls + excluded.calls,
+                units = units + excluded.units
+        """, (day, user_email or "", method, calls, units))
+    metrics.increment("youtube_api_calls_total", calls, method=method, priority=priority)
+
+def mark_exhausted(user_email: str = ""):
+    """
+    Google reported quotaExceeded: book the remaining units so every process stops spending today.
+    """
+    day = quota_day()
+    with db.transaction(CACHE_DB) as conn:
+        used = conn.execute("SELECT COALESCE(SUM(units), 0) FROM quota_ledger WHERE day = ?", (day,)).fetchone()[0]
+        remaining = max(0, DAILY_QUOTA - used)
+        conn.execute("""
+            INSERT INTO quota_ledger (day, user_email, method, calls, units) VALUES (?, ?, 'quotaExceeded', 1, ?)
+            ON CONFLICT(day, user_email, method) DO UPDATE SET
+                calls = calls + 1,
+                units = units + excluded.units
+        """, (day, user_email or "", remaining))
+
+def is_quota_error(error: Exception) -> bool:
+    """
+    True for the 403 quotaExceeded / dailyLimitExceeded errors returned by the API.
+    """
+    status = getattr(getattr(error, "resp", None), "status", None)
+    return status == 403 and any(
+        reason in str(error) for reason in ("quotaExceeded", "dailyLimitExceeded")
+    )
+
+def execute(request, method: str, user_email: str, priority: str = "interactive", **kwargs):
+    """
+    Charge the ledger for a single API request, then execute it.
+    """
+    charge(method, user_email, 1, priority)
+    try:
+        return request.execute(**kwargs)
+    except Exception as e:
+        if is_quota_error(e):
+            mark_exhausted(user_email)
+        raise
+
+def usage_report(days: int = 7) -> list[tuple]:
+    """
+    Return (day, user_email, method, calls, units) rows for the last `days` quota days, newest first.
+    """
+    since = (datetime.now(QUOTA_TIMEZONE) - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+    rows = db.query_all("""
+        SELECT day, user_email, method, calls, units FROM quota_ledger
+        WHERE day >= ? ORDER BY day DESC, units DESC
+    """, (since,), path=CACHE_DB)
+    return [tuple(row) for row in rows]
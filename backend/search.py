@@ -0,0 +1,157 @@
+# backend/search.py
+"""
+Full-text search over subscribed channels' titles and descriptions (SQLite FTS5).
+
+The index lives in the cache DB and is shared by all users: each channel is one FTS row,
+rewritten only when its title or description changes. search_members records which channels
+each user follows, so a search joins the ranked FTS matches against the user's own channels.
+Both are updated from every sync.
+"""
+import hashlib
+import html
+import json
+import re
+import sqlite3
+
+import streamlit as st
+
+from backend import db
+from backend.cache import CACHE_DB
+
+SEARCH_LIMIT = int(st.secrets.get("SEARCH_LIMIT", 50))
+
+# Highlight markers that cannot appear in YouTube text; swapped for <mark> after escaping
+_OPEN, _CLOSE = "\x02", "\x03"
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+db.register_migrations(CACHE_DB, [
+    ("cache_004_channel_search", """
+        CREATE TABLE IF NOT EXISTS search_channels (
+            id         INTEGER PRIMARY KEY,
+            channel_id TEXT NOT NULL UNIQUE,
+            digest     TEXT NOT NULL
+        );
+        CREATE VIRTUAL TABLE IF NOT EXISTS channel_search USING fts5(
+            title,
+            description,
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        );
+        CREATE TABLE IF NOT EXISTS search_members (
+            user_email  TEXT NOT NULL,
+            channel_key INTEGER NOT NULL,
+            PRIMARY KEY (user_email, channel_key)
+        ) WITHOUT ROWID;
+    """),
+])
+
+def _document(item: dict) -> tuple[str, str]:
+    snippet = item.get("snippet") or {}
+    return snippet.get("title") or "", snippet.get("description") or ""
+
+def index_channels(channels: list[dict]) -> int:
+    """
+    Add or rewrite the FTS rows of channel items whose title or description changed.
+    Returns the number of rows written.
+    """
+    docs = {}
+    for item in channels:
+        if item.get("id"):
+            title, description = _document(item)
+            digest = hashlib.blake2b(f"{title}\0{description}".encode(), digest_size=12).hexdigest()
+            docs[item["id"]] = (title, description, digest)
+    if not docs:
+        return 0
+
+    try:
+        with db.transaction(CACHE_DB) as conn:
+            known = dict(conn.execute(
+                "SELECT s.channel_id, s.digest FROM json_each(?) j JOIN search_channels s ON s.channel_id = j.value",
+                (json.dumps(list(docs)),),
+            ).fetchall())
+            changed = [(cid, doc) for cid, doc in docs.items() if known.get(cid) != doc[2]]
+
+            for channel_id, (title, description, digest) in changed:
+                key = conn.execute("""
+                    INSERT INTO search_channels (channel_id, digest) VALUES (?, ?)
+                    ON CONFLICT(channel_id) DO UPDATE SET digest = excluded.digest
+                    RETURNING id
+                """, (channel_id, digest)).fetchone()[0]
+                conn.execute("DELETE FROM channel_search WHERE rowid = ?", (key,))
+                conn.execute(
+                    "INSERT INTO channel_search (rowid, title, description) VALUES (?, ?, ?)",
+                    (key, title, description),
+                )
+            return len(changed)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to update search index: {e}")
+        return 0
+
+def sync_members(user_email: str, channel_ids: list[str]):
+    """
+    Make the user's searchable channel set match channel_ids.
+    """
+    ids = json.dumps(channel_ids)
+    try:
+        with db.transaction(CACHE_DB) as conn:
+            conn.execute("""
+                DELETE FROM search_members
+                WHERE user_email = ? AND channel_key NOT IN (
+                    SELECT s.id FROM json_each(?) j JOIN search_channels s ON s.channel_id = j.value
+                )
+            """, (user_email, ids))
+            conn.execute("""
+                INSERT OR IGNORE INTO search_members (user_email, channel_key)
+                SELECT ?, s.id FROM json_each(?) j JOIN search_channels s ON s.channel_id = j.value
+            """, (user_email, ids))
+    except sqlite3.Error as e:
+        print(f"❌ Failed to update search members for {user_email}: {e}")
+
+def update_index(user_email: str, channels: list[dict]):
+    """
+    Bring the index and the user's membership in line with their current channel items.
+    """
+    index_channels(channels)
+    sync_members(user_email, [item["id"] for item in channels if item.get("id")])
+
+def match_query(text: str) -> str | None:
+    """
+    Turn free text into an FTS5 query where every word is a prefix term (all must match).
+    """
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def _highlighted(text: str) -> str:
+    return html.escape(text).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+def search_channels(user_email: str, text: str, limit: int | None = None) -> list[dict]:
+    """
+    Ranked matches among the user's channels: channelId, title and description snippet with
+    matches wrapped in <mark> (HTML-escaped otherwise), best first. Titles weigh 10× descriptions.
+    """
+    query = match_query(text)
+    if query is None:
+        return []
+
+    try:
+        rows = db.query_all(f"""
+            SELECT s.channel_id,
+                   highlight(channel_search, 0, '{_OPEN}', '{_CLOSE}'),
+                   snippet(channel_search, 1, '{_OPEN}', '{_CLOSE}', '…', 16)
+            FROM channel_search
+            JOIN search_members m ON m.channel_key = channel_search.rowid AND m.user_email = ?
+            JOIN search_channels s ON s.id = channel_search.rowid
+            WHERE channel_search MATCH ?
+            ORDER BY bm25(channel_search, 10.0, 1.0)
+            LIMIT ?
+        """, (user_email, query, limit or SEARCH_LIMIT), path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Search failed for '{text}': {e}")
+        return []
+
+    return [
+        {"channelId": channel_id, "title": _highlighted(title), "snippet": _highlighted(snippet)}
+        for channel_id, title, snippet in rows
+    ]
@@ -0,0 +1,199 @@
+# backend/tags.py
+"""
+Per-user channel tags.
+
+Tags belong to a user; channel_tags links them to channel IDs and carries a copy of each
+channel's subscriber and view counts, so "channels tagged X with more than N subscribers" is a
+single range scan on (tag_id, subscribers). tag_stats holds per-tag aggregates that triggers
+keep up to date on every insert, delete and count change.
+"""
+import sqlite3
+import time
+
+import pandas as pd
+
+from backend import db
+from backend.db import DB_PATH
+
+db.register_migrations(DB_PATH, [
+    ("tags_001_schema", """
+        CREATE TABLE IF NOT EXISTS tags (
+            id         INTEGER PRIMARY KEY,
+            user_email TEXT NOT NULL,
+            name       TEXT NOT NULL COLLATE NOCASE,
+            created_at REAL NOT NULL,
+            UNIQUE (user_email, name)
+        );
+        CREATE TABLE IF NOT EXISTS channel_tags (
+            tag_id      INTEGER NOT NULL REFERENCES tags (id) ON DELETE CASCADE,
+            channel_id  TEXT NOT NULL,
+            subscribers INTEGER NOT NULL DEFAULT 0,
+            views       INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (tag_id, channel_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_channel_tags_subscribers ON channel_tags (tag_id, subscribers);
+        CREATE INDEX IF NOT EXISTS idx_channel_tags_channel ON channel_tags (channel_id);
+        CREATE TABLE IF NOT EXISTS tag_stats (
+            tag_id            INTEGER PRIMARY KEY REFERENCES tags (id) ON DELETE CASCADE,
+            channel_count     INTEGER NOT NULL DEFAULT 0,
+            total_subscribers INTEGER NOT NULL DEFAULT 0,
+            total_views       INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE TRIGGER IF NOT EXISTS trg_tags_insert AFTER INSERT ON tags
+        BEGIN
+            INSERT INTO tag_stats (tag_id) VALUES (NEW.id);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_channel_tags_insert AFTER INSERT ON channel_tags
+        BEGIN
+            UPDATE tag_stats SET
+                channel_count = channel_count + 1,
+                total_subscribers = total_subscribers + NEW.subscribers,
+                total_views = total_views + NEW.views
+            WHERE tag_id = NEW.tag_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_channel_tags_delete AFTER DELETE ON channel_tags
+        BEGIN
+            UPDATE tag_stats SET
+                channel_count = channel_count - 1,
+                total_subscribers = total_subscribers - OLD.subscribers,
+                total_views = total_views - OLD.views
+            WHERE tag_id = OLD.tag_id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS trg_channel_tags_counts AFTER UPDATE OF subscribers, views ON channel_tags
+        BEGIN
+            UPDATE tag_stats SET
+                total_subscribers = total_subscribers + NEW.subscribers - OLD.subscribers,
+                total_views = total_views + NEW.views - OLD.views
+            WHERE tag_id = NEW.tag_id;
+        END;
+    """),
+])
+
+def _counts(channel_ids: list[str], stats: pd.DataFrame | None) -> list[tuple[str, int, int]]:
+    if stats is None or stats.empty:
+        return [(cid, 0, 0) for cid in channel_ids]
+    indexed = stats.set_index("channelId")
+    subscribers = indexed["subscriberCount"].reindex(channel_ids).fillna(0).astype("int64")
+    views = indexed["viewCount"].reindex(channel_ids).fillna(0).astype("int64")
+    return list(zip(channel_ids, subscribers.tolist(), views.tolist()))
+
+def _tag_id(conn, user_email: str, name: str, create: bool = False) -> int | None:
+    name = name.strip()
+    if create:
+        if not name:
+            raise ValueError("Tag name cannot be empty")
+        conn.execute(
+            "INSERT OR IGNORE INTO tags (user_email, name, created_at) VALUES (?, ?, ?)",
+            (user_email, name, time.time()),
+        )
+    row = conn.execute("SELECT id FROM tags WHERE user_email = ? AND name = ?", (user_email, name)).fetchone()
+    return None if row is None else row[0]
+
+# 🏷️ Tag management
+def create_tag(user_email: str, name: str) -> int:
+    """
+    Return the ID of the user's tag called `name` (case-insensitive), creating it if needed.
+    """
+    with db.transaction() as conn:
+        return _tag_id(conn, user_email, name, create=True)
+
+def delete_tag(user_email: str, name: str) -> bool:
+    return db.execute("DELETE FROM tags WHERE user_email = ? AND name = ?", (user_email, name.strip())) > 0
+
+def list_tags(user_email: str) -> pd.DataFrame:
+    """
+    Return the user's tags with their precomputed aggregates, alphabetically.
+    """
+    rows = db.query_all("""
+        SELECT t.name, s.channel_count, s.total_subscribers, s.total_views
+        FROM tags t JOIN tag_stats s ON s.tag_id = t.id
+        WHERE t.user_email = ?
+        ORDER BY t.name
+    """, (user_email,))
+    return pd.DataFrame(
+        [tuple(row) for row in rows], columns=["tag", "channels", "subscribers", "views"]
+    ).astype({"channels": "int64", "subscribers": "int64", "views": "int64"})
+
+# 🔗 Bulk assignment
+def tag_channels(user_email: str, name: str, channel_ids: list[str], stats: pd.DataFrame | None = None) -> int:
+    """
+    Attach a tag (created if missing) to many channels in one transaction. `stats` is the
+    normalized channel frame used to seed the subscriber/view columns. Returns the number of new links.
+    """
+    counts = _counts(list(dict.fromkeys(channel_ids)), stats)
+    with db.transaction() as conn:
+        tag_id = _tag_id(conn, user_email, name, create=True)
+        return conn.executemany(
+            "INSERT OR IGNORE INTO channel_tags (tag_id, channel_id, subscribers, views) VALUES (?, ?, ?, ?)",
+            [(tag_id, cid, subs, views) for cid, subs, views in counts],
+        ).rowcount
+
+def untag_channels(user_email: str, name: str, channel_ids: list[str]) -> int:
+    """
+    Remove a tag from many channels in one transaction. Returns the number of links removed.
+    """
+    with db.transaction() as conn:
+        tag_id = _tag_id(conn, user_email, name)
+        if tag_id is None:
+            return 0
+        return conn.executemany(
+            "DELETE FROM channel_tags WHERE tag_id = ? AND channel_id = ?",
+            [(tag_id, cid) for cid in channel_ids],
+        ).rowcount
+
+def update_channel_stats(stats: pd.DataFrame):
+    """
+    Copy fresh subscriber/view counts onto tagged channels; the triggers adjust tag_stats by the difference.
+    """
+    if stats.empty:
+        return
+    try:
+        db.execute_many("""
+            UPDATE channel_tags SET subscribers = ?, views = ?
+            WHERE channel_id = ? AND (subscribers != ? OR views != ?)
+        """, [
+            (subs, views, cid, subs, views)
+            for cid, subs, views in zip(
+                stats["channelId"].tolist(), stats["subscriberCount"].tolist(), stats["viewCount"].tolist()
+            )
+        ])
+    except sqlite3.Error as e:
+        print(f"❌ Failed to update tagged channel stats: {e}")
+
+# 🔎 Indexed queries
+def channels_with_tags(user_email: str, names: list[str], min_subscribers: int = 0, match_all: bool = False) -> list[str]:
+    """
+    Return the IDs of the user's channels carrying any (or, with match_all, every) of the tags
+    and at least min_subscribers subscribers. Served from the (tag_id, subscribers) index.
+    """
+    if not names:
+        return []
+    placeholders = ",".join("?" * len(names))
+    rows = db.query_all(f"""
+        SELECT ct.channel_id
+        FROM tags t JOIN channel_tags ct INDEXED BY idx_channel_tags_subscribers
+            ON ct.tag_id = t.id AND ct.subscribers >= ?
+        WHERE t.user_email = ? AND t.name IN ({placeholders})
+        GROUP BY ct.channel_id
+        HAVING COUNT(*) >= ?
+    """, (min_subscribers, user_email, *names, len(names) if match_all else 1))
+    return [row[0] for row in rows]
+
+def channel_tag_names(user_email: str) -> dict[str, list[str]]:
+    """
+    Map each tagged channel of the user to its tag names.
+    """
+    rows = db.query_all("""
+        SELECT ct.channel_id, t.name
+        FROM tags t JOIN channel_tags ct ON ct.tag_id = t.id
+        WHERE t.user_email = ?
+        ORDER BY t.name
+    """, (user_email,))
+    names = {}
+    for channel_id, name in rows:
+        names.setdefault(channel_id, []).append(name)
+    return names
@@ -0,0 +1,339 @@
+# backend/thumbnails.py
+"""
+Local thumbnail store for channel cards.
+
+Each thumbnail URL is downloaded once, cropped to a square and resized to THUMBNAIL_SIZE pixels
+with Pillow, then written to THUMBNAIL_DIR under the SHA-256 of the resized JPEG, so channels
+sharing an image share one file. An index in the cache DB maps URLs to files and tracks when
+each was last shown; beyond THUMBNAIL_CACHE_SIZE URLs the least recently used are dropped along
+with files nothing refers to any more. A channel that changes its avatar gets a new URL in its
+snippet, which is a cache miss and triggers a fresh download; nothing else expires.
+
+Cards embed the stored images as data URIs (or one sprite sheet per page), so the browser makes
+no third-party image requests. A render never waits for downloads: anything not stored yet
+falls back to the remote URL for this render and is stored for the next one (backend.worker
+keeps the store warm for every snapshot it refreshes).
+"""
+import base64
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from pathlib import Path
+
+import streamlit as st
+
+from backend import db
+from backend.cache import CACHE_DB
+from utils import metrics
+
+THUMBNAIL_DIR = Path(st.secrets.get("THUMBNAIL_DIR", "data/thumbnails"))
+THUMBNAIL_SIZE = int(st.secrets.get("THUMBNAIL_SIZE", 60))                   # pixels, matches the card
+THUMBNAIL_CACHE_SIZE = int(st.secrets.get("THUMBNAIL_CACHE_SIZE", 50000))    # URLs kept, least recently used beyond
+THUMBNAIL_TIMEOUT = float(st.secrets.get("THUMBNAIL_TIMEOUT", 3))            # seconds one download may take
+THUMBNAIL_FETCH_WORKERS = int(st.secrets.get("THUMBNAIL_FETCH_WORKERS", 8))
+THUMBNAIL_RETRY_AFTER = int(st.secrets.get("THUMBNAIL_RETRY_AFTER", 86400))  # broken URLs are retried after a day
+
+# Grey circle shown for channels without a usable thumbnail
+PLACEHOLDER = "data:image/svg+xml;base64," + base64.b64encode(
+    b'<svg xmlns="http://www.w3.org/2000/svg" width="60" height="60">'
+    b'<circle cx="30" cy="30" r="30" fill="#ddd"/></svg>'
+).decode()
+
+db.register_migrations(CACHE_DB, [
+    ("cache_006_thumbnails", """
+        CREATE TABLE IF NOT EXISTS thumbnails (
+            url        TEXT PRIMARY KEY,
+            digest     TEXT,               -- NULL: the URL is broken, retried after THUMBNAIL_RETRY_AFTER
+            fetched_at REAL NOT NULL,
+            last_used  REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_thumbnails_last_used ON thumbnails (last_used);
+        CREATE INDEX IF NOT EXISTS idx_thumbnails_digest ON thumbnails (digest);
+    """),
+])
+
+_session = None
+_session_lock = threading.Lock()
+
+# Downloads run on one bounded pool per process; a URL already downloading is not requested again
+_executor = None
+_in_flight: dict[str, Future] = {}
+_in_flight_lock = threading.Lock()
+
+class ThumbnailUnavailable(Exception):
+    """
+    The URL answered, but not with an image we can use (404, not an image, ...).
+    """
+
+def get_session():
+    """
+    Return the process-wide HTTP session used for downloads, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_maxsize=THUMBNAIL_FETCH_WORKERS)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def _path(digest: str) -> Path:
+    return THUMBNAIL_DIR / digest[:2] / f"{digest}.jpg"
+
+def _resize(data: bytes) -> bytes:
+    """
+    Center-crop to a square and resize to THUMBNAIL_SIZE pixels, as a JPEG.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image = image.convert("RGB")
+            side = min(image.size)
+            left, top = (image.width - side) // 2, (image.height - side) // 2
+            image = image.resize(
+                (THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.LANCZOS, box=(left, top, left + side, top + side)
+            )
+            out = io.BytesIO()
+            image.save(out, "JPEG", quality=85, optimize=True)
+            return out.getvalue()
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        raise ThumbnailUnavailable(f"not an image: {e}") from e
+
+def _store(data: bytes) -> str:
+    """
+    Write a resized thumbnail under its content hash (once) and return the hash.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = _path(digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The app and backend.worker share the store: each writer gets its own temp file
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    return digest
+
+def _download(url: str) -> str | None:
+    """
+    Fetch, resize and store one thumbnail, recording the outcome in the index.
+    Returns the content hash, or None if the URL is broken. Network errors are raised and not
+    recorded, so the URL is tried again on the next render.
+    """
+    response = get_session().get(url, timeout=THUMBNAIL_TIMEOUT)
+    try:
+        if response.status_code in (403, 404, 410):
+            raise ThumbnailUnavailable(f"HTTP {response.status_code}")
+        response.raise_for_status()
+        digest = _store(_resize(response.content))
+        metrics.increment("thumbnail_downloads_total", result="ok")
+    except ThumbnailUnavailable as e:
+        print(f"⚠️ Thumbnail unavailable at {url}: {e}")
+        metrics.increment("thumbnail_downloads_total", result="unavailable")
+        digest = None
+
+    now = time.time()
+    try:
+        db.execute("""
+            INSERT INTO thumbnails (url, digest, fetched_at, last_used) VALUES (?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                digest = excluded.digest,
+                fetched_at = excluded.fetched_at,
+                last_used = excluded.last_used
+        """, (url, digest, now, now), path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to index thumbnail {url}: {e}")
+    return digest
+
+def _lookup(urls: list[str]) -> dict[str, str | None]:
+    """
+    Return the indexed URLs whose file is usable (hash) or known broken (None), marking them used.
+    Broken URLs past THUMBNAIL_RETRY_AFTER and entries whose file went missing are left out.
+    """
+    now = time.time()
+    try:
+        with db.transaction(CACHE_DB) as conn:
+            rows = conn.execute("""
+                SELECT t.url, t.digest
+                FROM json_each(?) j JOIN thumbnails t ON t.url = j.value
+                WHERE t.digest IS NOT NULL OR t.fetched_at >= ?
+            """, (json.dumps(urls), now - THUMBNAIL_RETRY_AFTER)).fetchall()
+            conn.execute(
+                "UPDATE thumbnails SET last_used = ? WHERE url IN (SELECT value FROM json_each(?))",
+                (now, json.dumps([row[0] for row in rows])),
+            )
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read thumbnail index: {e}")
+        return {}
+    return {url: digest for url, digest in rows if digest is None or _path(digest).exists()}
+
+@metrics.timed("thumbnail_fetch")
+def fetch_thumbnails(urls: list[str], timeout: float | None = 0) -> dict[str, str | None]:
+    """
+    Make sure every URL is in the local store. Returns URL -> content hash (None when the URL is
+    broken) for every URL resolved within `timeout` seconds (None waits for all of them; the
+    default 0 only reports what is already stored, for the render path).
+    Downloads still running at the deadline finish in the background.
+    """
+    urls = list(dict.fromkeys(url for url in urls if url))
+    if not urls:
+        return {}
+    known = _lookup(urls)
+    missing = [url for url in urls if url not in known]
+    metrics.increment("thumbnail_cache_total", len(known), result="hit")
+    metrics.increment("thumbnail_cache_total", len(missing), result="miss")
+    if not missing:
+        return known
+
+    futures = {_submit(url): url for url in missing}
+    done, pending = wait(futures, timeout=timeout)
+    for future in done:
+        try:
+            known[futures[future]] = future.result()
+        except Exception as e:
+            print(f"❌ Failed to download thumbnail {futures[future]}: {e}")
+    if pending:
+        metrics.increment("thumbnail_cache_total", len(pending), result="timeout")
+    evict_thumbnails()
+    return known
+
+def _submit(url: str) -> Future:
+    global _executor
+    with _in_flight_lock:
+        future = _in_flight.get(url)
+        if future is not None:
+            return future
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=THUMBNAIL_FETCH_WORKERS, thread_name_prefix="thumbnails")
+        future = _executor.submit(_download, url)
+        _in_flight[url] = future
+    # Outside the lock: a download that already finished runs the callback right here
+    future.add_done_callback(lambda done: _forget(url, done))
+    return future
+
+def _forget(url: str, future: Future):
+    with _in_flight_lock:
+        if _in_flight.get(url) is future:
+            del _in_flight[url]
+
+@lru_cache(maxsize=4096)
+def _cached_data_uri(digest: str) -> str:
+    # Content-addressed, so a cached URI can never go stale. Read errors raise and are not cached.
+    return "data:image/jpeg;base64," + base64.b64encode(_path(digest).read_bytes()).decode()
+
+def _data_uri(digest: str) -> str | None:
+    try:
+        return _cached_data_uri(digest)
+    except OSError as e:
+        print(f"⚠️ Could not read thumbnail {digest}: {e}")
+        return None
+
+def thumbnail_sources(urls: list[str | None], stored: dict[str, str | None] | None = None) -> list[str]:
+    """
+    Image sources for a page of cards, in order: a data URI for stored thumbnails, the remote URL
+    for ones still downloading, PLACEHOLDER for channels without a usable thumbnail.
+    `stored` is a fetch_thumbnails() result for these URLs, fetched here if not given.
+    """
+    if stored is None:
+        stored = fetch_thumbnails([url for url in urls if url])
+    sources = []
+    for url in urls:
+        if not url:
+            sources.append(PLACEHOLDER)
+        elif url not in stored:
+            sources.append(url)
+        else:
+            digest = stored[url]
+            sources.append((_data_uri(digest) if digest else None) or PLACEHOLDER)
+    return sources
+
+def thumbnail_sprite(urls: list[str | None], stored: dict[str, str | None] | None = None) -> tuple[str | None, list[int | None]]:
+    """
+    One sprite sheet (a JPEG data URI, thumbnails side by side) for a page of cards, plus each
+    card's slot in it. Slots are None for cards that should fall back to thumbnail_sources().
+    """
+    if stored is None:
+        stored = fetch_thumbnails([url for url in urls if url])
+    digests = list(dict.fromkeys(stored[url] for url in urls if url and stored.get(url)))
+    if not digests:
+        return None, [None] * len(urls)
+    try:
+        sheet = _sprite_sheet(tuple(digests))
+    except OSError as e:
+        print(f"⚠️ Could not build thumbnail sprite sheet: {e}")
+        return None, [None] * len(urls)
+    slots = {digest: index for index, digest in enumerate(digests)}
+    return sheet, [slots.get(stored.get(url)) if url else None for url in urls]
+
+@lru_cache(maxsize=64)
+def _sprite_sheet(digests: tuple[str, ...]) -> str:
+    # Like _cached_data_uri, a missing or unreadable file raises so the failure is not cached
+    from PIL import Image
+
+    sheet = Image.new("RGB", (THUMBNAIL_SIZE * len(digests), THUMBNAIL_SIZE), "#dddddd")
+    for index, digest in enumerate(digests):
+        with Image.open(_path(digest)) as image:
+            sheet.paste(image, (index * THUMBNAIL_SIZE, 0))
+    out = io.BytesIO()
+    sheet.save(out, "JPEG", quality=85, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(out.getvalue()).decode()
+
+def evict_thumbnails(max_entries: int | None = None) -> int:
+    """
+    Drop the least recently used URLs beyond max_entries (default THUMBNAIL_CACHE_SIZE) and delete
+    files no remaining URL points to. Returns the number of evicted URLs.
+    """
+    max_entries = THUMBNAIL_CACHE_SIZE if max_entries is None else max_entries
+    try:
+        with db.transaction(CACHE_DB) as conn:
+            victims = conn.execute("""
+                SELECT url, digest FROM thumbnails ORDER BY last_used
+                LIMIT max(0, (SELECT COUNT(*) FROM thumbnails) - ?)
+            """, (max_entries,)).fetchall()
+            if not victims:
+                return 0
+            conn.execute(
+                "DELETE FROM thumbnails WHERE url IN (SELECT value FROM json_each(?))",
+                (json.dumps([url for url, _ in victims]),),
+            )
+            candidates = {digest for _, digest in victims if digest}
+            still_used = {row[0] for row in conn.execute(
+                "SELECT DISTINCT digest FROM thumbnails WHERE digest IN (SELECT value FROM json_each(?))",
+                (json.dumps(list(candidates)),),
+            )}
+    except sqlite3.Error as e:
+        print(f"❌ Failed to evict thumbnails: {e}")
+        return 0
+
+    for digest in candidates - still_used:
+        _path(digest).unlink(missing_ok=True)
+    return len(victims)
+
+def thumbnail_store_size() -> tuple[int, int]:
+    """
+    Indexed URLs and bytes on disk.
+    """
+    try:
+        urls = db.query_value("SELECT COUNT(*) FROM thumbnails", default=0, path=CACHE_DB)
+    except sqlite3.Error as e:
+        print(f"❌ Failed to read thumbnail index size: {e}")
+        urls = 0
+    size = sum(path.stat().st_size for path in THUMBNAIL_DIR.glob("*/*.jpg")) if THUMBNAIL_DIR.exists() else 0
+    return urls, size
@@ -0,0 +1,173 @@
+# backend/videos.py
+import threading
+
+from googleapiclient.errors import HttpError
+import pandas as pd
+import streamlit as st
+
+from backend.batch import execute_batch
+from backend.client import get_service, authorized_http, submit_background
+from backend import quota
+from backend.quota import QuotaExceeded
+from backend.cache import (
+    get_upload_playlists,
+    save_upload_playlists,
+    get_latest_videos,
+    save_latest_videos,
+)
+from utils import metrics
+
+LATEST_VIDEO_TTL = int(st.secrets.get("LATEST_VIDEO_TTL", 3600))  # Default: 1 hour
+
+# Users whose latest videos are being fetched in the background (at most one fetch each)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def _resolve_upload_playlists(channels: dict[str, str | None]) -> dict[str, str]:
+    """
+    Merge known uploads playlists into the persistent cache and return them for every channel we can resolve.
+    """
+    playlists = get_upload_playlists(list(channels))
+
+    discovered = {
+        channel_id: playlist_id
+        for channel_id, playlist_id in channels.items()
+        if channel_id not in playlists and playlist_id
+    }
+    if discovered:
+        save_upload_playlists(discovered)
+        playlists.update(discovered)
+    return playlists
+
+def _parse_latest_item(response: dict) -> dict:
+    items = response.get("items", [])
+    if not items:
+        return {}
+    item = items[0]
+    details = item.get("contentDetails", {})
+    snippet = item.get("snippet", {})
+    return {
+        "videoId": details.get("videoId"),
+        "title": snippet.get("title"),
+        "publishedAt": details.get("videoPublishedAt") or snippet.get("publishedAt"),
+    }
+
+@metrics.timed("youtube_latest_videos")
+def fetch_latest_videos(credentials, channels: dict[str, str | None], user_email: str, priority: str = "interactive") -> dict[str, dict]:
+    """
+    Return the newest upload of each channel, keyed by channel ID.
+    channels maps channel IDs to their uploads playlist ID (None if unknown).
+    Cached results younger than LATEST_VIDEO_TTL are reused; only the rest are requested,
+    one playlistItems().list(maxResults=1) per channel, packed into batch calls.
+    If the quota budget runs out, older cached results are served instead.
+    """
+    playlists = _resolve_upload_playlists(channels)
+    latest = get_latest_videos(list(playlists), LATEST_VIDEO_TTL)
+    missing = [channel_id for channel_id in playlists if channel_id not in latest]
+    if not missing:
+        return latest
+
+    youtube = get_service()
+    requests = {
+        channel_id: youtube.playlistItems().list(
+            part="snippet,contentDetails",
+            playlistId=playlists[channel_id],
+            maxResults=1,
+        )
+        for channel_id in missing
+    }
+    try:
+        responses, errors = execute_batch(
+            youtube,
+            requests,
+            http=authorized_http(credentials),
+            on_send=lambda calls: quota.charge("playlistItems.list", user_email, calls, priority),
+        )
+    except QuotaExceeded as e:
+        print(f"⏳ Serving cached latest videos for {user_email}: {e}")
+        responses, errors = {}, {}
+        latest.update(get_latest_videos(missing, max_age=10 ** 9))
+
+    fetched = {channel_id: _parse_latest_item(response) for channel_id, response in responses.items()}
+    exhausted = False
+    for channel_id, error in errors.items():
+        # Channels without any uploads have no uploads playlist; remember that until the TTL expires
+        if isinstance(error, HttpError) and error.resp.status == 404:
+            fetched[channel_id] = {}
+        elif quota.is_quota_error(error):
+            exhausted = True
+        else:
+            print(f"❌ Failed to fetch latest video for {channel_id}: {error}")
+    if exhausted:
+        quota.mark_exhausted(user_email)
+
+    save_latest_videos(fetched)
+    latest.update(fetched)
+    return latest
+
+def _fetch_in_background(credentials, channels: dict[str, str | None], user_email: str):
+    with _refreshing_lock:
+        if user_email in _refreshing:
+            return
+        _refreshing.add(user_email)
+
+    def fetch():
+        try:
+            fetch_latest_videos(credentials, channels, user_email, priority="background")
+        except Exception as e:
+            print(f"❌ Background latest video fetch failed for {user_email}: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(user_email)
+
+    submit_background(fetch)
+
+def cached_latest_videos(credentials, channels: dict[str, str | None], user_email: str) -> dict[str, dict]:
+    """
+    Like fetch_latest_videos, but never waits on the API: every cached result is served whatever
+    its age, and channels that are missing or older than LATEST_VIDEO_TTL are fetched in a
+    background thread for the next load (the worker normally keeps them warm already).
+    """
+    playlists = _resolve_upload_playlists(channels)
+    latest = get_latest_videos(list(playlists), LATEST_VIDEO_TTL)
+    expired = [channel_id for channel_id in playlists if channel_id not in latest]
+    metrics.increment("latest_videos_cache_total", len(latest), result="fresh")
+    metrics.increment("latest_videos_cache_total", len(expired), result="stale_or_missing")
+    if expired:
+        latest.update(get_latest_videos(expired, max_age=10 ** 9))
+        _fetch_in_background(credentials, {channel_id: channels.get(channel_id) for channel_id in expired}, user_email)
+    return latest
+
+def add_latest_videos(
+    credentials,
+    df: pd.DataFrame,
+    user_email: str = "",
+    priority: str = "interactive",
+    cached_only: bool = False,
+) -> pd.DataFrame:
+    """
+    Return a copy of the normalized channel frame with latestVideoDate, latestVideoId and latestVideoTitle columns.
+    With cached_only (interactive page loads), results come from cached_latest_videos and the
+    page never blocks on playlistItems calls.
+    """
+    df = df.copy()
+    latest = {}
+    if not df.empty:
+        try:
+            channels = {
+                channel_id: playlist_id if isinstance(playlist_id, str) else None
+                for channel_id, playlist_id in zip(df["channelId"], df["uploadsPlaylistId"])
+            }
+            if cached_only:
+                latest = cached_latest_videos(credentials, channels, user_email)
+            else:
+                latest = fetch_latest_videos(credentials, channels, user_email, priority)
+        except Exception as e:
+            print(f"❌ Latest video detection failed: {e}")
+
+    df["latestVideoDate"] = pd.to_datetime(
+        df["channelId"].map(lambda cid: latest.get(cid, {}).get("publishedAt")), utc=True, errors="coerce", format="ISO8601"
+    )
+    df["latestVideoId"] = df["channelId"].map(lambda cid: latest.get(cid, {}).get("videoId")).astype("string")
+    df["latestVideoTitle"] = df["channelId"].map(lambda cid: latest.get(cid, {}).get("title")).astype("string")
+    return df
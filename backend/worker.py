@@ -0,0 +1,133 @@
+# backend/worker.py
+"""
+Background refresh worker that keeps subscription snapshots warm for active users.
+
+Run it next to the Streamlit app (from the repository root):
+
+    python -m backend.worker            # loop forever
+    python -m backend.worker --once     # refresh every due user once and exit
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import streamlit as st
+
+from backend import db
+from backend.auth import purge_expired_tokens
+from backend.oauth import get_user_credentials
+from backend.youtube import refresh_subscriptions
+from backend.videos import add_latest_videos
+from backend.models import normalize_channels
+from backend.activity import refresh_features
+from backend.thumbnails import fetch_thumbnails
+from backend import quota
+from utils import metrics
+
+REFRESH_INTERVAL = int(st.secrets.get("WORKER_REFRESH_INTERVAL", 600))  # Default: 10 minutes
+MAX_BACKOFF = int(st.secrets.get("WORKER_MAX_BACKOFF", 6 * 3600))
+JITTER = 0.2  # ±20% so users don't all come due at the same moment
+IDLE_SLEEP = 30
+
+def active_users() -> list[str]:
+    """
+    Return the emails of users who can have their subscriptions refreshed.
+    """
+    try:
+        rows = db.query_all("""
+            SELECT email FROM users WHERE verified = 1
+            UNION
+            SELECT email FROM user_credentials
+        """)
+        return [row[0] for row in rows]
+    except Exception as e:
+        print(f"❌ Failed to list active users: {e}")
+        return []
+
+def refresh_user(user_email: str) -> bool:
+    """
+    Refresh one user's subscription snapshot, latest videos, activity features and thumbnails. Returns True on success.
+    """
+    creds = get_user_credentials(user_email)
+    if creds is None:
+        return False
+
+    channels = refresh_subscriptions(creds, user_email, priority="background")
+    if channels is None:
+        return False
+
+    df = add_latest_videos(creds, normalize_channels(channels), user_email, priority="background")
+    # Keep inactivity features warm so the dashboard only scores
+    refresh_features(df)
+    # New or changed avatars are downloaded here rather than while a dashboard waits
+    fetch_thumbnails(df["thumbnailUrl"].dropna().tolist(), timeout=None)
+    return True
+
+def _jittered(seconds: float) -> float:
+    return seconds * random.uniform(1 - JITTER, 1 + JITTER)
+
+def run(interval: int = REFRESH_INTERVAL, once: bool = False):
+    """
+    Refresh every active user roughly every `interval` seconds.
+    Failing users back off exponentially up to MAX_BACKOFF; when the background quota budget
+    is spent, the worker sleeps until the daily reset.
+    """
+    next_run = {}
+    failures = {}
+
+    while True:
+        now = time.time()
+        users = set(active_users())
+        purge_expired_tokens()
+
+        for email in users:
+            # Spread first refreshes over one interval instead of hitting the API all at once
+            next_run.setdefault(email, now if once else now + random.uniform(0, interval))
+        for email in set(next_run) - users:
+            next_run.pop(email)
+            failures.pop(email, None)
+
+        for email in [e for e, due in sorted(next_run.items(), key=lambda kv: kv[1]) if due <= now]:
+            if not quota.has_budget("background"):
+                wait = quota.seconds_until_reset()
+                print(f"⏳ Background quota budget spent; sleeping {wait / 3600:.1f}h until reset")
+                if once:
+                    return
+                time.sleep(wait)
+                break
+
+            try:
+                ok = refresh_user(email)
+            except Exception as e:
+                print(f"❌ Refresh failed for {email}: {e}")
+                ok = False
+
+            if ok:
+                failures.pop(email, None)
+                next_run[email] = time.time() + _jittered(interval)
+            else:
+                failures[email] = failures.get(email, 0) + 1
+                backoff = min(MAX_BACKOFF, interval * 2 ** failures[email])
+                next_run[email] = time.time() + _jittered(backoff)
+                print(f"⚠️ Backing off {email} for {backoff // 60:.0f} min after {failures[email]} failure(s)")
+
+        if once:
+            return
+
+        soonest = min(next_run.values(), default=time.time() + IDLE_SLEEP)
+        time.sleep(max(1, min(IDLE_SLEEP, soonest - time.time())))
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warm YouTufy subscription snapshots for active users.")
+    parser.add_argument("--interval", type=int, default=REFRESH_INTERVAL, help="seconds between refreshes per user")
+    parser.add_argument("--once", action="store_true", help="refresh every active user once and exit")
+    args = parser.parse_args()
+    metrics.set_process("worker")
+    run(interval=args.interval, once=args.once)
+
+if __name__ == "__main__":
+    main()
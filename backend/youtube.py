@@ -1,51 +1,366 @@
 # backend/youtube.py
 
-from googleapiclient.discovery import build
+import threading
+import time
+from dataclasses import dataclass, field
+
+import httplib2
 from googleapiclient.errors import HttpError
 import pandas as pd
+import streamlit as st
+
+from backend.batch import execute_batch
+from backend.client import get_service, authorized_http, reset_transport, shared_executor, submit_background
+from backend import quota
+from backend.quota import QuotaExceeded
+from backend.models import normalize_channels
+from backend.history import record_channel_stats
+from backend.tags import update_channel_stats
+from backend.search import update_index
+from backend.cache import (
+    get_snapshot,
+    save_snapshot,
+    is_stale,
+    get_pages,
+    save_pages,
+    get_full_sync_time,
+    mark_full_sync,
+    invalidate_latest_videos,
+    get_cached_channels,
+    save_cached_channels,
+    save_cached_statistics,
+)
+from utils import metrics
+
+# Channel statistics drift even when the subscription list does not, so re-fetch everything periodically
+FULL_SYNC_INTERVAL = int(st.secrets.get("FULL_SYNC_INTERVAL", 86400))  # Default: 24 hours
+
+# contentDetails carries the uploads playlist used for latest-video detection (same quota cost)
+CHANNEL_PARTS = "snippet,statistics,contentDetails"
+
+# How channels().list batches are sent: "batch" (multipart batch endpoint) or "threads"
+CHANNEL_FETCH_MODE = st.secrets.get("CHANNEL_FETCH_MODE", "batch")
+
+# Concurrency for channels().list batches in "threads" mode (1 = serial)
+CHANNEL_FETCH_WORKERS = int(st.secrets.get("CHANNEL_FETCH_WORKERS", 4))
+CHANNEL_FETCH_RETRIES = int(st.secrets.get("CHANNEL_FETCH_RETRIES", 2))
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Users whose snapshot is currently being refreshed in the background
+_refreshing = set()
+_refreshing_lock = threading.Lock()
 
-def fetch_subscriptions(credentials, user_email: str) -> pd.DataFrame:
+@dataclass
+class SyncResult:
+    """Outcome of a subscription sync: the merged channel items plus what changed."""
+    channels: list[dict]
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    pages_not_modified: int = 0
+    channels_from_cache: int = 0
+
+@metrics.timed("youtube_subscription_pages")
+def _list_subscription_pages(youtube, credentials, previous_pages: dict[int, dict], user_email: str, priority: str) -> tuple[list[dict], int]:
     """
-    Fetch a user's YouTube subscriptions using Google OAuth credentials.
-    Returns a DataFrame with channel details.
+    Page through the user's subscriptions, sending If-None-Match for pages we already have.
+    Returns the pages as stored by backend.cache and the number of 304 responses.
     """
-    try:
-        youtube = build("youtube", "v3", credentials=credentials)
-        subscriptions = []
-        next_page_token = None
-
-        while True:
-            request = youtube.subscriptions().list(
-                part="snippet,contentDetails",
-                mine=True,
-                maxResults=50,
-                pageToken=next_page_token,
+    pages = []
+    not_modified = 0
+    page_token = None
+
+    while True:
+        previous = previous_pages.get(len(pages))
+        request = youtube.subscriptions().list(
+            part="snippet,contentDetails",
+            mine=True,
+            maxResults=50,
+            order="alphabetical",  # stable ordering keeps page ETags reusable between syncs
+            pageToken=page_token,
+        )
+        if previous and previous["etag"] and previous["page_token"] == page_token:
+            request.headers["If-None-Match"] = previous["etag"]
+
+        try:
+            response = quota.execute(
+                request, "subscriptions.list", user_email, priority, http=authorized_http(credentials)
+            )
+            page = {
+                "page_token": page_token,
+                "etag": response.get("etag"),
+                "next_page_token": response.get("nextPageToken"),
+                "items": [
+                    [item["snippet"]["resourceId"]["channelId"], item.get("etag")]
+                    for item in response.get("items", [])
+                ],
+            }
+        except HttpError as e:
+            if e.resp.status != 304:
+                raise
+            page = previous
+            not_modified += 1
+
+        pages.append(page)
+        page_token = page["next_page_token"]
+        if not page_token:
+            break
+
+    return pages, not_modified
+
+def _fetch_channel_batch(youtube, credentials, batch_ids: list[str], user_email: str, priority: str, part: str = CHANNEL_PARTS) -> list[dict]:
+    """
+    Fetch one batch of up to 50 channels, retrying transient failures with backoff.
+    """
+    for attempt in range(CHANNEL_FETCH_RETRIES + 1):
+        try:
+            request = youtube.channels().list(part=part, id=",".join(batch_ids))
+            details_response = quota.execute(
+                request, "channels.list", user_email, priority, http=authorized_http(credentials)
             )
-            response = request.execute()
-            subscriptions += response.get("items", [])
+            return details_response.get("items", [])
+        except HttpError as e:
+            if e.resp.status not in RETRYABLE_STATUSES or attempt == CHANNEL_FETCH_RETRIES:
+                raise
+        except (OSError, httplib2.HttpLib2Error):
+            # Drop the broken connection so the retry opens a fresh one
+            reset_transport()
+            if attempt == CHANNEL_FETCH_RETRIES:
+                raise
+        time.sleep(0.5 * 2 ** attempt)
+
+@metrics.timed("youtube_channel_details")
+def _fetch_channel_details(
+    youtube,
+    credentials,
+    channel_ids: list[str],
+    user_email: str,
+    priority: str = "interactive",
+    max_workers: int | None = None,
+    part: str = CHANNEL_PARTS,
+) -> list[dict]:
+    """
+    Batch fetch channel details (stats, branding) in groups of 50 IDs.
+    In "batch" mode up to 50 of those calls share one HTTP round trip; otherwise they run on
+    a bounded thread pool shared by all calls. Results keep the order of channel_ids.
+    """
+    max_workers = CHANNEL_FETCH_WORKERS if max_workers is None else max_workers
+    batches = [channel_ids[i:i + 50] for i in range(0, len(channel_ids), 50)]
 
-            next_page_token = response.get("nextPageToken")
-            if not next_page_token:
-                break
+    if CHANNEL_FETCH_MODE == "batch" and len(batches) > 1:
+        requests = {
+            str(index): youtube.channels().list(part=part, id=",".join(batch))
+            for index, batch in enumerate(batches)
+        }
+        responses, errors = execute_batch(
+            youtube,
+            requests,
+            http=authorized_http(credentials),
+            max_retries=CHANNEL_FETCH_RETRIES,
+            on_send=lambda calls: quota.charge("channels.list", user_email, calls, priority),
+        )
+        if errors:
+            raise next(iter(errors.values()))
+        results = [responses[str(index)].get("items", []) for index in range(len(batches))]
+    elif max_workers <= 1 or len(batches) <= 1:
+        results = [_fetch_channel_batch(youtube, credentials, batch, user_email, priority, part) for batch in batches]
+    else:
+        results = list(shared_executor("channels", max_workers).map(
+            lambda batch: _fetch_channel_batch(youtube, credentials, batch, user_email, priority, part),
+            batches,
+        ))
 
-        if not subscriptions:
-            return pd.DataFrame()
+    return [item for batch_items in results for item in batch_items]
 
-        channel_ids = [item["snippet"]["resourceId"]["channelId"] for item in subscriptions]
+def _resolve_channels(
+    youtube,
+    credentials,
+    channel_ids: list[str],
+    user_email: str,
+    priority: str,
+    refresh_statistics: set[str] = frozenset(),
+) -> tuple[dict[str, dict], list[dict], int]:
+    """
+    Channel items for channel_ids, served from the shared channel cache where possible.
+    Missing or snippet-expired channels are fetched in full; channels whose statistics expired
+    (or are listed in refresh_statistics) only get part=statistics. Returns the items by ID,
+    the items whose statistics came from the API in this call, and the number of API calls made.
+    """
+    cached, stale_statistics = get_cached_channels(channel_ids)
+    missing = [cid for cid in channel_ids if cid not in cached]
+    statistics_only = [cid for cid in channel_ids if cid in cached and (cid in stale_statistics or cid in refresh_statistics)]
+
+    metrics.increment("channel_cache_total", len(channel_ids) - len(missing) - len(statistics_only), result="hit")
+    metrics.increment("channel_cache_total", len(statistics_only), result="statistics")
+    metrics.increment("channel_cache_total", len(missing), result="miss")
+
+    fetched = _fetch_channel_details(youtube, credentials, missing, user_email, priority) if missing else []
+    save_cached_channels(fetched)
 
-        # Batch fetch channel details (stats, branding)
-        channel_data = []
-        for i in range(0, len(channel_ids), 50):
-            batch_ids = channel_ids[i:i + 50]
-            details_response = youtube.channels().list(
-                part="snippet,statistics",
-                id=",".join(batch_ids)
-            ).execute()
-            channel_data.extend(details_response.get("items", []))
+    refreshed = []
+    if statistics_only:
+        statistics = _fetch_channel_details(youtube, credentials, statistics_only, user_email, priority, part="statistics")
+        save_cached_statistics(statistics)
+        refreshed = [{**cached[item["id"]], "statistics": item["statistics"]} for item in statistics if item.get("id") in cached]
 
-        df = pd.DataFrame(channel_data)
-        return df
+    items = {**cached, **{item["id"]: item for item in refreshed + fetched}}
+    api_calls = -(-len(missing) // 50) + -(-len(statistics_only) // 50)
+    return items, fetched + refreshed, api_calls
+
+@metrics.timed("youtube_sync")
+def sync_subscriptions(credentials, user_email: str, full: bool = False, priority: str = "interactive") -> SyncResult | None:
+    """
+    Sync a user's subscriptions against the cached snapshot.
+    Unchanged subscription pages come back as 304s; only channels that were added or whose
+    subscription item changed are looked up, then merged into the snapshot. Lookups go through
+    the shared channel cache, so channels another user synced recently cost no API call.
+    Every call is charged to the quota ledger under the given priority.
+    Returns None if the API call failed or the quota budget is exhausted.
+    """
+    cached = get_snapshot(user_email)
+    last_full_sync = get_full_sync_time(user_email)
+    full = (
+        full
+        or cached is None
+        or last_full_sync is None
+        or time.time() - last_full_sync > FULL_SYNC_INTERVAL
+    )
 
-    except HttpError as e:
+    mode = "full" if full else "incremental"
+    previous_pages = {} if full else get_pages(user_email)
+    previous_channels = {} if cached is None else {item["id"]: item for item in cached[0]}
+    previous_etags = {
+        channel_id: etag
+        for page in previous_pages.values()
+        for channel_id, etag in page["items"]
+    }
+
+    try:
+        youtube = get_service()
+        pages, not_modified = _list_subscription_pages(youtube, credentials, previous_pages, user_email, priority)
+
+        current_etags = {channel_id: etag for page in pages for channel_id, etag in page["items"]}
+        added = [cid for cid in current_etags if cid not in previous_channels]
+        removed = [cid for cid in previous_channels if cid not in current_etags]
+        changed = [
+            cid for cid, etag in current_etags.items()
+            if cid in previous_channels and (full or previous_etags.get(cid) != etag)
+        ]
+
+        # A changed subscription item usually means a new upload, so its counts are refreshed regardless of age
+        fetched, refreshed, channel_calls = _resolve_channels(
+            youtube, credentials, added + changed, user_email, priority,
+            refresh_statistics=set() if full else set(changed),
+        )
+
+    except QuotaExceeded as e:
+        metrics.increment("youtube_syncs_total", mode=mode, result="quota")
+        print(f"⏳ Skipping subscription sync for {user_email}: {e}")
+        return None
+    except (HttpError, OSError, httplib2.HttpLib2Error) as e:
+        if quota.is_quota_error(e):
+            quota.mark_exhausted(user_email)
+        metrics.increment("youtube_syncs_total", mode=mode, result="error")
         print(f"❌ YouTube API error while fetching subscriptions: {e}")
-        return pd.DataFrame()
+        return None
+
+    # API calls this sync cost the user: one per subscription page plus one per 50 channels not served from cache
+    api_calls = len(pages) + channel_calls
+    metrics.observe("youtube_sync_api_calls", api_calls, buckets=metrics.COUNT_BUCKETS, mode=mode)
+    metrics.increment("youtube_syncs_total", mode=mode, result="ok")
+
+    # Keep subscription order; channels the API no longer returns are dropped
+    channels = [
+        fetched.get(cid) or previous_channels[cid]
+        for cid in current_etags
+        if cid in fetched or cid in previous_channels
+    ]
+
+    save_snapshot(user_email, channels)
+    save_pages(user_email, pages)
+    record_channel_stats(refreshed)
+    update_channel_stats(normalize_channels(refreshed))
+    update_index(user_email, channels)
+    if full:
+        mark_full_sync(user_email)
+    elif changed:
+        # A changed subscription item usually means a new upload
+        invalidate_latest_videos(changed)
+
+    return SyncResult(
+        channels=channels,
+        added=added,
+        removed=removed,
+        changed=[] if full else changed,
+        pages_not_modified=not_modified,
+        channels_from_cache=len(fetched) - len(refreshed),
+    )
+
+def refresh_subscriptions(credentials, user_email: str, full: bool = False, priority: str = "interactive") -> list[dict] | None:
+    """
+    Sync subscriptions from the API into the snapshot cache and return the channel items.
+    """
+    result = sync_subscriptions(credentials, user_email, full=full, priority=priority)
+    return None if result is None else result.channels
+
+def _revalidate(credentials, user_email: str):
+    try:
+        # The user already has data on screen, so this can wait behind interactive fetches
+        refresh_subscriptions(credentials, user_email, priority="background")
+    except Exception as e:
+        print(f"❌ Background refresh failed for {user_email}: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(user_email)
+
+def _revalidate_in_background(credentials, user_email: str):
+    with _refreshing_lock:
+        if user_email in _refreshing:
+            return
+        _refreshing.add(user_email)
+    submit_background(_revalidate, credentials, user_email)
+
+def is_refreshing(user_email: str) -> bool:
+    """
+    True while a background revalidation of the user's snapshot is queued or running in this process.
+    """
+    with _refreshing_lock:
+        return user_email in _refreshing
+
+def _with_fetched_at(df: pd.DataFrame, fetched_at: float | None) -> pd.DataFrame:
+    df.attrs["fetched_at"] = fetched_at
+    return df
+
+def fetch_subscriptions(
+    credentials,
+    user_email: str,
+    max_age: int | None = None,
+    force_refresh: bool = False,
+    priority: str = "interactive",
+) -> pd.DataFrame:
+    """
+    Fetch a user's YouTube subscriptions using Google OAuth credentials.
+    Serves the cached snapshot when one exists; a stale snapshot is returned immediately
+    while an incremental sync runs in the background. When the quota budget is exhausted
+    the cached snapshot is served as-is.
+    Returns the normalized channel frame (see backend.models.CHANNEL_SCHEMA), with the time
+    its snapshot was synced in df.attrs["fetched_at"] (None if it never was).
+    """
+    cached = get_snapshot(user_email)
+
+    if cached and not force_refresh:
+        channels, fetched_at = cached
+        stale = is_stale(fetched_at, max_age)
+        metrics.increment("youtube_snapshot_total", result="stale" if stale else "fresh")
+        if stale:
+            _revalidate_in_background(credentials, user_email)
+        return _with_fetched_at(normalize_channels(channels), fetched_at)
+
+    metrics.increment("youtube_snapshot_total", result="miss")
+
+    channels = refresh_subscriptions(credentials, user_email, full=force_refresh, priority=priority)
+    if channels is None:
+        # Fall back to whatever we had rather than an empty dashboard
+        return _with_fetched_at(normalize_channels(cached[0] if cached else []), cached[1] if cached else None)
+
+    return _with_fetched_at(normalize_channels(channels), time.time())
@@ -0,0 +1,82 @@
+# benchmarks/bench_channel_cache.py
+"""
+Offline benchmark of the cross-user channel metadata cache.
+
+Simulates --users accounts syncing one after another, each following --subscriptions channels
+drawn from a shared pool of --pool channels with Zipf-like popularity (a few channels are
+followed by almost everyone, most by a handful). Reports, per group of users, the channels.list
+calls each sync needed against the uncached cost, and the share of channels served from the
+cache. Runs against benchmarks.fake_youtube with fresh databases in a scratch directory.
+
+    python -m benchmarks.bench_channel_cache
+    python -m benchmarks.bench_channel_cache --users 200 --pool 50000 --cache-size 20000
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_fetch import scratch_environment
+from benchmarks.fake_youtube import FakeYouTube, install
+
+def popular_channels(pool: list[str], count: int, skew: float, rng: random.Random) -> list[str]:
+    """
+    Draw `count` distinct channels, channel i being picked with weight 1 / (i + 1) ** skew.
+    """
+    weights = [1 / (rank + 1) ** skew for rank in range(len(pool))]
+    chosen = {}
+    while len(chosen) < count:
+        for channel_id in rng.choices(pool, weights, k=count - len(chosen)):
+            chosen[channel_id] = None
+    return list(chosen)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100, help="accounts to sync")
+    parser.add_argument("--subscriptions", type=int, default=200, help="channels per account")
+    parser.add_argument("--pool", type=int, default=10000, help="distinct channels across all accounts")
+    parser.add_argument("--skew", type=float, default=1.0, help="Zipf exponent of channel popularity")
+    parser.add_argument("--cache-size", type=int, default=200000, help="CHANNEL_CACHE_SIZE")
+    parser.add_argument("--groups", type=int, default=5, help="report rows (users are split evenly)")
+    args = parser.parse_args()
+
+    root = scratch_environment("batch", 4, {"CHANNEL_CACHE_SIZE": args.cache_size})
+    print(f"🧪 Scratch data in {root} ({args.users} users × {args.subscriptions} of {args.pool:,} channels)")
+
+    from google.auth.credentials import AnonymousCredentials
+
+    from backend.cache import channel_cache_size
+    from backend.youtube import sync_subscriptions
+
+    rng = random.Random(0)
+    pool = [f"UC{i:022d}" for i in range(args.pool)]
+    credentials = AnonymousCredentials()
+    uncached = math.ceil(args.subscriptions / 50)  # channels.list takes 50 IDs per call
+    group_size = max(1, args.users // args.groups)
+
+    print(f"{'users':>11} {'channels.list/user':>19} {'uncached':>9} {'from cache':>11} {'cache rows':>11}")
+    calls = served = total = 0
+    for user in range(args.users):
+        fake = FakeYouTube(channel_ids=popular_channels(pool, args.subscriptions, args.skew, rng))
+        install(fake)
+        result = sync_subscriptions(credentials, f"bench-{user}@example.com", full=True)
+        if result is None:
+            raise RuntimeError(f"Sync failed for user {user}")
+        calls += fake.calls.get("channels.list", 0)
+        served += result.channels_from_cache
+        total += len(result.channels)
+
+        if (user + 1) % group_size == 0 or user + 1 == args.users:
+            first = user + 1 - ((user % group_size) + 1)
+            synced = user + 1 - first
+            print(
+                f"{first + 1:>5}-{user + 1:<5} {calls / synced:>19.2f} {uncached:>9} "
+                f"{served / max(total, 1):>10.0%} {channel_cache_size():>11,}"
+            )
+            calls = served = total = 0
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_client.py
+"""
+Per-call cost of building the YouTube client on every fetch versus reusing the shared one.
+
+Part 1 times build("youtube", "v3", credentials=...) plus one request object (the old path)
+against backend.client.get_service() + authorized_http() (the new path). No network is used.
+Part 2 sends requests to a local HTTP/1.1 server with a fresh httplib2.Http per call versus the
+reused per-thread transport. Against googleapis.com every new connection also pays a TLS handshake,
+so the real saving is larger than shown here.
+
+    python -m benchmarks.bench_client --iterations 50 --requests 200
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import httplib2
+from google.auth.credentials import AnonymousCredentials
+from googleapiclient.discovery import build
+
+from backend import client
+
+def _ms_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+def bench_build(iterations: int) -> tuple[float, float]:
+    creds = AnonymousCredentials()
+
+    def per_call_build():
+        youtube = build("youtube", "v3", credentials=creds)
+        youtube.channels().list(part="snippet,statistics", id="UC_x5XG1OV2P6uZZ5FSM9Ttw")
+
+    def shared_service():
+        youtube = client.get_service()
+        client.authorized_http(creds)
+        youtube.channels().list(part="snippet,statistics", id="UC_x5XG1OV2P6uZZ5FSM9Ttw")
+
+    client.get_service()  # the one-off build is paid at first use, not per call
+    return _ms_per_call(per_call_build, iterations), _ms_per_call(shared_service, iterations)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections open between requests
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        _Handler.connections += 1
+
+    def do_GET(self):
+        body = b'{"items": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def bench_keep_alive(requests: int) -> list[tuple[str, float, int]]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/youtube/v3/channels"
+
+    results = []
+    shared = httplib2.Http()
+    for label, http_for_call in (
+        ("new Http per call", lambda: httplib2.Http()),
+        ("reused Http", lambda: shared),
+    ):
+        _Handler.connections = 0
+        ms = _ms_per_call(lambda: http_for_call().request(url, "GET"), requests)
+        results.append((label, ms, _Handler.connections))
+
+    shared.close()
+    server.shutdown()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    old, new = bench_build(args.iterations)
+    print(f"client per call:   build() {old:8.2f} ms   shared service {new:8.3f} ms   ({old / new:,.0f}x)")
+
+    for label, ms, connections in bench_keep_alive(args.requests):
+        print(f"{label:<18} {ms:8.3f} ms/request   {connections} connection(s) opened")
+
+if __name__ == "__main__":
+    main()
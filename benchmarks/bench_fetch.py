@@ -0,0 +1,168 @@
+# benchmarks/bench_fetch.py
+"""
+Offline benchmark of the subscription fetch and dashboard render paths.
+
+Runs every phase a dashboard load goes through against benchmarks.fake_youtube (no network, no
+quota) for synthetic users of each --sizes subscription count: a cold full sync, an incremental
+sync (all pages 304), normalization, latest-video detection and card rendering. Reports wall
+time, API calls, HTTP round trips, thumbnail downloads, bytes transferred and peak traced
+memory per phase.
+
+The run uses fresh databases and a scratch secrets.toml in a temporary directory, so it never
+touches real data. --json saves the results; --baseline compares against a saved run and exits
+non-zero when a phase needs more API calls or gets slower than --tolerance allows.
+
+    python -m benchmarks.bench_fetch --sizes 10,100,1000,10000 --latency-ms 50
+    python -m benchmarks.bench_fetch --json before.json
+    python -m benchmarks.bench_fetch --baseline before.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.fake_youtube import FakeYouTube, install
+
+# Phases faster than this are too noisy to gate on wall time
+MIN_GATED_MS = 5.0
+
+def scratch_environment(mode: str, workers: int, extra: dict | None = None) -> str:
+    """
+    Move into a temporary directory with its own secrets (plus `extra` settings) so every
+    database is created fresh. Must run before backend (and streamlit) is imported.
+    """
+    root = tempfile.mkdtemp(prefix="youtufy-bench-")
+    os.makedirs(os.path.join(root, ".streamlit"))
+    with open(os.path.join(root, ".streamlit", "secrets.toml"), "w") as f:
+        f.write(
+            'USER_DB = "data/users.db"\n'
+            'CACHE_DB = "data/cache.db"\n'
+            'HISTORY_DB = "data/history.db"\n'
+            "YOUTUBE_DAILY_QUOTA = 1000000000\n"
+            f'CHANNEL_FETCH_MODE = "{mode}"\n'
+            f"CHANNEL_FETCH_WORKERS = {workers}\n"
+            + "".join(f"{key} = {json.dumps(value)}\n" for key, value in (extra or {}).items())
+        )
+    os.chdir(root)
+    return root
+
+def measure(fake: FakeYouTube, phase: str, fn, memory: bool = True):
+    before = fake.snapshot()
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    wall = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if memory else 0
+    tracemalloc.stop()
+    after = fake.snapshot()
+    return result, {
+        "phase": phase,
+        "wall_ms": round(wall * 1000, 2),
+        "calls": after["calls"] - before["calls"],
+        "round_trips": after["round_trips"] - before["round_trips"],
+        "images": after["images"] - before["images"],
+        "bytes": after["bytes"] - before["bytes"],
+        "peak_mb": round(peak / 2 ** 20, 2),
+    }
+
+def run(size: int, latency: float, memory: bool) -> list[dict]:
+    from google.auth.credentials import AnonymousCredentials
+
+    from backend.models import normalize_channels
+    from backend.youtube import sync_subscriptions
+    from backend.videos import add_latest_videos
+    from app.components.channel_grid import DEFAULT_PAGE_SIZE, render_cards
+
+    fake = FakeYouTube(size, latency=latency, seed=size)
+    install(fake)
+    credentials = AnonymousCredentials()
+    user_email = f"bench-{size}@example.com"
+    results = []
+
+    def phase(name, fn):
+        value, stats = measure(fake, name, fn, memory)
+        results.append({"subscriptions": size, **stats})
+        return value
+
+    synced = phase("cold sync", lambda: sync_subscriptions(credentials, user_email, full=True))
+    if synced is None:
+        raise RuntimeError(f"Cold sync failed for {size} subscriptions")
+    phase("incremental sync", lambda: sync_subscriptions(credentials, user_email))
+    df = phase("normalize", lambda: normalize_channels(synced.channels))
+    df = phase("latest videos", lambda: add_latest_videos(credentials, df, user_email))
+    phase("render page", lambda: render_cards(df.head(DEFAULT_PAGE_SIZE)))
+    phase("render all cards", lambda: render_cards(df))
+    return results
+
+def report(results: list[dict]):
+    print(f"{'subs':>6}  {'phase':<18} {'wall ms':>10} {'calls':>7} {'trips':>6} {'imgs':>6} {'bytes':>12} {'peak MB':>8}")
+    for r in results:
+        print(
+            f"{r['subscriptions']:>6}  {r['phase']:<18} {r['wall_ms']:>10.1f} {r['calls']:>7,} "
+            f"{r['round_trips']:>6,} {r.get('images', 0):>6,} {r['bytes']:>12,} {r['peak_mb']:>8.1f}"
+        )
+
+def regressions(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """
+    Phases that need more API calls than the baseline, or are slower beyond the tolerance.
+    """
+    previous = {(r["subscriptions"], r["phase"]): r for r in baseline}
+    found = []
+    for r in results:
+        base = previous.get((r["subscriptions"], r["phase"]))
+        if base is None:
+            continue
+        label = f"{r['phase']} @ {r['subscriptions']} subs"
+        if r["calls"] > base["calls"]:
+            found.append(f"{label}: {base['calls']} → {r['calls']} API calls")
+        if base["wall_ms"] >= MIN_GATED_MS and r["wall_ms"] > base["wall_ms"] * (1 + tolerance):
+            found.append(f"{label}: {base['wall_ms']:.1f} → {r['wall_ms']:.1f} ms")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="comma-separated subscription counts")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated latency per HTTP round trip")
+    parser.add_argument("--mode", choices=["batch", "threads"], default="batch", help="CHANNEL_FETCH_MODE")
+    parser.add_argument("--workers", type=int, default=4, help="CHANNEL_FETCH_WORKERS")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (it slows every phase down)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare against results saved with --json")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed wall-time slowdown vs the baseline")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(os.path.abspath(args.baseline)) as f:
+            baseline = json.load(f)["results"]
+    output = os.path.abspath(args.json) if args.json else None
+
+    root = scratch_environment(args.mode, args.workers)
+    print(f"🧪 Scratch data in {root} (mode={args.mode}, latency={args.latency_ms:g} ms)")
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        results += run(size, args.latency_ms / 1000, memory=not args.no_memory)
+    report(results)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump({"mode": args.mode, "latency_ms": args.latency_ms, "results": results}, f, indent=2)
+        print(f"💾 Results saved to {output}")
+
+    if baseline is not None:
+        found = regressions(results, baseline, args.tolerance)
+        for line in found:
+            print(f"❌ Regression: {line}")
+        if found:
+            sys.exit(1)
+        print("✅ No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
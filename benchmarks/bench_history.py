@@ -0,0 +1,69 @@
+# benchmarks/bench_history.py
+"""
+Growth queries over a large synthetic statistics history.
+
+Fills a scratch history database with --channels × --samples rows (one sample per bucket),
+then times growth() for one user's subscriptions and channel_history() for a single channel.
+Point HISTORY_DB at a scratch file; the rows are synthetic.
+
+    python -m benchmarks.bench_history --channels 20000 --samples 100 --subscriptions 1000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend import db
+from backend import history
+
+def populate(channels: int, samples: int):
+    now = int(time.time())
+    with db.transaction(history.HISTORY_DB) as conn:
+        if conn.execute("SELECT COUNT(*) FROM channel_keys").fetchone()[0] >= channels:
+            return
+        conn.executemany(
+            "INSERT OR IGNORE INTO channel_keys (id, channel_id) VALUES (?, ?)",
+            [(i, f"UC{i:022d}") for i in range(1, channels + 1)],
+        )
+        for key in range(1, channels + 1):
+            subs, rate = random.randint(100, 10 ** 7), random.uniform(0, 500)
+            conn.executemany(
+                "INSERT OR IGNORE INTO channel_stats VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (key, bucket, bucket * history.HISTORY_RESOLUTION, int(subs + rate * n), 100 + n, subs * 50 + n)
+                    for n, bucket in enumerate(range(
+                        (now // history.HISTORY_RESOLUTION) - samples * 12, now // history.HISTORY_RESOLUTION, 12
+                    ))
+                ],
+            )
+
+def timed(label: str, fn, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000:8.1f} ms   ({len(result):,} rows)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--channels", type=int, default=20000)
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--subscriptions", type=int, default=1000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    populate(args.channels, args.samples)
+    rows = db.query_value("SELECT COUNT(*) FROM channel_stats", path=history.HISTORY_DB, default=0)
+    print(f"history rows: {rows:,} (ready in {time.perf_counter() - start:.1f}s)")
+
+    followed = [f"UC{i:022d}" for i in random.sample(range(1, args.channels + 1), args.subscriptions)]
+    timed(f"growth() for {args.subscriptions} channels, 30 days", lambda: history.growth(followed, days=30))
+    timed("growth() top 10 by views, 7 days", lambda: history.growth(followed, days=7, metric="views", limit=10))
+    timed("channel_history() one channel", lambda: history.channel_history(followed[0]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/bench_imports.py
+"""
+Cold-start cost of every page: time to first render in a fresh process.
+
+Each page runs in its own interpreter through Streamlit's AppTest (no browser, no server) as a
+logged-out visitor would see it, with `-X importtime` on. Reports the median time to set up
+streamlit (import plus the first secrets read) and to run the page script once, plus the
+heaviest top-level imports the page triggered. Runs in a scratch directory with its own
+secrets.toml and databases.
+
+    python -m benchmarks.bench_imports
+    python -m benchmarks.bench_imports --repeat 5 --top 8 app/pages/login.py
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+MARKER = "--- page run starts ---"
+
+# Runs inside the child process; importtime lines after MARKER belong to the page
+RUNNER = f"""
+import json, sys, time
+start = time.perf_counter()
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+# The first secrets access installs Streamlit's file watchers: a fixed per-process cost
+st.secrets.get("GOOGLE_CLIENT_SECRET")
+imported = time.perf_counter()
+print({MARKER!r}, file=sys.stderr, flush=True)
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+at.run()
+done = time.perf_counter()
+print(json.dumps({{
+    "streamlit_ms": (imported - start) * 1000,
+    "render_ms": (done - imported) * 1000,
+    "exception": [e.message for e in at.exception][:1],
+}}))
+"""
+
+CLIENT_SECRET = json.dumps({"web": {
+    "client_id": "bench.apps.googleusercontent.com",
+    "client_secret": "bench",
+    "auth_uri": "https://accounts.google.com/o/oauth2/auth",
+    "token_uri": "https://oauth2.googleapis.com/token",
+    "redirect_uris": ["http://localhost:8501/pages/dashboard.py"],
+}})
+
+def scratch_directory() -> str:
+    root = tempfile.mkdtemp(prefix="youtufy-imports-")
+    os.makedirs(os.path.join(root, ".streamlit"))
+    with open(os.path.join(root, ".streamlit", "secrets.toml"), "w") as f:
+        f.write(
+            'USER_DB = "data/users.db"\n'
+            'CACHE_DB = "data/cache.db"\n'
+            'HISTORY_DB = "data/history.db"\n'
+            f"GOOGLE_CLIENT_SECRET = '{CLIENT_SECRET}'\n"
+            'TOKEN_SALT = "bench"\n'
+            "METRICS_FLUSH_INTERVAL = 0\n"
+        )
+    return root
+
+def heaviest_imports(stderr: str, top: int) -> list[tuple[str, float]]:
+    """
+    Top-level modules imported while the page ran, by cumulative import time (ms).
+    """
+    _, _, page_part = stderr.partition(MARKER)
+    found = []
+    for line in page_part.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented; only direct (top-level) imports are kept
+        if not name.startswith("  ") and name.strip() and cumulative.strip().isdigit():
+            found.append((name.strip(), int(cumulative) / 1000))
+    return sorted(found, key=lambda item: item[1], reverse=True)[:top]
+
+def measure(page: str, cwd: str) -> tuple[dict, str]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUNNER, page],
+        cwd=cwd, capture_output=True, text=True, timeout=300,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{page} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", nargs="*", help="page scripts (default: app/main.py and app/pages/*.py)")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per page (median reported)")
+    parser.add_argument("--top", type=int, default=5, help="heaviest imports to list per page")
+    args = parser.parse_args()
+
+    pages = [os.path.abspath(p) for p in args.pages] or [
+        os.path.join(ROOT, "app", "main.py"), *sorted(glob.glob(os.path.join(ROOT, "app", "pages", "*.py")))
+    ]
+    cwd = scratch_directory()
+    print(f"🧪 Scratch data in {cwd}")
+    print(f"{'page':<28} {'streamlit ms':>13} {'first render ms':>16}  heaviest page imports (ms)")
+
+    for page in pages:
+        runs = [measure(page, cwd) for _ in range(args.repeat)]
+        streamlit_ms = statistics.median(r["streamlit_ms"] for r, _ in runs)
+        render_ms = statistics.median(r["render_ms"] for r, _ in runs)
+        heavy = ", ".join(f"{name} {ms:.0f}" for name, ms in heaviest_imports(runs[-1][1], args.top))
+        label = os.path.relpath(page, ROOT)
+        print(f"{label:<28} {streamlit_ms:>13.0f} {render_ms:>16.0f}  {heavy}")
+        if runs[-1][0]["exception"]:
+            print(f"{'':<28} ⚠️ page raised: {runs[-1][0]['exception'][0][:100]}")
+
+if __name__ == "__main__":
+    main()
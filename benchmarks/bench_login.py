@@ -0,0 +1,70 @@
+# benchmarks/bench_login.py
+"""
+Login throughput at different password-hash pool sizes.
+
+Simulates a burst of concurrent logins (one thread per Streamlit session) and reports
+logins/second plus how late a 10 ms "other session" heartbeat fires while the burst runs.
+Pool size 0 hashes inline on the session threads (the old behaviour).
+
+    python -m benchmarks.bench_login --logins 200 --concurrency 16 --pools 0,1,2,4,8
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from werkzeug.security import generate_password_hash
+
+from backend import auth
+
+PASSWORD = "correct horse battery staple"
+
+def _heartbeat(stop: threading.Event, lags: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        time.sleep(0.01)
+        lags.append(time.perf_counter() - start - 0.01)
+
+def run(pool_size: int, logins: int, concurrency: int, hashed: str) -> tuple[float, float]:
+    auth.configure_hash_pool(pool_size)
+    auth.check_password(hashed, PASSWORD)  # start the worker processes outside the timed section
+
+    stop, lags = threading.Event(), []
+    heartbeat = threading.Thread(target=_heartbeat, args=(stop, lags), daemon=True)
+    heartbeat.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as sessions:
+        results = list(sessions.map(lambda _: auth.check_password(hashed, PASSWORD), range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    heartbeat.join()
+    assert all(results), "password check failed"
+
+    p99_lag = statistics.quantiles(lags, n=100)[98] if len(lags) >= 100 else max(lags, default=0.0)
+    return logins / elapsed, p99_lag
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pools", default="0,1,2,4,8", help="comma-separated pool sizes")
+    parser.add_argument("--method", default=auth.PASSWORD_HASH_METHOD, help="werkzeug hash method")
+    args = parser.parse_args()
+
+    hashed = generate_password_hash(PASSWORD, args.method)
+    print(f"method={args.method} logins={args.logins} concurrency={args.concurrency}")
+    print(f"{'pool':>5} {'logins/s':>10} {'p99 heartbeat lag (ms)':>24}")
+    for pool_size in (int(p) for p in args.pools.split(",")):
+        rate, lag = run(pool_size, args.logins, args.concurrency, hashed)
+        print(f"{pool_size:>5} {rate:>10.1f} {lag * 1000:>24.1f}")
+    auth.configure_hash_pool(0)
+
+if __name__ == "__main__":
+    main()
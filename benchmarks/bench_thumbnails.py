@@ -0,0 +1,67 @@
+# benchmarks/bench_thumbnails.py
+"""
+Offline benchmark of channel-card thumbnails: hotlinked vs served from the local store.
+
+Renders one grid page of --page-size cards for a synthetic account in each THUMBNAIL_MODE, twice:
+cold (empty store, thumbnails are downloaded from benchmarks.fake_youtube's image stand-in with
+--latency-ms per download) and warm. Reports render time, downloads, HTML bytes sent to the
+browser and the image requests the browser still has to make to a third party, then the store
+size after evicting down to --cache-size URLs. Runs in a scratch directory.
+
+    python -m benchmarks.bench_thumbnails
+    python -m benchmarks.bench_thumbnails --page-size 96 --latency-ms 80 --cache-size 50
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_fetch import scratch_environment
+from benchmarks.fake_youtube import FakeYouTube, install
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=24, help="cards on the rendered page")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="simulated latency per image download")
+    parser.add_argument("--cache-size", type=int, default=0, help="evict the store down to this many URLs at the end")
+    args = parser.parse_args()
+
+    root = scratch_environment("batch", 4, {"METRICS_FLUSH_INTERVAL": 0})
+    print(f"🧪 Scratch data in {root} ({args.page_size} cards, {args.latency_ms:g} ms per image)")
+
+    from backend.models import normalize_channels
+    from backend import thumbnails
+    from app.components.channel_grid import render_cards
+
+    print(f"{'mode':<8} {'pass':<5} {'wall ms':>9} {'downloads':>10} {'HTML bytes':>11} {'3rd-party imgs':>15}")
+    for index, mode in enumerate(["remote", "inline", "sprite"]):
+        # A distinct account per mode, so every mode starts from a cold store
+        fake = FakeYouTube(args.page_size, latency=args.latency_ms / 1000, seed=index)
+        install(fake)
+        df = normalize_channels([fake._channel(channel_id) for channel_id in fake.channel_ids])
+        for label in ("cold", "warm"):
+            before = fake.snapshot()["images"]
+            start = time.perf_counter()
+            page = render_cards(df, thumbnail_mode=mode)
+            wall = time.perf_counter() - start
+            remote = len(set(re.findall(r'src="(https?://[^"]+)"', page)))
+            print(
+                f"{mode:<8} {label:<5} {wall * 1000:>9.1f} {fake.snapshot()['images'] - before:>10} "
+                f"{len(page.encode()):>11,} {remote:>15}"
+            )
+        # Let downloads that missed the render deadline finish before the next mode's account
+        thumbnails.fetch_thumbnails(df["thumbnailUrl"].dropna().tolist(), timeout=None)
+
+    urls, size = thumbnails.thumbnail_store_size()
+    evicted = thumbnails.evict_thumbnails(args.cache_size)
+    remaining, remaining_size = thumbnails.thumbnail_store_size()
+    print(
+        f"💾 Store: {urls} URLs, {size / 1024:,.1f} KiB on disk · evicted {evicted} down to "
+        f"{remaining} URLs, {remaining_size / 1024:,.1f} KiB"
+    )
+
+if __name__ == "__main__":
+    main()
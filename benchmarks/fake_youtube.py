@@ -0,0 +1,266 @@
+# benchmarks/fake_youtube.py
+"""
+Offline stand-in for the YouTube Data API.
+
+FakeYouTube generates a deterministic synthetic account with any number of subscriptions and
+answers subscriptions.list, channels.list and playlistItems.list (plain and multipart batch
+requests) through an httplib2-compatible transport, with optional per-round-trip latency.
+It honours If-None-Match on subscription pages, so incremental syncs see 304s like the real API.
+
+FakeImages stands in for the thumbnail CDN (yt3.ggpht.com): a requests transport adapter that
+draws a deterministic PNG per URL with Pillow and answers 404 for about 1% of them.
+
+install(fake) routes backend.client's per-thread transports and backend.thumbnails' downloads
+through the fakes; pair it with google.auth AnonymousCredentials so the real AuthorizedHttp
+wrapper stays in the path.
+"""
+import hashlib
+import io
+import json
+import threading
+import time
+from email.parser import Parser
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import httplib2
+
+PAGE_SIZE = 50
+WORDS = (
+    "music cooking travel gaming science history physics guitar piano vlog review tech coding "
+    "python tutorial news comedy sports fitness art design film animation podcast"
+).split()
+
+def _digest(*parts) -> str:
+    return hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+
+class FakeYouTube:
+    """
+    Synthetic account with `subscriptions` channels (or exactly `channel_ids`, to model users who
+    share channels). Counts API calls, HTTP round trips and bytes.
+    """
+
+    def __init__(self, subscriptions: int = 0, latency: float = 0.0, seed: int = 0, channel_ids: list[str] | None = None):
+        self.latency = latency
+        self.channel_ids = channel_ids if channel_ids is not None else [
+            f"UC{_digest(seed, i)}{i:06d}" for i in range(subscriptions)
+        ]
+        self.calls: dict[str, int] = {}
+        self.round_trips = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.image_requests = 0
+        self._lock = threading.Lock()
+
+    # 📊 Counters
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": sum(self.calls.values()),
+                "round_trips": self.round_trips,
+                "bytes": self.bytes_sent + self.bytes_received,
+                "images": self.image_requests,
+            }
+
+    def _count(self, method: str, sent: int, received: int):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            self.bytes_sent += sent
+            self.bytes_received += received
+
+    # 📦 Synthetic resources
+    def _channel(self, channel_id: str) -> dict:
+        h = int(_digest(channel_id), 16)
+        words = [WORDS[(h >> (i * 5)) % len(WORDS)] for i in range(40)]
+        return {
+            "kind": "youtube#channel",
+            "etag": _digest("channel", channel_id),
+            "id": channel_id,
+            "snippet": {
+                "title": " ".join(words[:3]).title(),
+                "description": " ".join(words),
+                "publishedAt": f"20{10 + h % 14:02d}-{1 + h % 12:02d}-{1 + h % 28:02d}T12:00:00Z",
+                "country": ["US", "GB", "DE", "IN", "BR", "RW"][h % 6],
+                "thumbnails": {"default": {"url": f"https://yt3.ggpht.com/{channel_id}=s88", "width": 88, "height": 88}},
+            },
+            "statistics": {
+                "viewCount": str(h % 10 ** 9),
+                "subscriberCount": str(h % 10 ** 7),
+                "hiddenSubscriberCount": False,
+                "videoCount": str(h % 5000),
+            },
+            "contentDetails": {"relatedPlaylists": {"uploads": "UU" + channel_id[2:]}},
+        }
+
+    def _subscriptions(self, params: dict) -> dict:
+        start = int(params.get("pageToken", ["0"])[0] or 0)
+        page = self.channel_ids[start:start + PAGE_SIZE]
+        response = {
+            "kind": "youtube#subscriptionListResponse",
+            "etag": _digest("page", start, *page),
+            "pageInfo": {"totalResults": len(self.channel_ids), "resultsPerPage": PAGE_SIZE},
+            "items": [
+                {
+                    "kind": "youtube#subscription",
+                    "etag": _digest("subscription", cid),
+                    "id": _digest("sub-id", cid),
+                    "snippet": {"title": cid, "resourceId": {"kind": "youtube#channel", "channelId": cid}},
+                    "contentDetails": {"totalItemCount": 10, "newItemCount": 0},
+                }
+                for cid in page
+            ],
+        }
+        if start + PAGE_SIZE < len(self.channel_ids):
+            response["nextPageToken"] = str(start + PAGE_SIZE)
+        return response
+
+    def _channels(self, params: dict) -> dict:
+        ids = params.get("id", [""])[0].split(",")
+        parts = params.get("part", [""])[0].split(",")
+        items = []
+        for cid in ids:
+            if cid:
+                channel = self._channel(cid)
+                items.append({k: v for k, v in channel.items() if k in ("kind", "etag", "id") or k in parts})
+        return {"kind": "youtube#channelListResponse", "items": items}
+
+    def _playlist_items(self, params: dict) -> dict:
+        playlist_id = params.get("playlistId", [""])[0]
+        h = int(_digest(playlist_id), 16)
+        if h % 50 == 0:
+            return None  # channel without uploads → 404
+        video_id = _digest("video", playlist_id)[:11]
+        published = f"2025-{1 + h % 12:02d}-{1 + h % 28:02d}T08:00:00Z"
+        return {
+            "kind": "youtube#playlistItemListResponse",
+            "items": [{
+                "snippet": {"title": f"Video {video_id}", "publishedAt": published},
+                "contentDetails": {"videoId": video_id, "videoPublishedAt": published},
+            }],
+        }
+
+    def handle(self, method: str, uri: str, headers: dict) -> tuple[int, str]:
+        """
+        Answer one API request; returns (status, JSON body).
+        """
+        url = urlsplit(uri)
+        params = parse_qs(url.query)
+        resource = url.path.rstrip("/").rsplit("/", 1)[-1]
+        handlers = {"subscriptions": self._subscriptions, "channels": self._channels, "playlistItems": self._playlist_items}
+        if resource not in handlers:
+            return 404, json.dumps({"error": {"code": 404, "message": f"Unknown resource {resource}"}})
+
+        body = handlers[resource](params)
+        if body is None:
+            return 404, json.dumps({"error": {"code": 404, "message": "playlistNotFound"}})
+        if resource == "subscriptions" and headers.get("if-none-match") == body["etag"]:
+            return 304, ""
+        return 200, json.dumps(body)
+
+class FakeHttp:
+    """
+    httplib2.Http look-alike serving requests from a FakeYouTube.
+    """
+
+    def __init__(self, fake: FakeYouTube, timeout=None):
+        self.fake = fake
+        self.timeout = timeout
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        with self.fake._lock:
+            self.fake.round_trips += 1
+
+        if urlsplit(uri).path.startswith("/batch"):
+            return self._batch(body, headers)
+
+        status, content = self.fake.handle(method, uri, headers)
+        self.fake._count(urlsplit(uri).path.rsplit("/", 1)[-1] + ".list", len(uri), len(content))
+        return self._response(status, "application/json; charset=UTF-8"), content.encode()
+
+    def _batch(self, body, headers):
+        if isinstance(body, bytes):
+            body = body.decode()
+        message = Parser().parsestr(f"content-type: {headers['content-type']}\r\n\r\n{body}")
+        boundary = "batch_" + _digest(time.time())
+        parts = []
+        for part in message.get_payload():
+            request_line, _, rest = part.get_payload().partition("\n")
+            sub_headers = {k.lower(): v for k, v in Parser().parsestr(rest).items()}
+            method, path, _ = request_line.strip().split(" ", 2)
+            status, content = self.fake.handle(method, "https://youtube.googleapis.com" + path, sub_headers)
+            self.fake._count(urlsplit(path).path.rsplit("/", 1)[-1] + ".list", len(part.as_string()), len(content))
+            parts.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\nContent-Length: {len(content)}\r\n\r\n"
+                f"{content}\r\n"
+            )
+        payload = "".join(parts) + f"--{boundary}--\r\n"
+        return self._response(200, f"multipart/mixed; boundary={boundary}"), payload.encode()
+
+    @staticmethod
+    def _response(status: int, content_type: str) -> httplib2.Response:
+        return httplib2.Response({"status": str(status), "content-type": content_type})
+
+    def close(self):
+        pass
+
+class FakeImages:
+    """
+    requests transport adapter serving synthetic channel thumbnails; counts into a FakeYouTube.
+    """
+
+    def __init__(self, fake: FakeYouTube, size: int = 88):
+        self.fake = fake
+        self.size = size
+
+    def _image(self, url: str) -> bytes:
+        from PIL import Image, ImageDraw
+
+        h = int(_digest(url), 16)
+        image = Image.new("RGB", (self.size, self.size), (h & 255, (h >> 8) & 255, (h >> 16) & 255))
+        draw = ImageDraw.Draw(image)
+        inset = self.size // 4
+        draw.ellipse((inset, inset, self.size - inset, self.size - inset), fill=((h >> 24) & 255, 255 - (h & 255), 128))
+        out = io.BytesIO()
+        image.save(out, "PNG")
+        return out.getvalue()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        from requests import Response
+        from requests.structures import CaseInsensitiveDict
+
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+        missing = int(_digest("thumbnail", request.url), 16) % 100 == 0
+        content = b"Not Found" if missing else self._image(request.url)
+        with self.fake._lock:
+            self.fake.image_requests += 1
+            self.fake.bytes_sent += len(request.url)
+            self.fake.bytes_received += len(content)
+
+        response = Response()
+        response.status_code = 404 if missing else 200
+        response.headers = CaseInsensitiveDict({"content-type": "text/plain" if missing else "image/png"})
+        response._content = content
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+def install(fake: FakeYouTube):
+    """
+    Make backend.client open FakeHttp transports (for new threads and the current one) and
+    backend.thumbnails fetch from FakeImages.
+    """
+    from backend import client, thumbnails
+
+    client.httplib2 = SimpleNamespace(Http=lambda timeout=None: FakeHttp(fake, timeout))
+    client.reset_transport()
+    thumbnails.get_session().mount("https://yt3.ggpht.com/", FakeImages(fake))
@@ -0,0 +1,47 @@
+# tests/conftest.py
+"""
+Test setup: every run gets a scratch directory with its own secrets.toml and databases.
+
+Settings are read from st.secrets when modules are imported, so the scratch directory is
+prepared (and made the working directory) here, before any test module imports the app.
+
+    python -m pytest tests
+"""
+import os
+import socket
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+SMTP_PORT = _free_port()
+SCRATCH = tempfile.mkdtemp(prefix="youtufy-tests-")
+
+os.makedirs(os.path.join(SCRATCH, ".streamlit"))
+with open(os.path.join(SCRATCH, ".streamlit", "secrets.toml"), "w") as f:
+    f.write(
+        'USER_DB = "data/users.db"\n'
+        'CACHE_DB = "data/cache.db"\n'
+        'HISTORY_DB = "data/history.db"\n'
+        "METRICS_FLUSH_INTERVAL = 0\n"
+        'SMTP_HOST = "127.0.0.1"\n'
+        f"SMTP_PORT = {SMTP_PORT}\n"
+        "SMTP_USE_SSL = false\n"
+        'DEFAULT_EMAIL = "tests@youtufy.com"\n'
+        "MAIL_RATE_PER_SEC = 20\n"
+        'THUMBNAIL_DIR = "data/thumbnails"\n'
+        'TOKEN_SALT = "tests-signing-key"\n'
+    )
+os.chdir(SCRATCH)
+
+@pytest.fixture
+def smtp_port() -> int:
+    return SMTP_PORT
@@ -0,0 +1,55 @@
+# tests/image_server.py
+"""
+Local stand-in for the thumbnail CDN: an HTTP server on 127.0.0.1 that serves whatever images
+a test registers, answers 404 for everything else and counts requests per path.
+"""
+import io
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def png(color: tuple[int, int, int], size: tuple[int, int] = (88, 88)) -> bytes:
+    from PIL import Image
+
+    out = io.BytesIO()
+    Image.new("RGB", size, color).save(out, "PNG")
+    return out.getvalue()
+
+class ImageServer:
+    """
+    images maps a path ("/a.png") to its bytes; hits counts requests per path.
+    """
+
+    def __init__(self):
+        self.images: dict[str, bytes] = {}
+        self.hits = Counter()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits[self.path] += 1
+                body = server.images.get(self.path)
+                self.send_response(200 if body is not None else 404)
+                self.send_header("Content-Type", "image/png" if body is not None else "text/plain")
+                body = body if body is not None else b"Not Found"
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,88 @@
+# tests/smtp_stub.py
+"""
+Minimal local SMTP server for tests: speaks just enough SMTP for smtplib (EHLO, MAIL, RCPT,
+DATA, NOOP, RSET, QUIT), keeps every accepted message and can be told to fail on purpose.
+"""
+import socketserver
+import threading
+import time
+from email import message_from_bytes
+
+class SMTPStub:
+    """
+    Threaded SMTP server on 127.0.0.1:port. `messages` holds (arrival time, parsed message).
+    fail_next_data(n) answers the next n DATA commands with a transient 451;
+    refused holds recipients rejected with a permanent 550.
+    """
+
+    def __init__(self, port: int):
+        self.messages = []
+        self.refused: set[str] = set()
+        self.connections = 0
+        self._failures = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(line.encode() + b"\r\n")
+
+            def handle(self):
+                with stub._lock:
+                    stub.connections += 1
+                self.reply("220 stub ESMTP")
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode().strip()
+                    verb = command.split(" ", 1)[0].upper()
+                    if verb in ("EHLO", "HELO"):
+                        self.reply("250 stub")
+                    elif verb in ("MAIL", "NOOP", "RSET"):
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        address = command.partition(":")[2].strip().strip("<>")
+                        self.reply("550 No such user" if address in stub.refused else "250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = b""
+                        while not data.endswith(b"\r\n.\r\n"):
+                            chunk = self.rfile.readline()
+                            if not chunk:
+                                return
+                            data += chunk
+                        with stub._lock:
+                            fail = stub._failures > 0
+                            if fail:
+                                stub._failures -= 1
+                            else:
+                                stub.messages.append((time.time(), message_from_bytes(data[:-5])))
+                        self.reply("451 Try again later" if fail else "250 Queued")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        self.reply("502 Not implemented")
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self.server = Server(("127.0.0.1", port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def fail_next_data(self, count: int = 1):
+        with self._lock:
+            self._failures = count
+
+    def recipients(self) -> list[str]:
+        return [msg["To"] for _, msg in self.messages]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
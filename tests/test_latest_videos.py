@@ -0,0 +1,50 @@
+# tests/test_latest_videos.py
+import threading
+
+import pytest
+
+from backend import db, videos
+from backend.cache import CACHE_DB, save_latest_videos, save_upload_playlists
+
+@pytest.fixture
+def background(monkeypatch):
+    """Record background fetches instead of calling the API."""
+    calls = []
+    done = threading.Event()
+
+    def fetch_latest_videos(credentials, channels, user_email, priority="interactive"):
+        calls.append((dict(channels), user_email, priority))
+        done.set()
+        return {}
+
+    db.execute("DELETE FROM latest_videos", path=CACHE_DB)
+    monkeypatch.setattr(videos, "fetch_latest_videos", fetch_latest_videos)
+    return calls, done
+
+def test_interactive_load_serves_cache_and_fetches_misses_in_background(background):
+    calls, done = background
+    save_upload_playlists({"UCfresh": "UUfresh", "UCstale": "UUstale", "UCnew": "UUnew"})
+    save_latest_videos({
+        "UCfresh": {"videoId": "fresh", "title": "Fresh", "publishedAt": "2026-10-01T00:00:00Z"},
+        "UCstale": {"videoId": "stale", "title": "Stale", "publishedAt": "2026-01-01T00:00:00Z"},
+    })
+    db.execute(
+        "UPDATE latest_videos SET fetched_at = fetched_at - ? WHERE channel_id = 'UCstale'",
+        (videos.LATEST_VIDEO_TTL + 60,), path=CACHE_DB,
+    )
+
+    latest = videos.cached_latest_videos(None, {"UCfresh": None, "UCstale": None, "UCnew": None}, "me@example.com")
+
+    # Expired rows are still shown; nothing is known about the new channel yet
+    assert {channel_id: video["videoId"] for channel_id, video in latest.items()} == {"UCfresh": "fresh", "UCstale": "stale"}
+    assert done.wait(5)
+    assert calls == [({"UCstale": None, "UCnew": None}, "me@example.com", "background")]
+
+def test_fully_cached_load_starts_no_fetch(background):
+    calls, done = background
+    save_upload_playlists({"UCfresh": "UUfresh"})
+    save_latest_videos({"UCfresh": {"videoId": "fresh", "title": "Fresh", "publishedAt": "2026-10-01T00:00:00Z"}})
+
+    assert videos.cached_latest_videos(None, {"UCfresh": None}, "me@example.com")["UCfresh"]["videoId"] == "fresh"
+    assert not done.wait(0.2)
+    assert calls == []
@@ -0,0 +1,88 @@
+# tests/test_mail_queue.py
+import threading
+import time
+
+import pytest
+
+from backend import db
+from tests.smtp_stub import SMTPStub
+from utils import mail_queue
+from utils.mail_queue import SMTPPool, deliver_batch, enqueue, enqueue_many
+
+@pytest.fixture
+def smtp(smtp_port):
+    db.execute("DELETE FROM outbound_mail")
+    with SMTPStub(smtp_port) as stub:
+        yield stub
+
+@pytest.fixture
+def pool():
+    pool = SMTPPool()
+    yield pool
+    pool.close()
+
+def _status(mail_id: int):
+    return db.query_one("SELECT status, attempts, last_error FROM outbound_mail WHERE id = ?", (mail_id,))
+
+def test_deliver_batch_sends_over_one_session(smtp, pool):
+    enqueue_many([(f"user{i}@example.com", f"Hello {i}", "Body") for i in range(3)])
+
+    assert deliver_batch(pool) == 3
+    assert sorted(smtp.recipients()) == [f"user{i}@example.com" for i in range(3)]
+    assert smtp.messages[0][1]["From"] == "tests@youtufy.com"
+    assert smtp.connections == 1
+    assert mail_queue.queue_stats() == {"sent": 3}
+
+def test_transient_failure_is_retried(smtp, pool):
+    mail_id = enqueue("retry@example.com", "Retry", "Body")
+    smtp.fail_next_data()
+
+    assert deliver_batch(pool) == 0
+    row = _status(mail_id)
+    assert (row["status"], row["attempts"]) == ("pending", 1)
+    assert "451" in row["last_error"]
+    # Backed off: not due again yet
+    assert deliver_batch(pool) == 0
+
+    db.execute("UPDATE outbound_mail SET next_attempt_at = 0 WHERE id = ?", (mail_id,))
+    assert deliver_batch(pool) == 1
+    assert _status(mail_id)["status"] == "sent"
+    assert smtp.recipients() == ["retry@example.com"]
+
+def test_refused_recipient_fails_permanently(smtp, pool):
+    smtp.refused.add("nobody@example.com")
+    mail_id = enqueue("nobody@example.com", "Hi", "Body")
+
+    assert deliver_batch(pool) == 0
+    assert _status(mail_id)["status"] == "failed"
+
+def test_rate_limit_spaces_messages(smtp, pool):
+    enqueue_many([(f"rate{i}@example.com", "Rate", "Body") for i in range(5)])
+
+    assert deliver_batch(pool) == 5
+    arrivals = [arrived for arrived, _ in smtp.messages]
+    # MAIL_RATE_PER_SEC = 20 in the test secrets
+    assert arrivals[-1] - arrivals[0] >= 4 / mail_queue.MAIL_RATE_PER_SEC * 0.9
+
+def test_slow_batch_keeps_its_claim(smtp, pool, monkeypatch):
+    monkeypatch.setattr(mail_queue, "MAIL_RATE_PER_SEC", 10)     # 0.1 s per message
+    monkeypatch.setattr(mail_queue, "MAIL_CLAIM_TIMEOUT", 0.25)  # shorter than the whole batch
+    enqueue_many([(f"slow{i}@example.com", "Slow", "Body") for i in range(6)])
+
+    stolen = []
+    def second_worker():
+        time.sleep(0.4)
+        stolen.extend(mail_queue._claim_batch(10))
+    thief = threading.Thread(target=second_worker)
+    thief.start()
+    assert deliver_batch(pool) == 6
+    thief.join()
+
+    assert stolen == []
+    assert len(smtp.messages) == 6
+
+def test_send_email_now_uses_queue_settings(smtp):
+    from utils.emailer import send_email_now
+
+    send_email_now("now@example.com", "Now", "Body")
+    assert smtp.recipients() == ["now@example.com"]
@@ -0,0 +1,134 @@
+# tests/test_thumbnails.py
+import base64
+import io
+import threading
+import time
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+from backend import db, thumbnails
+from backend.cache import CACHE_DB
+from tests.image_server import ImageServer, png
+
+@pytest.fixture
+def images():
+    db.execute("DELETE FROM thumbnails", path=CACHE_DB)
+    with ImageServer() as server:
+        yield server
+
+def _decode(data_uri: str) -> Image.Image:
+    header, _, payload = data_uri.partition(",")
+    assert header == "data:image/jpeg;base64"
+    return Image.open(io.BytesIO(base64.b64decode(payload)))
+
+def test_download_resizes_and_stores_by_content(images):
+    images.images["/a.png"] = images.images["/copy.png"] = png((200, 30, 30), size=(120, 88))
+    a, copy = images.url("/a.png"), images.url("/copy.png")
+
+    stored = thumbnails.fetch_thumbnails([a, copy], timeout=None)
+
+    # Same pixels under two URLs: one file, named after its content
+    assert stored[a] == stored[copy]
+    path = thumbnails._path(stored[a])
+    assert path.exists()
+    with Image.open(path) as image:
+        assert image.format == "JPEG"
+        assert image.size == (thumbnails.THUMBNAIL_SIZE, thumbnails.THUMBNAIL_SIZE)
+
+    # Served from the store afterwards, without another request
+    [source] = thumbnails.thumbnail_sources([a])
+    assert _decode(source).size == (thumbnails.THUMBNAIL_SIZE, thumbnails.THUMBNAIL_SIZE)
+    assert images.hits["/a.png"] == 1
+
+def test_broken_url_is_remembered_then_retried(images, monkeypatch):
+    url = images.url("/missing.png")
+
+    assert thumbnails.fetch_thumbnails([url], timeout=None) == {url: None}
+    assert thumbnails.thumbnail_sources([url]) == [thumbnails.PLACEHOLDER]
+    assert images.hits["/missing.png"] == 1
+
+    # Once THUMBNAIL_RETRY_AFTER has passed, the URL is tried again
+    images.images["/missing.png"] = png((0, 120, 0))
+    monkeypatch.setattr(thumbnails, "THUMBNAIL_RETRY_AFTER", 0)
+    stored = thumbnails.fetch_thumbnails([url], timeout=None)
+    assert stored[url] is not None
+    assert images.hits["/missing.png"] == 2
+
+def test_new_thumbnail_url_is_downloaded(images):
+    from backend.models import normalize_channels
+    from app.components.channel_grid import render_cards
+
+    images.images["/old.png"] = png((10, 10, 200))
+    images.images["/new.png"] = png((250, 250, 0))
+
+    def channel(thumbnail_url: str) -> dict:
+        return {
+            "id": "UCchannel",
+            "snippet": {"title": "Channel", "thumbnails": {"default": {"url": thumbnail_url}}},
+            "statistics": {"subscriberCount": "1", "videoCount": "1"},
+        }
+
+    thumbnails.fetch_thumbnails([images.url("/old.png")], timeout=None)
+    before = render_cards(normalize_channels([channel(images.url("/old.png"))]), thumbnail_mode="inline")
+    # The channel changed its avatar: the snippet now carries a new URL. The render does not
+    # wait for it and hotlinks it meanwhile; the download it started serves the next render.
+    first = render_cards(normalize_channels([channel(images.url("/new.png"))]), thumbnail_mode="inline")
+    thumbnails.fetch_thumbnails([images.url("/new.png")], timeout=None)
+    after = render_cards(normalize_channels([channel(images.url("/new.png"))]), thumbnail_mode="inline")
+
+    assert images.hits == {"/old.png": 1, "/new.png": 1}
+    assert images.url("/new.png") in first
+    assert "data:image/jpeg;base64," in before and "data:image/jpeg;base64," in after
+    assert before != after
+    assert images.url("/new.png") not in after
+
+def test_render_does_not_wait_for_downloads(images, monkeypatch):
+    from app.components.channel_grid import _thumbnails
+
+    images.images["/slow.png"] = png((5, 5, 5))
+    url = images.url("/slow.png")
+    release = threading.Event()
+    download = thumbnails._download
+    monkeypatch.setattr(thumbnails, "_download", lambda u: release.wait(5) and download(u))
+
+    started = time.perf_counter()
+    _, cards = _thumbnails(pd.Series([url]), "inline")
+    assert time.perf_counter() - started < 1
+    assert url in cards[0]
+
+    release.set()
+    assert thumbnails.fetch_thumbnails([url], timeout=None)[url] is not None
+
+def test_evict_drops_least_recently_used_and_orphaned_files(images):
+    images.images["/shared-1.png"] = images.images["/shared-2.png"] = png((90, 90, 90))
+    images.images["/solo.png"] = png((255, 0, 255))
+    urls = [images.url(path) for path in ("/solo.png", "/shared-1.png", "/shared-2.png")]
+    stored = thumbnails.fetch_thumbnails(urls, timeout=None)
+    for rank, url in enumerate(urls):
+        db.execute("UPDATE thumbnails SET last_used = ? WHERE url = ?", (rank, url), path=CACHE_DB)
+
+    # solo.png is the least recently used and its file is not shared
+    assert thumbnails.evict_thumbnails(2) == 1
+    assert not thumbnails._path(stored[urls[0]]).exists()
+    assert thumbnails.thumbnail_store_size()[0] == 2
+
+    # shared-1.png goes, but its file stays while shared-2.png still points to it
+    assert thumbnails.evict_thumbnails(1) == 1
+    assert thumbnails._path(stored[urls[2]]).exists()
+
+    assert thumbnails.evict_thumbnails(0) == 1
+    assert not thumbnails._path(stored[urls[2]]).exists()
+
+def test_unreadable_file_is_not_cached(images):
+    images.images["/flaky.png"] = png((1, 2, 3))
+    url = images.url("/flaky.png")
+    digest = thumbnails.fetch_thumbnails([url], timeout=None)[url]
+    path = thumbnails._path(digest)
+    data = path.read_bytes()
+
+    path.unlink()
+    assert thumbnails._data_uri(digest) is None
+    path.write_bytes(data)
+    assert thumbnails._data_uri(digest).startswith("data:image/jpeg;base64,")
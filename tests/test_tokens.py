@@ -0,0 +1,84 @@
+# tests/test_tokens.py
+import hashlib
+import json
+import time
+
+import pytest
+
+from backend import auth, db
+from utils import tokens
+from utils.tokens import decode_token, generate_signed_token
+
+@pytest.fixture
+def user():
+    email = "reset@example.com"
+    db.execute("DELETE FROM users WHERE email = ?", (email,))
+    db.execute(
+        "INSERT INTO users (email, username, password, verified) VALUES (?, ?, ?, 1)",
+        (email, "reset", auth.hash_password("old password")),
+    )
+    return email
+
+def test_decode_token_requires_matching_purpose():
+    token = generate_signed_token("someone@example.com", "verify")
+
+    assert decode_token(token, "verify") == "someone@example.com"
+    assert decode_token(token, "reset") is None
+    with pytest.raises(ValueError):
+        decode_token(token, "anything")
+
+def test_reset_link_works_once(user):
+    token = generate_signed_token(user, "reset")
+
+    assert auth.reset_password_with_token(token, "new password") == user
+    assert auth.authenticate(user, "new password")[0] == "ok"
+    assert auth.reset_password_with_token(token, "another password") is None
+
+def test_failed_reset_leaves_link_usable(user):
+    token = generate_signed_token(user, "reset")
+    row = db.query_one("SELECT email, username, password, verified FROM users WHERE email = ?", (user,))
+
+    # The update finds no account, so the whole transaction (nonce included) is rolled back
+    db.execute("DELETE FROM users WHERE email = ?", (user,))
+    assert auth.reset_password_with_token(token, "new password") is None
+
+    db.execute("INSERT INTO users (email, username, password, verified) VALUES (?, ?, ?, ?)", tuple(row))
+    assert auth.reset_password_with_token(token, "new password") == user
+
+def test_verification_token_cannot_reset_password(user):
+    token = generate_signed_token(user, "verify")
+
+    assert auth.reset_password_with_token(token, "new password") is None
+    assert auth.authenticate(user, "old password")[0] == "ok"
+
+def _forge(email: str, purpose: str, key: bytes, key_id: str) -> str:
+    payload = {"e": email, "p": purpose, "x": int(time.time()) + 3600, "n": "forged", "k": key_id}
+    payload_b64 = tokens._b64encode(json.dumps(payload).encode())
+    return f"{tokens.SIGNED_PREFIX}.{payload_b64}.{tokens._sign(key, payload_b64)}"
+
+def test_token_signed_with_default_salt_is_rejected(user):
+    default = tokens._DEFAULT_SALT.encode()
+    for key_id in (tokens.TOKEN_KEY_ID, hashlib.sha256(default).hexdigest()[:8]):
+        forged = _forge(user, "reset", default, key_id)
+        assert decode_token(forged, "reset") is None
+        assert auth.reset_password_with_token(forged, "new password") is None
+    assert auth.authenticate(user, "old password")[0] == "ok"
+
+def test_signing_refused_without_configured_salt(monkeypatch):
+    monkeypatch.setattr(tokens, "SALT", tokens._DEFAULT_SALT)
+    monkeypatch.setattr(tokens, "PREVIOUS_SALTS", [])
+    current, keys = tokens._load_signing_keys()
+    assert current is None and keys == {}
+
+    monkeypatch.setattr(tokens, "_CURRENT_KEY", current)
+    monkeypatch.setattr(tokens, "_SIGNING_KEYS", keys)
+    with pytest.raises(RuntimeError):
+        generate_signed_token("someone@example.com", "verify")
+    forged = _forge("someone@example.com", "verify", tokens._DEFAULT_SALT.encode(), tokens.TOKEN_KEY_ID)
+    assert decode_token(forged, "verify") is None
+
+def test_link_carries_key_id_not_key_fingerprint():
+    token = generate_signed_token("someone@example.com", "verify")
+    payload = json.loads(tokens._b64decode(token.split(".")[1]))
+
+    assert payload["k"] == tokens.TOKEN_KEY_ID
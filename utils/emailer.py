@@ -1,39 +1,55 @@
 # utils/emailer.py
 import os
 import sys
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-import smtplib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from email.message import EmailMessage
 import streamlit as st
+from utils.mail_queue import SMTPPool, enqueue, enqueue_many, ensure_worker
+from utils import metrics
+
 def send_email(to_email: str, subject: str, body: str):
     """
-    Send a plain-text email via SMTP using credentials stored in Streamlit secrets.
+    Queue a plain-text email for delivery by the background mail worker.
+    Returns immediately; the SMTP handshake happens off the request thread.
     """
-    smtp_user = st.secrets["DEFAULT_EMAIL"]
-    smtp_pass = st.secrets["EMAIL_PASSWORD"]
+    try:
+        with metrics.span("email_enqueue"):
+            enqueue(to_email, subject, body)
+            ensure_worker()
+        metrics.increment("emails_queued_total")
+        print(f"✅ Email queued for {to_email}")
+    except Exception as e:
+        print(f"❌ Failed to queue email to {to_email}: {e}")
 
+def send_email_now(to_email: str, subject: str, body: str):
+    """
+    Send a plain-text email synchronously, over the same SMTP settings as the mail queue.
+    """
     msg = EmailMessage()
     msg["Subject"] = subject
-    msg["From"] = smtp_user
+    msg["From"] = st.secrets.get("DEFAULT_EMAIL", "no-reply@youtufy.com")
     msg["To"] = to_email
     msg.set_content(body)
 
+    pool = SMTPPool()
     try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(smtp_user, smtp_pass)
-            smtp.send_message(msg)
-            print(f"✅ Email sent to {to_email}")
+        with metrics.span("email_smtp_send"):
+            pool.send(msg)
+        print(f"✅ Email sent to {to_email}")
     except Exception as e:
         print(f"❌ Failed to send email to {to_email}: {e}")
+    finally:
+        pool.close()
 
-def send_registration_email(email: str, token: str):
+def registration_email(username: str, token: str) -> tuple[str, str]:
     """
-    Email the user a registration confirmation link with embedded token.
+    Build the subject and body of a registration confirmation email.
     """
     link = f"https://youtufy-one.streamlit.app/pages/verify_token.py?token={token}"
     subject = "Confirm Your YouTufy Registration"
+    greeting = f"Welcome to YouTufy, {username} 🎉" if username else "Welcome to YouTufy 🎉"
     body = f"""
-    Welcome to YouTufy 🎉
+    {greeting}
 
     Please verify your email address to activate your account:
 
@@ -43,8 +59,25 @@ def send_registration_email(email: str, token: str):
 
     – The YouTufy Team
     """
+    return subject, body
+
+def send_registration_email(email: str, username: str, token: str):
+    """
+    Email the user a registration confirmation link with embedded token.
+    """
+    subject, body = registration_email(username, token)
     send_email(email, subject, body)
 
+def send_bulk_registration_emails(invites: list[tuple[str, str, str]]) -> int:
+    """
+    Queue registration emails for many (email, username, token) invites in one transaction.
+    """
+    with metrics.span("email_enqueue_bulk"):
+        queued = enqueue_many([(email, *registration_email(username, token)) for email, username, token in invites])
+        ensure_worker()
+    metrics.increment("emails_queued_total", queued)
+    return queued
+
 def send_password_reset_email(email: str, token: str):
     """
     Send password reset instructions with tokenized link.
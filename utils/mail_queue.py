@@ -0,0 +1,253 @@
+# utils/mail_queue.py
+"""
+Durable outbound mail queue with a pooled SMTP sender.
+
+Messages are persisted in the users database and delivered by a worker that keeps one
+SMTP session open, sends in batches and retries failures with backoff. The Streamlit app
+starts an in-process worker thread on first use; it can also run standalone:
+
+    python -m utils.mail_queue
+"""
+import json
+import os
+import smtplib
+import sys
+import threading
+import time
+from email.message import EmailMessage
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import streamlit as st
+
+from backend import db
+from backend.db import DB_PATH
+from utils import metrics
+
+# 📬 SMTP settings (point SMTP_HOST/SMTP_PORT at a local stand-in such as aiosmtpd for testing)
+SMTP_HOST = st.secrets.get("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(st.secrets.get("SMTP_PORT", 465))
+SMTP_USE_SSL = str(st.secrets.get("SMTP_USE_SSL", "true")).lower() == "true"
+SMTP_IDLE_CHECK = 30  # seconds before a reused session is probed with NOOP
+
+MAIL_BATCH_SIZE = int(st.secrets.get("MAIL_BATCH_SIZE", 50))
+MAIL_RATE_PER_SEC = float(st.secrets.get("MAIL_RATE_PER_SEC", 5))
+MAIL_MAX_ATTEMPTS = int(st.secrets.get("MAIL_MAX_ATTEMPTS", 5))
+MAIL_POLL_INTERVAL = 2
+MAIL_CLAIM_TIMEOUT = 300  # a "sending" row not touched for this long belonged to a crashed worker
+
+db.register_migrations(DB_PATH, [
+    ("mail_001_outbound", """
+        CREATE TABLE IF NOT EXISTS outbound_mail (
+            id              INTEGER PRIMARY KEY,
+            to_email        TEXT NOT NULL,
+            subject         TEXT NOT NULL,
+            body            TEXT NOT NULL,
+            status          TEXT NOT NULL DEFAULT 'pending',
+            attempts        INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            claimed_at      REAL,
+            last_error      TEXT,
+            created_at      REAL NOT NULL,
+            sent_at         REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_outbound_mail_due ON outbound_mail (status, next_attempt_at);
+    """),
+])
+
+_worker_thread = None
+_worker_lock = threading.Lock()
+
+# 📥 Producer API
+def enqueue(to_email: str, subject: str, body: str) -> int:
+    """
+    Persist one message for delivery and return its queue ID.
+    """
+    now = time.time()
+    with db.connection() as conn:
+        cur = conn.execute("""
+            INSERT INTO outbound_mail (to_email, subject, body, next_attempt_at, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, (to_email, subject, body, now, now))
+        return cur.lastrowid
+
+def enqueue_many(messages: list[tuple[str, str, str]]) -> int:
+    """
+    Persist many (to_email, subject, body) messages in one transaction. Returns the count queued.
+    """
+    now = time.time()
+    db.execute_many("""
+        INSERT INTO outbound_mail (to_email, subject, body, next_attempt_at, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(to, subject, body, now, now) for to, subject, body in messages])
+    return len(messages)
+
+def queue_stats() -> dict[str, int]:
+    rows = db.query_all("SELECT status, COUNT(*) FROM outbound_mail GROUP BY status")
+    return {status: count for status, count in rows}
+
+# 🔌 Pooled SMTP session
+class SMTPPool:
+    """
+    Keeps a single logged-in SMTP session open and reconnects when it goes away.
+    """
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, use_ssl: bool = SMTP_USE_SSL):
+        self.host = host
+        self.port = port
+        self.use_ssl = use_ssl
+        self._smtp = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        smtp_cls = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = smtp_cls(self.host, self.port, timeout=30)
+        user = st.secrets.get("DEFAULT_EMAIL")
+        password = st.secrets.get("EMAIL_PASSWORD")
+        if user and password:
+            smtp.login(user, password)
+        return smtp
+
+    def session(self):
+        if self._smtp is not None and time.time() - self._last_used > SMTP_IDLE_CHECK:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self.close()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        self._last_used = time.time()
+        return self._smtp
+
+    def send(self, msg: EmailMessage):
+        try:
+            self.session().send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Server dropped an idle session: reconnect once and resend
+            self.close()
+            self.session().send_message(msg)
+        self._last_used = time.time()
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+# 📤 Delivery
+def _claim_batch(limit: int) -> list:
+    now = time.time()
+    with db.transaction() as conn:
+        rows = conn.execute("""
+            SELECT id, to_email, subject, body, attempts FROM outbound_mail
+            WHERE (status = 'pending' AND next_attempt_at <= ?)
+               OR (status = 'sending' AND claimed_at < ?)
+            ORDER BY next_attempt_at
+            LIMIT ?
+        """, (now, now - MAIL_CLAIM_TIMEOUT, limit)).fetchall()
+        conn.executemany(
+            "UPDATE outbound_mail SET status = 'sending', claimed_at = ? WHERE id = ?",
+            [(now, row["id"]) for row in rows]
+        )
+    return rows
+
+def _refresh_claim(mail_ids: list[int]):
+    """
+    Renew the claim on rows still waiting in this worker's batch, so a slow (rate-limited) batch
+    is never mistaken for a crashed worker and re-sent by another one.
+    """
+    if mail_ids:
+        db.execute(
+            "UPDATE outbound_mail SET claimed_at = ? WHERE status = 'sending' AND id IN (SELECT value FROM json_each(?))",
+            (time.time(), json.dumps(mail_ids))
+        )
+
+def _mark_sent(mail_id: int):
+    db.execute(
+        "UPDATE outbound_mail SET status = 'sent', sent_at = ?, last_error = NULL WHERE id = ?",
+        (time.time(), mail_id)
+    )
+
+def _mark_failed(mail_id: int, attempts: int, error: Exception, permanent: bool):
+    attempts += 1
+    if permanent or attempts >= MAIL_MAX_ATTEMPTS:
+        status, next_attempt = "failed", time.time()
+    else:
+        status, next_attempt = "pending", time.time() + min(3600, 30 * 2 ** attempts)
+    db.execute("""
+        UPDATE outbound_mail SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?
+        WHERE id = ?
+    """, (status, attempts, next_attempt, str(error)[:500], mail_id))
+
+def deliver_batch(pool: SMTPPool, batch_size: int = MAIL_BATCH_SIZE) -> int:
+    """
+    Send up to batch_size due messages over the pooled session. Returns the number sent.
+    """
+    sender = st.secrets.get("DEFAULT_EMAIL", "no-reply@youtufy.com")
+    min_interval = 1 / MAIL_RATE_PER_SEC if MAIL_RATE_PER_SEC > 0 else 0
+    sent = 0
+
+    rows = _claim_batch(batch_size)
+    for index, row in enumerate(rows):
+        started = time.time()
+        _refresh_claim([r["id"] for r in rows[index:]])
+
+        msg = EmailMessage()
+        msg["Subject"] = row["subject"]
+        msg["From"] = sender
+        msg["To"] = row["to_email"]
+        msg.set_content(row["body"])
+
+        try:
+            pool.send(msg)
+            _mark_sent(row["id"])
+            sent += 1
+        except smtplib.SMTPRecipientsRefused as e:
+            _mark_failed(row["id"], row["attempts"], e, permanent=True)
+        except (smtplib.SMTPException, OSError) as e:
+            print(f"❌ Failed to send email to {row['to_email']}: {e}")
+            _mark_failed(row["id"], row["attempts"], e, permanent=False)
+            pool.close()
+
+        # Simple rate limit so bulk invites stay under the provider's sending limits
+        elapsed = time.time() - started
+        if elapsed < min_interval:
+            time.sleep(min_interval - elapsed)
+
+    return sent
+
+def run_worker(stop_event: threading.Event | None = None):
+    """
+    Deliver queued mail until stop_event is set, keeping the SMTP session between batches.
+    """
+    pool = SMTPPool()
+    try:
+        while stop_event is None or not stop_event.is_set():
+            try:
+                sent = deliver_batch(pool)
+            except Exception as e:
+                print(f"❌ Mail worker error: {e}")
+                pool.close()
+                sent = 0
+            if sent:
+                print(f"✅ Sent {sent} queued email(s)")
+            else:
+                time.sleep(MAIL_POLL_INTERVAL)
+    finally:
+        pool.close()
+
+def ensure_worker():
+    """
+    Start the in-process delivery thread once per process.
+    """
+    global _worker_thread
+    with _worker_lock:
+        if _worker_thread is None or not _worker_thread.is_alive():
+            _worker_thread = threading.Thread(target=run_worker, name="mail-queue", daemon=True)
+            _worker_thread.start()
+
+if __name__ == "__main__":
+    metrics.set_process("mail")
+    run_worker()
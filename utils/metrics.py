@@ -0,0 +1,276 @@
+# utils/metrics.py
+"""
+Lightweight in-process instrumentation: counters, latency histograms and timing spans.
+
+Every series is identified by a name and a set of labels. Histograms keep Prometheus-style
+cumulative buckets for export plus a bounded window of recent samples, from which the admin page
+computes p50/p95/p99. A daemon thread rewrites this process's metrics file in the Prometheus text
+format every METRICS_FLUSH_INTERVAL seconds, ready for node_exporter's textfile collector.
+
+The app, `python -m backend.worker` and `python -m utils.mail_queue` each export their own file
+(METRICS_FILE with a -app, -worker or -mail suffix) and tag every series with a process label,
+so the collector can merge them without one process overwriting another.
+
+With PROFILE_REQUESTS enabled, profile() blocks run under cProfile and save a .prof file per run
+to PROFILE_DIR (inspect with `python -m pstats` or snakeviz).
+"""
+import cProfile
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+import streamlit as st
+
+METRICS_FILE = st.secrets.get("METRICS_FILE", "data/metrics/youtufy.prom")
+METRICS_FLUSH_INTERVAL = int(st.secrets.get("METRICS_FLUSH_INTERVAL", 15))  # 0 disables the file export
+METRICS_WINDOW = int(st.secrets.get("METRICS_WINDOW", 2048))  # recent samples kept per histogram
+
+# 🔬 Opt-in profiling (secret or YOUTUFY_PROFILE=true in the environment)
+PROFILE_REQUESTS = str(st.secrets.get("PROFILE_REQUESTS", os.environ.get("YOUTUFY_PROFILE", "false"))).lower() == "true"
+PROFILE_DIR = Path(st.secrets.get("PROFILE_DIR", "data/profiles"))
+
+PREFIX = "youtufy_"
+# Seconds; the top buckets cover a cold sync of a very large account
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+class Histogram:
+    """
+    Cumulative bucket counts (for export) plus a window of recent samples (for percentiles).
+    """
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)   # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=METRICS_WINDOW)
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def percentiles(self, quantiles=(0.5, 0.95, 0.99)) -> dict[float, float]:
+        samples = sorted(self.recent)
+        if not samples:
+            return {}
+        return {q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in quantiles}
+
+_counters: dict[tuple, float] = {}
+_histograms: dict[tuple, Histogram] = {}
+_lock = threading.Lock()
+
+_exporter: threading.Thread | None = None
+_process = "app"
+_exporter_lock = threading.Lock()
+
+# Only one cProfile profiler can be active per process
+_profile_lock = threading.Lock()
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+# 📈 Recording
+def increment(name: str, value: float = 1, **labels):
+    """
+    Add `value` to a counter.
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+    _ensure_exporter()
+
+def observe(name: str, value: float, buckets: tuple = LATENCY_BUCKETS, **labels):
+    """
+    Record one sample in a histogram (latencies in seconds, or counts with COUNT_BUCKETS).
+    """
+    key = _key(name, labels)
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+    _ensure_exporter()
+
+@contextmanager
+def span(name: str, **labels):
+    """
+    Time a block into the `<name>_seconds` histogram; exceptions also count in `<name>_errors_total`.
+    Streamlit's st.stop()/st.rerun() are not errors (they are not Exception subclasses).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        increment(f"{name}_errors_total", **labels)
+        raise
+    finally:
+        observe(f"{name}_seconds", time.perf_counter() - start, **labels)
+
+def timed(name: str, **labels):
+    """
+    Decorator form of span().
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def profile(name: str):
+    """
+    Run the block under cProfile when PROFILE_REQUESTS is on and save the stats to PROFILE_DIR.
+    A block that starts while another one is being profiled just runs.
+    """
+    if not PROFILE_REQUESTS or not _profile_lock.acquire(blocking=False):
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+            path = PROFILE_DIR / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{threading.get_ident()}.prof"
+            profiler.dump_stats(str(path))
+            print(f"🔬 Profile saved to {path}")
+    finally:
+        _profile_lock.release()
+
+# 📊 Reading
+def summary() -> list[dict]:
+    """
+    One row per histogram: name, labels, count, mean, p50, p95 and p99 (over the recent window).
+    """
+    with _lock:
+        items = [(key, h.count, h.sum, h.percentiles()) for key, h in _histograms.items()]
+    rows = []
+    for (name, labels), count, total, pct in sorted(items):
+        rows.append({
+            "name": name,
+            "labels": ", ".join(f"{k}={v}" for k, v in labels),
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "p50": pct.get(0.5, 0.0),
+            "p95": pct.get(0.95, 0.0),
+            "p99": pct.get(0.99, 0.0),
+        })
+    return rows
+
+def counters() -> list[dict]:
+    with _lock:
+        items = sorted(_counters.items())
+    return [
+        {"name": name, "labels": ", ".join(f"{k}={v}" for k, v in labels), "value": value}
+        for (name, labels), value in items
+    ]
+
+def reset():
+    """
+    Forget every series (benchmarks and long-running shells).
+    """
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+# 📤 Prometheus export
+def _labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = [
+        (k, v.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n"))
+        for k, v in labels + extra
+    ]
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}" if pairs else ""
+
+def set_process(role: str):
+    """
+    Name this process (e.g. "worker") for its metrics file and process label. Call it first thing
+    in a command-line entry point.
+    """
+    global _process
+    _process = role
+
+def metrics_file_path() -> Path:
+    """
+    This process's metrics file: METRICS_FILE with the process role before the extension.
+    """
+    base = Path(METRICS_FILE)
+    return base.with_name(f"{base.stem}-{_process}{base.suffix}")
+
+def render_prometheus() -> str:
+    """
+    All series in the Prometheus text exposition format.
+    """
+    with _lock:
+        counter_items = sorted(_counters.items())
+        histogram_items = sorted(
+            (key, h.buckets, list(h.bucket_counts), h.count, h.sum) for key, h in _histograms.items()
+        )
+
+    process = (("process", _process),)
+    lines, typed = [], set()
+    for (name, labels), value in counter_items:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+        lines.append(f"{PREFIX}{name}{_labels(labels, process)} {value:g}")
+
+    for (name, labels), buckets, bucket_counts, count, total in histogram_items:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+        cumulative = 0
+        for bound, n in zip((*buckets, "+Inf"), bucket_counts):
+            cumulative += n
+            lines.append(f"{PREFIX}{name}_bucket{_labels(labels, process + (('le', str(bound)),))} {cumulative}")
+        lines.append(f"{PREFIX}{name}_sum{_labels(labels, process)} {total:.6f}")
+        lines.append(f"{PREFIX}{name}_count{_labels(labels, process)} {count}")
+    return "\n".join(lines) + "\n"
+
+def write_metrics_file(path: str | None = None):
+    """
+    Atomically replace the metrics file (default: this process's), so a scraper never reads a partial one.
+    """
+    target = Path(path) if path else metrics_file_path()
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(render_prometheus())
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def _export_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_INTERVAL)
+        try:
+            write_metrics_file()
+        except OSError as e:
+            print(f"❌ Failed to write metrics file: {e}")
+
+def _ensure_exporter():
+    global _exporter
+    if _exporter is not None or METRICS_FLUSH_INTERVAL <= 0:
+        return
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = threading.Thread(target=_export_loop, name="metrics-exporter", daemon=True)
+            _exporter.start()
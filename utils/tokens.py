@@ -1,19 +1,32 @@
 #utils/tokens.py
-import sqlite3
 import sys
+import base64
 import hashlib
+import hmac
+import json
 import secrets
+import sqlite3
 import time
 import os
-from dotenv import load_dotenv
 import streamlit as st
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-load_dotenv()
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from backend import db
 
-SALT = st.secrets.get("TOKEN_SALT", "YouTufyDefaultSalt")
+_DEFAULT_SALT = "YouTufyDefaultSalt"
+
+SALT = st.secrets.get("TOKEN_SALT", _DEFAULT_SALT)
 EXPIRATION_SECONDS = int(st.secrets.get("TOKEN_EXPIRATION", 3600))  # Default: 1 hour
 
+# Key ID written into signed tokens; change it whenever TOKEN_SALT is rotated
+TOKEN_KEY_ID = str(st.secrets.get("TOKEN_KEY_ID", "1"))
+
+# Retired salts stay valid for verification until their tokens expire ("<key id>:<salt>", comma-separated)
+PREVIOUS_SALTS = [s for s in str(st.secrets.get("TOKEN_SALT_PREVIOUS", "")).split(",") if s]
+
+SIGNED_PREFIX = "v1"
+TOKEN_PURPOSES = {"verify", "reset"}
+
 def generate_token(email: str) -> str:
     timestamp = str(int(time.time()))
     random_hex = secrets.token_hex(16)
@@ -26,7 +39,7 @@ def verify_token(provided_token: str, stored_token: str) -> bool:
         provided_hash, provided_ts = provided_token.split(".")
         stored_hash, stored_ts = stored_token.split(".")
 
-        if provided_hash != stored_hash:
+        if not hmac.compare_digest(provided_hash, stored_hash):
             return False
 
         current_ts = int(time.time())
@@ -36,20 +49,116 @@ def verify_token(provided_token: str, stored_token: str) -> bool:
         print("Token verification failed:", e)
         return False
 
-def decode_token(token: str) -> str | None:
+def decode_token(token: str, purpose: str) -> str | None:
     """
-    Decode token by looking up the associated email in the database.
+    Decode a token issued for `purpose` to its email. Signed tokens are validated in memory;
+    legacy tokens (stored in users.token, verification only) are looked up in the database.
     """
-    DB_PATH = st.secrets.get("USER_DB")
+    if purpose not in TOKEN_PURPOSES:
+        raise ValueError(f"Unknown token purpose: {purpose}")
+    if token.startswith(SIGNED_PREFIX + "."):
+        return decode_signed_token(token, purpose)
+    if purpose != "verify":
+        return None
+
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute("SELECT email FROM users WHERE token = ?", (token,))
-        row = cur.fetchone()
-        conn.close()
-        return row[0] if row else None
+        return db.query_value("SELECT email FROM users WHERE token = ?", (token,))
     except Exception as e:
         print("❌ Error decoding token:", e)
         return None
 
+# 🔏 Signed tokens: v1.<payload>.<signature>, validated without a database lookup
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+def _load_signing_keys() -> tuple[bytes | None, dict[str, bytes]]:
+    """
+    Return the current signing key and every key accepted for verification, by key ID.
+    The default salt ships with the repo, so it never signs or verifies anything.
+    """
+    keys = {}
+    for entry in PREVIOUS_SALTS:
+        key_id, sep, salt = entry.partition(":")
+        if not sep or not key_id.strip() or salt in ("", _DEFAULT_SALT):
+            print("⚠️ Ignoring TOKEN_SALT_PREVIOUS entry without '<key id>:<salt>' form or with the default salt")
+            continue
+        keys[key_id.strip()] = salt.encode()
+
+    if SALT in ("", _DEFAULT_SALT):
+        print("⚠️ TOKEN_SALT is not set: signed verification and reset links are disabled")
+        return None, keys
+    keys[TOKEN_KEY_ID] = SALT.encode()
+    return SALT.encode(), keys
+
+_CURRENT_KEY, _SIGNING_KEYS = _load_signing_keys()
+
+def _sign(key: bytes, payload_b64: str) -> str:
+    return _b64encode(hmac.new(key, f"{SIGNED_PREFIX}.{payload_b64}".encode(), hashlib.sha256).digest())
+
+def generate_signed_token(email: str, purpose: str, ttl: int = EXPIRATION_SECONDS) -> str:
+    """
+    Create a token embedding the email, purpose, expiry and a nonce, signed with HMAC-SHA256
+    using TOKEN_SALT as the key. Raises RuntimeError when TOKEN_SALT is not configured.
+    """
+    if purpose not in TOKEN_PURPOSES:
+        raise ValueError(f"Unknown token purpose: {purpose}")
+    if _CURRENT_KEY is None:
+        raise RuntimeError("TOKEN_SALT is not configured; refusing to issue signed tokens")
+    payload = {
+        "e": email,
+        "p": purpose,
+        "x": int(time.time()) + ttl,
+        "n": secrets.token_hex(8),
+        "k": TOKEN_KEY_ID,
+    }
+    payload_b64 = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    return f"{SIGNED_PREFIX}.{payload_b64}.{_sign(_CURRENT_KEY, payload_b64)}"
+
+def _signed_payload(token: str) -> dict | None:
+    """
+    Return the payload of a correctly signed, unexpired token, or None.
+    """
+    try:
+        prefix, payload_b64, signature = token.split(".")
+        if prefix != SIGNED_PREFIX:
+            return None
+        payload = json.loads(_b64decode(payload_b64))
+        key = _SIGNING_KEYS.get(payload.get("k"))
+        if key is None or not hmac.compare_digest(_sign(key, payload_b64), signature):
+            return None
+        if payload["x"] < time.time():
+            return None
+        return payload
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+def decode_signed_token(token: str, purpose: str) -> str | None:
+    """
+    Return the email inside a valid signed token issued for `purpose`, or None.
+    """
+    payload = _signed_payload(token)
+    if not payload or payload.get("p") != purpose:
+        return None
+    return payload["e"]
 
+def consume_signed_token(token: str, purpose: str, conn: sqlite3.Connection | None = None) -> str | None:
+    """
+    Like decode_signed_token, but each token works only once: its nonce is recorded
+    until expiry so a replayed link is rejected. Pass `conn` to record the nonce inside the
+    caller's transaction, so the token is only spent if the rest of it commits.
+    """
+    payload = _signed_payload(token)
+    if not payload or payload.get("p") != purpose:
+        return None
+    sql = "INSERT INTO used_tokens (nonce, expires_at) VALUES (?, ?)"
+    try:
+        if conn is None:
+            db.execute(sql, (payload["n"], payload["x"]))
+        else:
+            conn.execute(sql, (payload["n"], payload["x"]))
+    except sqlite3.IntegrityError:
+        return None
+    return payload["e"]